@@ -0,0 +1,195 @@
+"""Sustained service throughput, per-call latency against registry size, state_changed events per update, and macs_message fan-out."""
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.macs.const import (
+    DOMAIN,
+    MOODS,
+    ATTR_BRIGHTNESS,
+    ATTR_CHARGING,
+    ATTR_MESSAGE,
+    ATTR_MOOD,
+    ATTR_PRECIPITATION,
+    ATTR_TEMPERATURE,
+    ATTR_WINDSPEED,
+    CONF_AGGREGATE_STATE,
+    EVENT_MESSAGE,
+    SERVICE_SEND_ASSISTANT_MESSAGE,
+    SERVICE_SET_BRIGHTNESS,
+    SERVICE_SET_CHARGING,
+    SERVICE_SET_MOOD,
+    SERVICE_SET_STATE,
+    SERVICE_SET_WINDSPEED,
+)
+from custom_components.macs.metrics import async_get_metrics
+from custom_components.macs.state import WEATHER_CONDITION_FIELDS
+
+from conftest import Stopwatch, async_setup_dependencies, macs_config_entry, percentile_ms, populate_registry, rate
+
+CALLS = 2_000
+MESSAGES = 200
+LATENCY_CALLS = 1_000
+UPDATES = 50
+
+# One service per kind of handler (select, number, switch), each call changing the value.
+LATENCY_SERVICES = {
+    SERVICE_SET_MOOD: lambda index: {ATTR_MOOD: MOODS[index % len(MOODS)]},
+    SERVICE_SET_BRIGHTNESS: lambda index: {ATTR_BRIGHTNESS: index % 100 + 0.5},
+    SERVICE_SET_CHARGING: lambda index: {ATTR_CHARGING: index % 2 == 0},
+}
+
+
+async def bench_set_windspeed(hass: HomeAssistant, macs_entry, record) -> None:
+    # Every value differs from the previous one, so every call writes state.
+    with Stopwatch() as run:
+        for index in range(CALLS):
+            await hass.services.async_call(
+                DOMAIN, SERVICE_SET_WINDSPEED, {ATTR_WINDSPEED: index % 100 + 0.5}, blocking=True
+            )
+        await hass.async_block_till_done()
+    record(
+        "set_windspeed",
+        {"calls": CALLS},
+        seconds=round(run.seconds, 6),
+        calls_per_second=rate(CALLS, run.seconds),
+        latency=async_get_metrics(hass).services[SERVICE_SET_WINDSPEED].as_dict(),
+    )
+
+
+async def bench_set_weather_conditions(hass: HomeAssistant, macs_entry, record) -> None:
+    # Cycle through every set_weather_conditions_* service, toggling each switch.
+    services = [(f"set_{field}", field) for field in WEATHER_CONDITION_FIELDS]
+    with Stopwatch() as run:
+        for index in range(CALLS):
+            service, field = services[index % len(services)]
+            on = (index // len(services)) % 2 == 0
+            await hass.services.async_call(DOMAIN, service, {field: on}, blocking=True)
+        await hass.async_block_till_done()
+    record(
+        "set_weather_conditions",
+        {"calls": CALLS, "services": len(services)},
+        seconds=round(run.seconds, 6),
+        calls_per_second=rate(CALLS, run.seconds),
+    )
+
+
+@pytest.mark.parametrize("registry_size", [100, 5_000, 50_000])
+async def bench_set_latency_by_registry_size(hass: HomeAssistant, record, registry_size: int) -> None:
+    # Per-call cost of the macs.set_* handlers should not depend on how many entities other integrations have.
+    # compare.py flags p50_ms / p95_ms going up and calls_per_second going down; calls is a count.
+    await async_setup_dependencies(hass)
+    populate_registry(hass, registry_size)
+    entry = macs_config_entry()
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    for service, data in LATENCY_SERVICES.items():
+        samples = []
+        for index in range(LATENCY_CALLS):
+            started = time.perf_counter()
+            await hass.services.async_call(DOMAIN, service, data(index), blocking=True)
+            samples.append(time.perf_counter() - started)
+        await hass.async_block_till_done()
+        record(
+            "set_latency_by_registry_size",
+            {"registry_entries": registry_size, "service": service},
+            calls=LATENCY_CALLS,
+            p50_ms=percentile_ms(samples, 50),
+            p95_ms=percentile_ms(samples, 95),
+            calls_per_second=rate(LATENCY_CALLS, sum(samples)),
+        )
+
+
+def _weather_snapshot(index: int) -> dict:
+    # The three weather numbers and all 13 conditions, every one different from the previous update.
+    on = index % 2 == 0
+    return {
+        ATTR_TEMPERATURE: 20.5 if on else 10.5,
+        ATTR_WINDSPEED: 20.5 if on else 10.5,
+        ATTR_PRECIPITATION: 20.5 if on else 10.5,
+        **{field: on for field in WEATHER_CONDITION_FIELDS},
+    }
+
+
+# (service, data for update n): one value changing, a full weather snapshot, and a value set to what it already is.
+STATE_UPDATES = {
+    "one_value": (SERVICE_SET_WINDSPEED, lambda index: {ATTR_WINDSPEED: index % 2 + 0.5}),
+    "weather_snapshot": (SERVICE_SET_STATE, _weather_snapshot),
+    "unchanged": (SERVICE_SET_WINDSPEED, lambda index: {ATTR_WINDSPEED: 0.5}),
+}
+
+
+@pytest.mark.parametrize("aggregate", [False, True])
+@pytest.mark.parametrize("update", list(STATE_UPDATES))
+async def bench_state_changed_events(hass: HomeAssistant, record, update: str, aggregate: bool) -> None:
+    # The cost of sensor.macs_state on the event bus: state_changed events of MACS entities per update.
+    await async_setup_dependencies(hass)
+    entry = macs_config_entry(**{CONF_AGGREGATE_STATE: aggregate})
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    macs_entities = {entity.entity_id for entity in er.async_entries_for_config_entry(er.async_get(hass), entry.entry_id)}
+
+    service, data = STATE_UPDATES[update]
+    # Once before counting, so every counted update starts from the previous one.
+    await hass.services.async_call(DOMAIN, service, data(1), blocking=True)
+    await hass.async_block_till_done()
+
+    events = 0
+
+    @callback
+    def on_state_changed(event: Event) -> None:
+        nonlocal events
+        events += 1
+
+    @callback
+    def is_macs_entity(event_data) -> bool:
+        return event_data["entity_id"] in macs_entities
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, on_state_changed, event_filter=is_macs_entity)
+    for index in range(UPDATES):
+        await hass.services.async_call(DOMAIN, service, data(index), blocking=True)
+        await hass.async_block_till_done()
+    record(
+        "state_changed_events",
+        {"update": update, "aggregate": aggregate, "updates": UPDATES},
+        events_per_update=round(events / UPDATES, 2),
+    )
+
+
+@pytest.mark.parametrize("listeners", [1, 100, 1_000])
+async def bench_send_assistant_message_fanout(hass: HomeAssistant, macs_entry, record, listeners: int) -> None:
+    received = 0
+
+    @callback
+    def on_message(event: Event) -> None:
+        nonlocal received
+        received += 1
+
+    for _ in range(listeners):
+        hass.bus.async_listen(EVENT_MESSAGE, on_message)
+
+    with Stopwatch() as run:
+        for index in range(MESSAGES):
+            # Distinct texts, so none are dropped as duplicates.
+            await hass.services.async_call(
+                DOMAIN, SERVICE_SEND_ASSISTANT_MESSAGE, {ATTR_MESSAGE: f"Message {index}"}, blocking=True
+            )
+        await hass.async_block_till_done()
+
+    assert received == MESSAGES * listeners
+    record(
+        "send_assistant_message_fanout",
+        {"messages": MESSAGES, "listeners": listeners},
+        seconds=round(run.seconds, 6),
+        messages_per_second=rate(MESSAGES, run.seconds),
+        deliveries_per_second=rate(received, run.seconds),
+    )
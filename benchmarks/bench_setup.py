@@ -0,0 +1,37 @@
+"""async_setup_entry against synthetic entity registries."""
+from __future__ import annotations
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.macs.const import DOMAIN
+
+from conftest import Stopwatch, async_setup_dependencies, macs_config_entry, populate_registry
+
+
+@pytest.mark.parametrize("registry_size", [100, 5_000, 50_000])
+# 1: first start after upgrading (entity ID migration runs); 2: every start after that.
+@pytest.mark.parametrize("minor_version", [1, 2])
+async def bench_setup_entry(hass: HomeAssistant, record, registry_size: int, minor_version: int) -> None:
+    await async_setup_dependencies(hass)
+    populate_registry(hass, registry_size)
+    await hass.async_block_till_done()
+    entry = macs_config_entry(minor_version=minor_version)
+    entry.add_to_hass(hass)
+
+    with Stopwatch() as setup:
+        assert await hass.config_entries.async_setup(entry.entry_id)
+    with Stopwatch() as settle:
+        await hass.async_block_till_done()
+
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    deferred = entry_data.get("deferred_setup_timer")
+    record(
+        "setup_entry",
+        {"registry_entries": registry_size, "minor_version": minor_version},
+        seconds=round(setup.seconds, 6),
+        settle_seconds=round(settle.seconds, 6),
+        setup=entry_data["setup_timer"].as_dict(),
+        deferred_setup=deferred.as_dict() if deferred is not None else None,
+    )
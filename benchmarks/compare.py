@@ -0,0 +1,76 @@
+"""
+Compare two benchmark result files: python compare.py results/1.0.9.json results/1.0.10.json
+
+Rows are matched by name and params; nested values are compared under dotted keys
+(setup.phases_ms.platforms). Times (*_ms, *seconds) regress when they go up, rates (*_per_second)
+when they go down. Other numbers (counts such as calls or received) are not compared.
+"""
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+LOWER_IS_BETTER = ("_ms", "seconds")
+HIGHER_IS_BETTER = ("_per_second",)
+
+
+def _rows(path: str) -> tuple[str, dict[str, dict]]:
+    report = json.loads(Path(path).read_text(encoding="utf-8"))
+    rows = {}
+    for row in report.get("results", []):
+        key = f"{row['name']} {json.dumps(row.get('params', {}), sort_keys=True)}"
+        rows[key] = row
+    return report.get("version", path), rows
+
+
+def _flatten(values: dict[str, Any], prefix: str = "") -> dict[str, Any]:
+    flat: dict[str, Any] = {}
+    for key, value in values.items():
+        if not prefix and key in ("name", "params"):
+            continue
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def direction(metric: str) -> int:
+    """+1 when lower is better, -1 when higher is better, 0 when the metric isn't compared."""
+    # The nearest part that names a unit decides: setup.phases_ms.platforms is a time in ms.
+    for part in reversed(metric.split(".")):
+        if part.endswith(HIGHER_IS_BETTER):
+            return -1
+        if part.endswith(LOWER_IS_BETTER):
+            return 1
+    return 0
+
+
+def main(old_path: str, new_path: str, threshold: float = 10.0) -> int:
+    old_version, old = _rows(old_path)
+    new_version, new = _rows(new_path)
+    regressions = 0
+    print(f"{'benchmark':<70} {'metric':<32} {old_version:>12} {new_version:>12} {'change':>9}")
+    for key in sorted(old.keys() & new.keys()):
+        before_values, after_values = _flatten(old[key]), _flatten(new[key])
+        for metric, before in sorted(before_values.items()):
+            after = after_values.get(metric)
+            sign = direction(metric)
+            if not sign or isinstance(before, bool) or not isinstance(before, (int, float)):
+                continue
+            if isinstance(after, bool) or not isinstance(after, (int, float)) or not before:
+                continue
+            change = (after - before) / before * 100
+            flag = " !" if sign * change > threshold else ""
+            regressions += bool(flag)
+            print(f"{key:<70} {metric:<32} {before:>12} {after:>12} {change:>+8.1f}%{flag}")
+    print(f"\n{regressions} metric(s) more than {threshold:g}% worse")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        sys.exit(__doc__.strip())
+    sys.exit(main(sys.argv[1], sys.argv[2], *(float(arg) for arg in sys.argv[3:])))
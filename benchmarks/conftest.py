@@ -0,0 +1,153 @@
+"""
+Shared fixtures for the MACS benchmarks; runs fully offline on pytest-homeassistant-custom-component.
+
+Every benchmark reports its numbers through the `record` fixture; they are written as one JSON
+file per run for compare.py: to --macs-json, to results/<integration version>.json (the committed
+baseline) with --macs-baseline, and otherwise to results/latest.json, which is not tracked.
+"""
+from __future__ import annotations
+
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers import entity_registry as er  # noqa: E402
+from homeassistant.setup import async_setup_component  # noqa: E402
+from pytest_homeassistant_custom_component.common import MockConfigEntry  # noqa: E402
+
+from custom_components.macs.const import (  # noqa: E402
+    DOMAIN,
+    CONF_MESSAGE_RATE,
+    CONF_MESSAGE_MERGE_WINDOW,
+    CONF_WRITE_COALESCE_WINDOW,
+)
+from custom_components.macs.migration import CONFIG_ENTRY_MINOR_VERSION, CONFIG_ENTRY_VERSION  # noqa: E402
+
+MANIFEST = ROOT / "custom_components" / DOMAIN / "manifest.json"
+
+# Default output; the versioned baselines next to it are only written with --macs-baseline.
+LATEST_RESULTS = "latest.json"
+
+# No limiting or coalescing, so every call does the full amount of work.
+BENCH_OPTIONS = {
+    CONF_MESSAGE_RATE: 0,
+    CONF_MESSAGE_MERGE_WINDOW: 0,
+    CONF_WRITE_COALESCE_WINDOW: 0,
+}
+
+_results: list[dict[str, Any]] = []
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption("--macs-json", default=None, help="Where to write the benchmark results (JSON).")
+    parser.addoption(
+        "--macs-baseline",
+        action="store_true",
+        help="Write the results to results/<integration version>.json, replacing that version's baseline.",
+    )
+
+
+def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:
+    if not _results:
+        return
+    version = json.loads(MANIFEST.read_text(encoding="utf-8")).get("version", "0")
+    results = Path(__file__).parent / "results"
+    if session.config.getoption("--macs-json"):
+        path = Path(session.config.getoption("--macs-json"))
+    elif session.config.getoption("--macs-baseline"):
+        path = results / f"{version}.json"
+    else:
+        path = results / LATEST_RESULTS
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "version": version,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": _results,
+    }
+    path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    yield
+
+
+@pytest.fixture
+def record():
+    """record(name, params, **values): one result row."""
+
+    def _record(name: str, params: dict[str, Any] | None = None, **values: Any) -> None:
+        _results.append({"name": name, "params": params or {}, **values})
+
+    return _record
+
+
+async def async_setup_dependencies(hass: HomeAssistant) -> None:
+    """Set up what MACS depends on first, so it isn't part of the measured setup."""
+    for component in ("http", "lovelace", "websocket_api"):
+        assert await async_setup_component(hass, component, {})
+    await hass.async_block_till_done()
+
+
+def populate_registry(hass: HomeAssistant, size: int) -> None:
+    """`size` entities of another integration, spread over a few domains like a real install."""
+    registry = er.async_get(hass)
+    domains = ("sensor", "light", "switch", "binary_sensor", "number")
+    for index in range(size):
+        registry.async_get_or_create(domains[index % len(domains)], "bench", f"bench_{index}")
+
+
+def macs_config_entry(minor_version: int = CONFIG_ENTRY_MINOR_VERSION, **options: Any) -> MockConfigEntry:
+    return MockConfigEntry(
+        domain=DOMAIN,
+        title="Macs",
+        version=CONFIG_ENTRY_VERSION,
+        minor_version=minor_version,
+        options={**BENCH_OPTIONS, **options},
+    )
+
+
+@pytest.fixture
+async def macs_entry(hass: HomeAssistant) -> MockConfigEntry:
+    """A set up MACS entry."""
+    await async_setup_dependencies(hass)
+    entry = macs_config_entry()
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+def rate(count: int, seconds: float) -> float:
+    return round(count / seconds, 1) if seconds > 0 else 0.0
+
+
+def percentile_ms(samples: list[float], percent: float) -> float | None:
+    """Nearest-rank percentile of durations in seconds, in milliseconds."""
+    if not samples:
+        return None
+    samples = sorted(samples)
+    rank = max(1, -(-len(samples) * percent // 100))
+    return round(samples[int(rank) - 1] * 1000, 4)
+
+
+class Stopwatch:
+    def __enter__(self) -> Stopwatch:
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.seconds = time.perf_counter() - self.started
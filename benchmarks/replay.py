@@ -0,0 +1,223 @@
+"""
+Replay a MACS traffic recording (macs.start_recording) against a Home Assistant instance.
+
+    python replay.py recording.jsonl --url http://localhost:8123 --token TOKEN [--speed 10] [--json out.json]
+
+Service calls are sent over the websocket API and source sensor changes are posted to the REST
+API (POST /api/states), each at its recorded time divided by --speed. Recorded macs_message
+events are not replayed (they follow from the send_*_message calls); they are only counted.
+
+Reported per service: the time to the call's result, and the time to the first state write
+made in the call's context (for calls that change a MACS entity). Meant for a test instance:
+the calls change MACS state there, and source sensor states are overwritten.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+
+# Seconds to wait after the last record for outstanding results and state writes.
+SETTLE_TIME = 5.0
+
+
+def percentile(samples: list[float], percent: float) -> float | None:
+    """Nearest-rank percentile."""
+    if not samples:
+        return None
+    samples = sorted(samples)
+    rank = max(1, -(-len(samples) * percent // 100))
+    return samples[int(rank) - 1]
+
+
+def summarize(samples: list[float]) -> dict[str, Any]:
+    def ms(value: float | None) -> float | None:
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        "count": len(samples),
+        "p50_ms": ms(percentile(samples, 50)),
+        "p95_ms": ms(percentile(samples, 95)),
+        "p99_ms": ms(percentile(samples, 99)),
+        "max_ms": ms(max(samples) if samples else None),
+    }
+
+
+def load_recording(path: Path) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    header: dict[str, Any] = {}
+    records = []
+    with path.open(encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "macs_recording" in record:
+                header = record
+            else:
+                records.append(record)
+    records.sort(key=lambda record: record.get("t", 0))
+    return header, records
+
+
+class Replayer:
+    def __init__(self, session: aiohttp.ClientSession, url: str, token: str) -> None:
+        self.session = session
+        self.url = url.rstrip("/")
+        self.token = token
+        self.ws: aiohttp.ClientWebSocketResponse | None = None
+        self._reader: asyncio.Task | None = None
+        self._next_id = 0
+        self._results: dict[int, asyncio.Future] = {}
+        # First state write per context id, by the time it arrived.
+        self._writes: dict[str, float] = {}
+        self.messages_received = 0
+        self.calls: dict[str, dict[str, list]] = defaultdict(lambda: {"result": [], "state_write": [], "errors": []})
+        self.states_posted = 0
+        self.state_errors = 0
+        self._pending: list[tuple[str, str, float]] = []
+
+    async def connect(self) -> None:
+        ws_url = self.url.replace("http", "ws", 1) + "/api/websocket"
+        self.ws = await self.session.ws_connect(ws_url, max_msg_size=0)
+        await self.ws.receive_json()
+        await self.ws.send_json({"type": "auth", "access_token": self.token})
+        reply = await self.ws.receive_json()
+        if reply.get("type") != "auth_ok":
+            raise SystemExit(f"Authentication failed: {reply.get('message', reply)}")
+        self._reader = asyncio.get_running_loop().create_task(self._read())
+        await self._command({"type": "subscribe_events", "event_type": "state_changed"})
+        await self._command({"type": "subscribe_events", "event_type": "macs_message"})
+
+    async def _command(self, message: dict[str, Any]) -> dict[str, Any]:
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._results[self._next_id] = future
+        await self.ws.send_json({"id": self._next_id, **message})
+        return await future
+
+    async def _read(self) -> None:
+        async for msg in self.ws:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                continue
+            now = time.perf_counter()
+            payload = json.loads(msg.data)
+            for message in payload if isinstance(payload, list) else [payload]:
+                if message.get("type") == "event":
+                    event = message["event"]
+                    if event["event_type"] == "macs_message":
+                        self.messages_received += 1
+                        continue
+                    context_id = (event.get("context") or {}).get("id")
+                    if context_id and context_id not in self._writes:
+                        self._writes[context_id] = now
+                    continue
+                future = self._results.pop(message.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result({**message, "_received": now})
+
+    async def call(self, service: str, data: dict[str, Any]) -> None:
+        sent = time.perf_counter()
+        result = await self._command({"type": "call_service", "domain": "macs", "service": service, "service_data": data})
+        stats = self.calls[service]
+        if not result.get("success"):
+            stats["errors"].append((result.get("error") or {}).get("message", "error"))
+            return
+        stats["result"].append(result["_received"] - sent)
+        context_id = ((result.get("result") or {}).get("context") or {}).get("id")
+        if context_id:
+            self._pending.append((service, context_id, sent))
+
+    async def post_state(self, entity_id: str, state: str, attributes: dict[str, Any]) -> None:
+        async with self.session.post(
+            f"{self.url}/api/states/{entity_id}",
+            json={"state": state, "attributes": attributes},
+            headers={"Authorization": f"Bearer {self.token}"},
+        ) as response:
+            if response.status < 300:
+                self.states_posted += 1
+            else:
+                self.state_errors += 1
+
+    def collect_state_writes(self) -> None:
+        for service, context_id, sent in self._pending:
+            written = self._writes.get(context_id)
+            if written is not None:
+                self.calls[service]["state_write"].append(written - sent)
+
+
+async def replay(args: argparse.Namespace) -> dict[str, Any]:
+    header, records = load_recording(Path(args.recording))
+    recorded = Counter(record.get("k") for record in records)
+    async with aiohttp.ClientSession() as session:
+        replayer = Replayer(session, args.url, args.token)
+        await replayer.connect()
+        tasks = []
+        started = time.perf_counter()
+        for record in records:
+            delay = started + record.get("t", 0) / args.speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if record["k"] == "call":
+                tasks.append(asyncio.create_task(replayer.call(record["s"], record.get("d") or {})))
+            elif record["k"] == "state":
+                tasks.append(asyncio.create_task(replayer.post_state(record["e"], record["v"], record.get("a") or {})))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+        await asyncio.sleep(SETTLE_TIME)
+        replayer.collect_state_writes()
+
+    all_results = [sample for stats in replayer.calls.values() for sample in stats["result"]]
+    all_writes = [sample for stats in replayer.calls.values() for sample in stats["state_write"]]
+    return {
+        "recording": str(args.recording),
+        "recorded": header.get("started"),
+        "speed": args.speed,
+        "seconds": round(elapsed, 3),
+        "calls": recorded["call"],
+        "calls_per_second": round(recorded["call"] / elapsed, 1) if elapsed > 0 else None,
+        "result": summarize(all_results),
+        "state_write": summarize(all_writes),
+        "services": {
+            service: {
+                "result": summarize(stats["result"]),
+                "state_write": summarize(stats["state_write"]),
+                "errors": len(stats["errors"]),
+            }
+            for service, stats in sorted(replayer.calls.items())
+        },
+        "states_posted": replayer.states_posted,
+        "state_errors": replayer.state_errors,
+        "messages": {"recorded": recorded["message"], "received": replayer.messages_received},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("recording", help="JSON-lines file written by macs.start_recording")
+    parser.add_argument("--url", default=os.environ.get("HA_URL", "http://localhost:8123"))
+    parser.add_argument("--token", default=os.environ.get("HA_TOKEN"), help="Long-lived access token (or HA_TOKEN)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed: 1, 10, 100, ...")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+    if not args.token:
+        parser.error("a long-lived access token is required (--token or HA_TOKEN)")
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    report = asyncio.run(replay(args))
+    text = json.dumps(report, indent=2)
+    if args.json:
+        Path(args.json).write_text(text + "\n", encoding="utf-8")
+    sys.stdout.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
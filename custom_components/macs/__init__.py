@@ -8,10 +8,11 @@ from uuid import uuid4
 import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import HomeAssistant, ServiceCall, callback
 from homeassistant.helpers import entity_registry as er
 from homeassistant.components.http import StaticPathConfig
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.start import async_at_started
 from homeassistant.util import dt as dt_util
 
 # import constants
@@ -63,13 +64,41 @@ from .const import (
     SERVICE_SET_WEATHER_CONDITIONS_CLEAR_NIGHT,
     ATTR_WEATHER_CONDITIONS_CLEAR_NIGHT,
     SERVICE_SET_WEATHER_CONDITIONS_EXCEPTIONAL,
-    ATTR_WEATHER_CONDITIONS_EXCEPTIONAL
+    ATTR_WEATHER_CONDITIONS_EXCEPTIONAL,
+    SERVICE_SET_STATE,
+    SERVICE_START_RECORDING,
+    SERVICE_STOP_RECORDING,
+    ATTR_DURATION,
+    INTERNAL_OPTIONS,
+    CONF_MESSAGE_LIMIT,
+    CONF_MESSAGE_RATE,
+    CONF_MESSAGE_MERGE_WINDOW,
+    CONF_BUNDLE_FRONTEND,
+    CONF_SETUP_WARN_THRESHOLD,
 )
+from .assets import CARD_ENTRY, HASH_PARAM, MacsAssetRegistry, MacsAssetView, async_get_asset_registry
+from .assist import async_use_pipeline_tracker
+from .catalog import async_load_catalog
+from .messages import (
+    DEFAULT_MESSAGE_MERGE_WINDOW,
+    DEFAULT_MESSAGE_RATE,
+    MacsMessageHistory,
+    MacsMessageLimiter,
+    async_get_message_history,
+    async_get_message_limiter,
+)
+from .metrics import async_get_metrics
+from .migration import async_migrate
+from .recording import async_start_recording, async_stop_recording
+from .sensors import MacsSensorBridge
+from .state import SET_STATE_SCHEMA, async_apply_state, async_get_entity
+from .timing import DEFAULT_SETUP_WARN_THRESHOLD, MacsSetupTimer
+from .websocket_api import async_setup_websocket
 
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
-# user dropdown/select and number entities
-PLATFORMS: list[str] = ["select", "number", "switch"]
+# user dropdown/select and number entities (plus the opt-in aggregate state sensor)
+PLATFORMS: list[str] = ["select", "number", "switch", "sensor"]
 
 RESOURCE_BASE_URL = "/macs/macs.js"
 RESOURCE_TYPE = "module"
@@ -100,6 +129,11 @@ async def _ensure_lovelace_resource(hass: HomeAssistant) -> None:
 
     version = await _integration_version(hass)
     desired_url = f"{RESOURCE_BASE_URL}?v={version}"
+    registry = async_get_asset_registry(hass)
+    card = registry.get(CARD_ENTRY) if registry is not None else None
+    if card is not None:
+        # The content hash makes the card (and, through it, every module it imports) cacheable for good.
+        desired_url = f"{desired_url}&{HASH_PARAM}={card.digest}"
 
     existing = None
     for item in resources.async_items():
@@ -115,112 +149,128 @@ async def _ensure_lovelace_resource(hass: HomeAssistant) -> None:
         await resources.async_create_item({"res_type": RESOURCE_TYPE, "url": desired_url})
 
 
+def _user_options(entry: ConfigEntry) -> dict:
+    return {key: value for key, value in entry.options.items() if key not in INTERNAL_OPTIONS}
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload when the options flow changes settings; ignore options MACS writes for itself."""
+    entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if entry_data is not None and entry_data.get("options") == _user_options(entry):
+        return
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def _async_init_assist_exposure(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Hide MACS entities from Assist by default (one-time setup)."""
+    if entry.options.get("assist_exposure_initialized"):
+        return
+    reg = er.async_get(hass)
+    for entity in er.async_entries_for_config_entry(reg, entry.entry_id):
+        options = dict(entity.options)
+        conversation = dict(options.get("conversation", {}))
+        if conversation.get("should_expose") is False:
+            continue
+        conversation["should_expose"] = False
+        options["conversation"] = conversation
+        try:
+            reg.async_update_entity_options(entity.entity_id, DOMAIN, options)
+        except AttributeError:
+            # Older HA versions don't support async_update_entity_options.
+            try:
+                reg.async_update_entity(entity.entity_id, options=options)
+            except TypeError:
+                # Older HA versions don't support the options kwarg here.
+                pass
+    hass.config_entries.async_update_entry(
+        entry,
+        options={**entry.options, "assist_exposure_initialized": True},
+    )
+
+
+@callback
+def _async_publish_message(hass: HomeAssistant, payload: dict) -> None:
+    hass.bus.async_fire(EVENT_MESSAGE, payload)
+    async_get_metrics(hass).async_message_fired()
+    history = async_get_message_history(hass)
+    if history is not None:
+        history.async_add(payload)
+
+
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
+    async_setup_websocket(hass)
+    # Serves custom_components/macs/www at /macs/... from the asset registry built in async_setup_entry.
+    hass.http.register_view(MacsAssetView())
     return True
 
 
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Bring an entry created by an older version up to date; see migration.py."""
+    return await async_migrate(hass, entry)
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Serve frontend files from custom_components/macs/www at /macs/...
     hass.data.setdefault(DOMAIN, {})
+    # Per-entry state; "entities" is the handle table MACS entities register themselves in.
+    entry_data = hass.data[DOMAIN].setdefault(entry.entry_id, {"entities": {}})
+    entry_data["options"] = _user_options(entry)
+    # Phase durations of this setup, for diagnostics.
+    threshold = entry.options.get(CONF_SETUP_WARN_THRESHOLD, DEFAULT_SETUP_WARN_THRESHOLD)
+    timer = MacsSetupTimer(threshold)
+    entry_data["setup_timer"] = timer
+
+    # Independent reads, each mostly in the executor, so they run side by side:
+    # - frontend constants and themes for entity defaults and macs/catalog; read once.
+    # - content hashes of the frontend files (reads every file); rebuilt on reload.
+    # - recent dialogue messages, so late or reloaded cards can backfill their bubbles.
+    assets = MacsAssetRegistry(bundled=entry.options.get(CONF_BUNDLE_FRONTEND, True))
+    message_history = MacsMessageHistory(hass, entry.entry_id)
+    await timer.async_gather(
+        "load",
+        catalog=async_load_catalog(hass),
+        assets=hass.async_add_executor_job(assets.build),
+        message_history=message_history.async_load(),
+    )
+    hass.data[DOMAIN]["assets"] = assets
     if not hass.data[DOMAIN].get("static_path_registered"):
-        www_path = Path(__file__).parent / "www"
         manifest_path = Path(__file__).parent / "manifest.json"
         await hass.http.async_register_static_paths(
             [
-                StaticPathConfig("/macs", str(www_path), cache_headers=False),
                 StaticPathConfig("/macs-manifest.json", str(manifest_path), cache_headers=False),
             ]
         )
         hass.data[DOMAIN]["static_path_registered"] = True
+    timer.lap("static_paths")
+
+    entry_data["messages"] = message_history
+    # Deduplication, burst merging and rate limiting of send_user_message / send_assistant_message (opt-in).
+    if entry.options.get(CONF_MESSAGE_LIMIT, False):
+        message_limiter = MacsMessageLimiter(
+            hass,
+            partial(_async_publish_message, hass),
+            entry.options.get(CONF_MESSAGE_RATE, DEFAULT_MESSAGE_RATE),
+            entry.options.get(CONF_MESSAGE_MERGE_WINDOW, DEFAULT_MESSAGE_MERGE_WINDOW),
+        )
+        entry_data["message_limiter"] = message_limiter
+        entry.async_on_unload(message_limiter.async_stop)
+    timer.lap("messages")
 
     # Create entities first
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-
-    # ---- entity_id migration (fix ugly auto-generated IDs like select.m_a_c_s_weather) ----
-    reg = er.async_get(hass)
-
-    def migrate(unique_id: str, desired_entity_id: str) -> None:
-        entry_obj = next((e for e in reg.entities.values() if e.platform == DOMAIN and e.unique_id == unique_id), None)
-        if not entry_obj:
-            return
-        if entry_obj.entity_id == desired_entity_id:
-            return
-        # Only rename if the desired entity_id is free
-        if desired_entity_id not in reg.entities:
-            reg.async_update_entity(entry_obj.entity_id, new_entity_id=desired_entity_id)
-
-    # These must match the _attr_unique_id values in entities.py
-    migrate("macs_mood", "select.macs_mood")
-    migrate("macs_brightness", "number.macs_brightness")
-    migrate("macs_battery_charge", "number.macs_battery_charge")
-    migrate("macs_temperature", "number.macs_temperature")
-    migrate("macs_windspeed", "number.macs_windspeed")
-    migrate("macs_precipitation", "number.macs_precipitation")
-    migrate("macs_charging", "switch.macs_charging")
-    # Replace legacy debug switch with config select.
-    legacy_debug = next(
-        (e for e in reg.entities.values() if e.platform == DOMAIN and e.unique_id == "macs_debug" and e.domain == "switch"),
-        None,
-    )
-    if legacy_debug:
-        reg.async_remove(legacy_debug.entity_id)
-    migrate("macs_debug", "select.macs_debug")
-    migrate("macs_theme", "select.macs_theme")
-    migrate("macs_weather_conditions_snowy", "switch.macs_weather_conditions_snowy")
-    migrate("macs_weather_conditions_cloudy", "switch.macs_weather_conditions_cloudy")
-    migrate("macs_weather_conditions_rainy", "switch.macs_weather_conditions_rainy")
-    migrate("macs_weather_conditions_windy", "switch.macs_weather_conditions_windy")
-    migrate("macs_weather_conditions_sunny", "switch.macs_weather_conditions_sunny")
-    migrate("macs_weather_conditions_stormy", "switch.macs_weather_conditions_stormy")
-    migrate("macs_weather_conditions_foggy", "switch.macs_weather_conditions_foggy")
-    migrate("macs_weather_conditions_hail", "switch.macs_weather_conditions_hail")
-    migrate("macs_weather_conditions_lightning", "switch.macs_weather_conditions_lightning")
-    migrate("macs_weather_conditions_partlycloudy", "switch.macs_weather_conditions_partlycloudy")
-    migrate("macs_weather_conditions_pouring", "switch.macs_weather_conditions_pouring")
-    migrate("macs_weather_conditions_clear_night", "switch.macs_weather_conditions_clear_night")
-    migrate("macs_weather_conditions_exceptional", "switch.macs_weather_conditions_exceptional")
-
-    # Hide MACS entities from Assist by default (one-time setup).
-    if not entry.options.get("assist_exposure_initialized"):
-        for entity in list(reg.entities.values()):
-            if entity.platform != DOMAIN or entity.config_entry_id != entry.entry_id:
-                continue
-            options = dict(entity.options)
-            conversation = dict(options.get("conversation", {}))
-            if conversation.get("should_expose") is False:
-                continue
-            conversation["should_expose"] = False
-            options["conversation"] = conversation
-            try:
-                reg.async_update_entity_options(entity.entity_id, DOMAIN, options)
-            except AttributeError:
-                # Older HA versions don't support async_update_entity_options.
-                try:
-                    reg.async_update_entity(entity.entity_id, options=options)
-                except TypeError:
-                    # Older HA versions don't support the options kwarg here.
-                    pass
-        hass.config_entries.async_update_entry(
-            entry,
-            options={**entry.options, "assist_exposure_initialized": True},
-        )
+    timer.lap("platforms")
 
     async def handle_set_mood(call: ServiceCall) -> None:
         mood = str(call.data.get(ATTR_MOOD, "")).strip().lower()
         if mood not in MOODS:
             raise vol.Invalid(f"Invalid mood '{mood}'. Must be one of: {', '.join(MOODS)}")
 
-        registry = er.async_get(hass)
-        entity_id = None
-        for ent in registry.entities.values():
-            if ent.platform == DOMAIN and ent.unique_id == "macs_mood":
-                entity_id = ent.entity_id
-                break
-
-        if not entity_id:
+        entity = async_get_entity(hass, "macs_mood")
+        if entity is None:
             raise vol.Invalid("Macs mood entity not found (select not created)")
 
-        await hass.services.async_call("select", "select_option", {"entity_id": entity_id, "option": mood}, blocking=True)
+        entity.async_set_context(call.context)
+        await entity.async_select_option(mood)
 
     async def _set_number_entity(call: ServiceCall, attr_name: str, unique_id: str, label: str) -> None:
         raw = call.data.get(attr_name, None)
@@ -232,22 +282,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         if not (0 <= value <= 100):
             raise vol.Invalid(f"Invalid {label} '{value}'. Must be between 0 and 100.")
 
-        registry = er.async_get(hass)
-        entity_id = None
-        for ent in registry.entities.values():
-            if ent.platform == DOMAIN and ent.unique_id == unique_id:
-                entity_id = ent.entity_id
-                break
-
-        if not entity_id:
+        entity = async_get_entity(hass, unique_id)
+        if entity is None:
             raise vol.Invalid(f"Macs {label} entity not found (number not created)")
 
-        await hass.services.async_call(
-            "number",
-            "set_value",
-            {"entity_id": entity_id, "value": value},
-            blocking=True,
-        )
+        entity.async_set_context(call.context)
+        await entity.async_set_native_value(value)
 
     async def handle_set_brightness(call: ServiceCall) -> None:
         await _set_number_entity(call, ATTR_BRIGHTNESS, "macs_brightness", "brightness")
@@ -283,22 +323,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         else:
             raise vol.Invalid(f"Invalid {label} '{raw}'. Must be true/false.")
 
-        registry = er.async_get(hass)
-        entity_id = None
-        for ent in registry.entities.values():
-            if ent.platform == DOMAIN and ent.unique_id == unique_id:
-                entity_id = ent.entity_id
-                break
-
-        if not entity_id:
+        entity = async_get_entity(hass, unique_id)
+        if entity is None:
             raise vol.Invalid(f"Macs {label} entity not found (switch not created)")
 
-        await hass.services.async_call(
-            "switch",
-            "turn_on" if is_on else "turn_off",
-            {"entity_id": entity_id},
-            blocking=True,
-        )
+        entity.async_set_context(call.context)
+        if is_on:
+            await entity.async_turn_on()
+        else:
+            await entity.async_turn_off()
 
     async def handle_set_animations_enabled(call: ServiceCall) -> None:
         await _set_switch_entity(
@@ -420,6 +453,10 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             "weather conditions exceptional"
         )
 
+    async def handle_set_state(call: ServiceCall) -> None:
+        # Schema has already validated every field, so nothing is written unless all of them are valid.
+        await async_apply_state(hass, dict(call.data), call.context)
+
     async def _handle_send_message(call: ServiceCall, role: str) -> None:
         raw = call.data.get(ATTR_MESSAGE, None)
         text = (raw or "").__str__().strip()
@@ -432,7 +469,23 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             "text": text,
             "ts": dt_util.utcnow().isoformat(),
         }
-        hass.bus.async_fire(EVENT_MESSAGE, payload)
+        limiter = async_get_message_limiter(hass)
+        if limiter is not None:
+            limiter.async_submit(payload)
+        else:
+            _async_publish_message(hass, payload)
+
+    async def handle_start_recording(call: ServiceCall) -> None:
+        # Source sensors of every loaded entry, so a replay feeds the sensor bridge the same changes.
+        sources = set()
+        for macs_entry in hass.config_entries.async_entries(DOMAIN):
+            bridge = hass.data.get(DOMAIN, {}).get(macs_entry.entry_id, {}).get("sensor_bridge")
+            if bridge is not None:
+                sources.update(bridge.source_entities)
+        await async_start_recording(hass, sources, call.data.get(ATTR_DURATION))
+
+    async def handle_stop_recording(call: ServiceCall) -> None:
+        await async_stop_recording(hass)
 
     async def handle_send_user_message(call: ServiceCall) -> None:
         await _handle_send_message(call, "user")
@@ -440,12 +493,14 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     async def handle_send_assistant_message(call: ServiceCall) -> None:
         await _handle_send_message(call, "assistant")
 
+    # Call counts and latencies for diagnostics and the metrics sensor.
+    metrics = async_get_metrics(hass)
 
     if not hass.services.has_service(DOMAIN, SERVICE_SET_MOOD):
         hass.services.async_register(
             DOMAIN,
             SERVICE_SET_MOOD,
-            handle_set_mood,
+            metrics.wrap_service(SERVICE_SET_MOOD, handle_set_mood),
             schema=vol.Schema({vol.Required(ATTR_MOOD): vol.In(MOODS)}),
         )
 
@@ -453,7 +508,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_register(
             DOMAIN,
             SERVICE_SET_BRIGHTNESS,
-            handle_set_brightness,
+            metrics.wrap_service(SERVICE_SET_BRIGHTNESS, handle_set_brightness),
             schema=vol.Schema({vol.Required(ATTR_BRIGHTNESS): vol.Coerce(float)}),
         )
 
@@ -461,7 +516,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_register(
             DOMAIN,
             SERVICE_SET_TEMPERATURE,
-            handle_set_temperature,
+            metrics.wrap_service(SERVICE_SET_TEMPERATURE, handle_set_temperature),
             schema=vol.Schema({vol.Required(ATTR_TEMPERATURE): vol.Coerce(float)}),
         )
 
@@ -469,7 +524,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_register(
             DOMAIN,
             SERVICE_SET_WINDSPEED,
-            handle_set_windspeed,
+            metrics.wrap_service(SERVICE_SET_WINDSPEED, handle_set_windspeed),
             schema=vol.Schema({vol.Required(ATTR_WINDSPEED): vol.Coerce(float)}),
         )
 
@@ -477,7 +532,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_register(
             DOMAIN,
             SERVICE_SET_PRECIPITATION,
-            handle_set_precipitation,
+            metrics.wrap_service(SERVICE_SET_PRECIPITATION, handle_set_precipitation),
             schema=vol.Schema({vol.Required(ATTR_PRECIPITATION): vol.Coerce(float)}),
         )
 
@@ -485,7 +540,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_register(
             DOMAIN,
             SERVICE_SET_BATTERY_CHARGE,
-            handle_set_battery_charge,
+            metrics.wrap_service(SERVICE_SET_BATTERY_CHARGE, handle_set_battery_charge),
             schema=vol.Schema({vol.Required(ATTR_BATTERY_CHARGE): vol.Coerce(float)}),
         )
 
@@ -493,7 +548,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_register(
             DOMAIN,
             SERVICE_SET_ANIMATIONS_ENABLED,
-            handle_set_animations_enabled,
+            metrics.wrap_service(SERVICE_SET_ANIMATIONS_ENABLED, handle_set_animations_enabled),
             schema=vol.Schema({vol.Required(ATTR_ANIMATIONS_ENABLED): cv.boolean}),
         )
 
@@ -501,7 +556,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_register(
             DOMAIN,
             SERVICE_SET_CHARGING,
-            handle_set_charging,
+            metrics.wrap_service(SERVICE_SET_CHARGING, handle_set_charging),
             schema=vol.Schema({vol.Required(ATTR_CHARGING): cv.boolean}),
         )
 
@@ -509,7 +564,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_register(
             DOMAIN,
             SERVICE_SET_WEATHER_CONDITIONS_SNOWY,
-            handle_set_weather_conditions_snowy,
+            metrics.wrap_service(SERVICE_SET_WEATHER_CONDITIONS_SNOWY, handle_set_weather_conditions_snowy),
             schema=vol.Schema({vol.Required(ATTR_WEATHER_CONDITIONS_SNOWY): cv.boolean}),
         )
 
@@ -517,7 +572,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_register(
             DOMAIN,
             SERVICE_SET_WEATHER_CONDITIONS_CLOUDY,
-            handle_set_weather_conditions_cloudy,
+            metrics.wrap_service(SERVICE_SET_WEATHER_CONDITIONS_CLOUDY, handle_set_weather_conditions_cloudy),
             schema=vol.Schema({vol.Required(ATTR_WEATHER_CONDITIONS_CLOUDY): cv.boolean}),
         )
 
@@ -525,7 +580,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_register(
             DOMAIN,
             SERVICE_SET_WEATHER_CONDITIONS_RAINY,
-            handle_set_weather_conditions_rainy,
+            metrics.wrap_service(SERVICE_SET_WEATHER_CONDITIONS_RAINY, handle_set_weather_conditions_rainy),
             schema=vol.Schema({vol.Required(ATTR_WEATHER_CONDITIONS_RAINY): cv.boolean}),
         )
 
@@ -533,7 +588,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_register(
             DOMAIN,
             SERVICE_SET_WEATHER_CONDITIONS_WINDY,
-            handle_set_weather_conditions_windy,
+            metrics.wrap_service(SERVICE_SET_WEATHER_CONDITIONS_WINDY, handle_set_weather_conditions_windy),
             schema=vol.Schema({vol.Required(ATTR_WEATHER_CONDITIONS_WINDY): cv.boolean}),
         )
 
@@ -541,7 +596,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_register(
             DOMAIN,
             SERVICE_SET_WEATHER_CONDITIONS_SUNNY,
-            handle_set_weather_conditions_sunny,
+            metrics.wrap_service(SERVICE_SET_WEATHER_CONDITIONS_SUNNY, handle_set_weather_conditions_sunny),
             schema=vol.Schema({vol.Required(ATTR_WEATHER_CONDITIONS_SUNNY): cv.boolean}),
         )
 
@@ -549,7 +604,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_register(
             DOMAIN,
             SERVICE_SET_WEATHER_CONDITIONS_STORMY,
-            handle_set_weather_conditions_stormy,
+            metrics.wrap_service(SERVICE_SET_WEATHER_CONDITIONS_STORMY, handle_set_weather_conditions_stormy),
             schema=vol.Schema({vol.Required(ATTR_WEATHER_CONDITIONS_STORMY): cv.boolean}),
         )
 
@@ -557,7 +612,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_register(
             DOMAIN,
             SERVICE_SET_WEATHER_CONDITIONS_FOGGY,
-            handle_set_weather_conditions_foggy,
+            metrics.wrap_service(SERVICE_SET_WEATHER_CONDITIONS_FOGGY, handle_set_weather_conditions_foggy),
             schema=vol.Schema({vol.Required(ATTR_WEATHER_CONDITIONS_FOGGY): cv.boolean}),
         )
 
@@ -565,7 +620,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_register(
             DOMAIN,
             SERVICE_SET_WEATHER_CONDITIONS_HAIL,
-            handle_set_weather_conditions_hail,
+            metrics.wrap_service(SERVICE_SET_WEATHER_CONDITIONS_HAIL, handle_set_weather_conditions_hail),
             schema=vol.Schema({vol.Required(ATTR_WEATHER_CONDITIONS_HAIL): cv.boolean}),
         )
 
@@ -573,7 +628,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_register(
             DOMAIN,
             SERVICE_SET_WEATHER_CONDITIONS_LIGHTNING,
-            handle_set_weather_conditions_lightning,
+            metrics.wrap_service(SERVICE_SET_WEATHER_CONDITIONS_LIGHTNING, handle_set_weather_conditions_lightning),
             schema=vol.Schema({vol.Required(ATTR_WEATHER_CONDITIONS_LIGHTNING): cv.boolean}),
         )
 
@@ -581,7 +636,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_register(
             DOMAIN,
             SERVICE_SET_WEATHER_CONDITIONS_PARTLYCLOUDY,
-            handle_set_weather_conditions_partlycloudy,
+            metrics.wrap_service(SERVICE_SET_WEATHER_CONDITIONS_PARTLYCLOUDY, handle_set_weather_conditions_partlycloudy),
             schema=vol.Schema({vol.Required(ATTR_WEATHER_CONDITIONS_PARTLYCLOUDY): cv.boolean}),
         )
 
@@ -589,7 +644,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_register(
             DOMAIN,
             SERVICE_SET_WEATHER_CONDITIONS_POURING,
-            handle_set_weather_conditions_pouring,
+            metrics.wrap_service(SERVICE_SET_WEATHER_CONDITIONS_POURING, handle_set_weather_conditions_pouring),
             schema=vol.Schema({vol.Required(ATTR_WEATHER_CONDITIONS_POURING): cv.boolean}),
         )
 
@@ -597,7 +652,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_register(
             DOMAIN,
             SERVICE_SET_WEATHER_CONDITIONS_CLEAR_NIGHT,
-            handle_set_weather_conditions_clear_night,
+            metrics.wrap_service(SERVICE_SET_WEATHER_CONDITIONS_CLEAR_NIGHT, handle_set_weather_conditions_clear_night),
             schema=vol.Schema({vol.Required(ATTR_WEATHER_CONDITIONS_CLEAR_NIGHT): cv.boolean}),
         )
 
@@ -605,15 +660,23 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_register(
             DOMAIN,
             SERVICE_SET_WEATHER_CONDITIONS_EXCEPTIONAL,
-            handle_set_weather_conditions_exceptional,
+            metrics.wrap_service(SERVICE_SET_WEATHER_CONDITIONS_EXCEPTIONAL, handle_set_weather_conditions_exceptional),
             schema=vol.Schema({vol.Required(ATTR_WEATHER_CONDITIONS_EXCEPTIONAL): cv.boolean}),
         )
 
+    if not hass.services.has_service(DOMAIN, SERVICE_SET_STATE):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_SET_STATE,
+            metrics.wrap_service(SERVICE_SET_STATE, handle_set_state),
+            schema=SET_STATE_SCHEMA,
+        )
+
     if not hass.services.has_service(DOMAIN, SERVICE_SEND_USER_MESSAGE):
         hass.services.async_register(
             DOMAIN,
             SERVICE_SEND_USER_MESSAGE,
-            handle_send_user_message,
+            metrics.wrap_service(SERVICE_SEND_USER_MESSAGE, handle_send_user_message),
             schema=vol.Schema({vol.Required(ATTR_MESSAGE): cv.string}),
         )
 
@@ -621,18 +684,63 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_register(
             DOMAIN,
             SERVICE_SEND_ASSISTANT_MESSAGE,
-            handle_send_assistant_message,
+            metrics.wrap_service(SERVICE_SEND_ASSISTANT_MESSAGE, handle_send_assistant_message),
             schema=vol.Schema({vol.Required(ATTR_MESSAGE): cv.string}),
         )
 
-    # Auto-add/update Lovelace resource (storage mode)
-    await _ensure_lovelace_resource(hass)
+    if not hass.services.has_service(DOMAIN, SERVICE_START_RECORDING):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_START_RECORDING,
+            metrics.wrap_service(SERVICE_START_RECORDING, handle_start_recording),
+            schema=vol.Schema(
+                {vol.Optional(ATTR_DURATION): vol.All(vol.Coerce(float), vol.Range(min=1, max=7 * 24 * 3600))}
+            ),
+        )
+
+    if not hass.services.has_service(DOMAIN, SERVICE_STOP_RECORDING):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_STOP_RECORDING,
+            metrics.wrap_service(SERVICE_STOP_RECORDING, handle_stop_recording),
+            schema=vol.Schema({}),
+        )
+    timer.lap("services")
+
+    # Publish normalized values of the source sensors configured in the options into the number entities.
+    sensor_bridge = MacsSensorBridge(hass, entry)
+    await sensor_bridge.async_start()
+    entry_data["sensor_bridge"] = sensor_bridge
+    entry.async_on_unload(sensor_bridge.async_stop)
+    timer.lap("sensor_bridge")
+
+    # Follow Assist pipeline runs once here instead of in every card (one tracker shared by all entries).
+    entry.async_on_unload(async_use_pipeline_tracker(hass))
+    timer.lap("pipeline_tracker")
+
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    timer.finish()
+
+    # Work nothing else waits for runs once Home Assistant has started (right away on a reload).
+    async def _async_setup_deferred(_hass: HomeAssistant) -> None:
+        deferred_timer = MacsSetupTimer(threshold, "deferred setup")
+        entry_data["deferred_setup_timer"] = deferred_timer
+        await deferred_timer.async_gather(
+            "started",
+            lovelace_resource=_ensure_lovelace_resource(hass),
+            assist_exposure=_async_init_assist_exposure(hass, entry),
+        )
+        deferred_timer.finish()
+
+    entry.async_on_unload(async_at_started(hass, _async_setup_deferred))
 
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
     if unload_ok and not hass.config_entries.async_entries(DOMAIN):
         hass.services.async_remove(DOMAIN, SERVICE_SET_MOOD)
         hass.services.async_remove(DOMAIN, SERVICE_SET_BRIGHTNESS)
@@ -654,7 +762,15 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_remove(DOMAIN, SERVICE_SET_WEATHER_CONDITIONS_POURING)
         hass.services.async_remove(DOMAIN, SERVICE_SET_WEATHER_CONDITIONS_CLEAR_NIGHT)
         hass.services.async_remove(DOMAIN, SERVICE_SET_WEATHER_CONDITIONS_EXCEPTIONAL)
+        hass.services.async_remove(DOMAIN, SERVICE_SET_STATE)
         hass.services.async_remove(DOMAIN, SERVICE_SEND_USER_MESSAGE)
         hass.services.async_remove(DOMAIN, SERVICE_SEND_ASSISTANT_MESSAGE)
+        hass.services.async_remove(DOMAIN, SERVICE_START_RECORDING)
+        hass.services.async_remove(DOMAIN, SERVICE_STOP_RECORDING)
+        await async_stop_recording(hass)
         hass.data.get(DOMAIN, {}).pop("static_path_registered", None)
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await MacsMessageHistory(hass, entry.entry_id).async_remove()
@@ -0,0 +1,395 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import posixpath
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from aiohttp import web
+
+from homeassistant.components.http import KEY_AUTHENTICATED, HomeAssistantView
+
+from .bundle import (
+    FRONTEND_BUNDLE_ENTRY,
+    SHARED_STYLESHEETS,
+    THEME_DIR,
+    BundleError,
+    bundle,
+    bundle_stylesheet,
+    theme_bundle_path,
+)
+from .catalog import async_load_catalog
+from .const import DOMAIN
+from .render import render_frontend
+from .state import async_build_snapshot
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is used when it isn't installed
+    brotli = None
+
+_LOGGER = logging.getLogger(__name__)
+
+ASSET_ROOT = Path(__file__).parent / "www"
+ASSET_URL = "/macs"
+
+# Files that are loaded by URL from outside the asset graph; they get the manifest injected.
+CARD_ENTRY = "macs.js"
+FRONTEND_ENTRY = "macs.html"
+
+# Generated module holding the manifest for the card; macs.js imports it first.
+MANIFEST_MODULE = "macs-assets.js"
+
+# Query parameter carrying an asset's content hash; responses for a matching hash are immutable.
+HASH_PARAM = "h"
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+# macs.html rendered with the current state is only ever good for the request it answers.
+NO_STORE = "no-store"
+
+# Text assets are sent compressed to clients that accept it; smaller files aren't worth it.
+COMPRESSIBLE_TYPES = ("text/javascript", "application/json", "text/css", "text/html", "image/svg+xml")
+MIN_COMPRESS_SIZE = 256
+
+# Upper bound of the compressed copies kept in memory (all text assets gzip to well under 100 kB).
+COMPRESSION_CACHE_BYTES = 4 * 1024 * 1024
+
+CONTENT_TYPES = {
+    ".js": "text/javascript",
+    ".json": "application/json",
+    ".css": "text/css",
+    ".html": "text/html",
+}
+
+# Relative module specifiers of static imports/re-exports: import x from "./a.js", import "./a.js", export {x} from "../a.js"
+_JS_IMPORT = re.compile(r"""(\b(?:from|import)\s*)(["'])(\.{1,2}/[^"'?#]+)\2""")
+# CSS references: @import url("a.css"), url(../images/a.png); in-document refs (#id) and data: urls are skipped
+_CSS_URL = re.compile(r"""(url\(\s*)(["']?)((?!data:|#|/|[a-z]+:)[^"')?#]+)\2(\s*\))""")
+# Static asset attributes in macs.html: href="frontend/..." / src="frontend/..."
+_HTML_ATTR = re.compile(r"""(\b(?:href|src)=)(["'])((?!/|#|[a-z]+:)[^"'?#]+)\2""")
+
+
+@dataclass(slots=True)
+class MacsAsset:
+    path: str
+    content: bytes
+    content_type: str
+    digest: str
+
+
+def _digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()[:16]
+
+
+def _compress(content: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(content)
+    # mtime=0 keeps the output (and so its cache entry) identical for identical input.
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def preferred_encoding(accept_encoding: str) -> str | None:
+    """Best supported content coding in an Accept-Encoding header: br, then gzip, or None."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.strip()] = quality
+    for coding in ("br", "gzip"):
+        if coding == "br" and brotli is None:
+            continue
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+class MacsCompressionCache:
+    """
+    Compressed copies of assets, keyed by (path, content hash, encoding), least recently used
+    first out once the total size would exceed max_bytes. Since the key includes the content
+    hash, a changed file never hits a stale copy.
+    """
+
+    def __init__(self, max_bytes: int = COMPRESSION_CACHE_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[tuple[str, str, str], bytes] = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "bytes_in": 0, "bytes_out": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, asset: MacsAsset, encoding: str) -> bytes | None:
+        key = (asset.path, asset.digest, encoding)
+        body = self._entries.get(key)
+        if body is None:
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return body
+
+    def put(self, asset: MacsAsset, encoding: str, body: bytes) -> None:
+        key = (asset.path, asset.digest, encoding)
+        if key in self._entries or len(body) > self.max_bytes:
+            return
+        while self._entries and self.size + len(body) > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+            self.stats["evictions"] += 1
+        self._entries[key] = body
+        self.size += len(body)
+        self.stats["bytes_in"] += len(asset.content)
+        self.stats["bytes_out"] += len(body)
+
+
+class MacsAssetRegistry:
+    """
+    Content-hashed view of the files under www/.
+
+    Every relative import in a JS module and every url() in a stylesheet is rewritten to carry the
+    content hash of its target (?h=<hash>), and a file's hash covers those rewritten references, so
+    a change to a file changes the URL of it and of everything that (transitively) references it,
+    and nothing else. URLs built at runtime use the path -> hash manifest: macs.html carries it
+    inline, and macs.js imports it (plus the hash of macs.html) from the generated macs-assets.js.
+
+    With bundling on, macs.js and frontend/scripts/MacsFrontend.js are served as bundles of their
+    whole module graph (see bundle.py) under their usual URLs, and every theme gets one minified
+    stylesheet including base, moods and weather (frontend/styles/bundles/<theme>.css). The
+    separate files stay available, hashed, for anything that loads them directly.
+
+    build() reads and hashes every file; call it in the executor.
+    """
+
+    def __init__(self, root: Path = ASSET_ROOT, bundled: bool = True) -> None:
+        self.root = root
+        self.bundled = bundled
+        self.assets: dict[str, MacsAsset] = {}
+        self.manifest: dict[str, str] = {}
+        self.bundles: dict[str, list[str]] = {}
+        self.compressed = MacsCompressionCache()
+
+    def get(self, path: str) -> MacsAsset | None:
+        return self.assets.get(path)
+
+    def url(self, path: str) -> str:
+        asset = self.assets[path]
+        return f"{ASSET_URL}/{path}?{HASH_PARAM}={asset.digest}"
+
+    def build(self) -> None:
+        sources: dict[str, bytes] = {}
+        for file in sorted(self.root.rglob("*")):
+            if not file.is_file() or any(part.startswith(".") for part in file.relative_to(self.root).parts):
+                continue
+            path = file.relative_to(self.root).as_posix()
+            sources[path] = file.read_bytes()
+
+        assets: dict[str, MacsAsset] = {}
+        visiting: set[str] = set()
+
+        def resolve(path: str) -> MacsAsset:
+            if path in assets:
+                return assets[path]
+            visiting.add(path)
+            content = self._rewrite(path, sources[path], sources, resolve, visiting)
+            visiting.discard(path)
+            asset = assets[path] = MacsAsset(path, content, self._content_type(path), _digest(content))
+            return asset
+
+        for path in sources:
+            if path not in (CARD_ENTRY, FRONTEND_ENTRY):
+                resolve(path)
+
+        bundles: dict[str, list[str]] = {}
+        if self.bundled and FRONTEND_BUNDLE_ENTRY in sources:
+            self._bundle(assets, bundles, FRONTEND_BUNDLE_ENTRY, lambda path: sources[path].decode("utf-8"))
+        if self.bundled:
+            self._bundle_styles(assets, bundles, sources, resolve)
+
+        manifest = {path: asset.digest for path, asset in sorted(assets.items())}
+
+        if FRONTEND_ENTRY in sources:
+            content = self._rewrite(FRONTEND_ENTRY, sources[FRONTEND_ENTRY], sources, resolve, visiting)
+            content = content.decode("utf-8").replace(
+                "<title>", f"<script>{self._manifest_statement(manifest)}</script>\n\t<title>", 1
+            ).encode("utf-8")
+            assets[FRONTEND_ENTRY] = MacsAsset(FRONTEND_ENTRY, content, "text/html", _digest(content))
+            manifest[FRONTEND_ENTRY] = assets[FRONTEND_ENTRY].digest
+
+        content = f"{self._manifest_statement(manifest)}\n".encode("utf-8")
+        module = assets[MANIFEST_MODULE] = MacsAsset(MANIFEST_MODULE, content, "text/javascript", _digest(content))
+
+        if CARD_ENTRY in sources:
+            content = self._rewrite(CARD_ENTRY, sources[CARD_ENTRY], sources, resolve, visiting)
+            # Evaluated before the card's own imports, so they can already build hashed URLs.
+            content = f'import "./{MANIFEST_MODULE}?{HASH_PARAM}={module.digest}";\n'.encode("utf-8") + content
+            assets[CARD_ENTRY] = MacsAsset(CARD_ENTRY, content, "text/javascript", _digest(content))
+            if self.bundled:
+                card_source = f'import "./{MANIFEST_MODULE}";\n' + sources[CARD_ENTRY].decode("utf-8")
+                generated = {CARD_ENTRY: card_source, MANIFEST_MODULE: module.content.decode("utf-8")}
+                self._bundle(
+                    assets, bundles, CARD_ENTRY, lambda path: generated.get(path) or sources[path].decode("utf-8")
+                )
+
+        self.assets = assets
+        self.manifest = manifest
+        self.bundles = bundles
+
+    @staticmethod
+    def _bundle(assets, bundles, entry, read) -> None:
+        try:
+            source, modules = bundle(entry, read)
+        except (BundleError, KeyError) as err:
+            _LOGGER.warning("Serving %s unbundled, it can't be bundled: %s", entry, err)
+            return
+        content = source.encode("utf-8")
+        assets[entry] = MacsAsset(entry, content, "text/javascript", _digest(content))
+        bundles[entry] = modules
+
+    @staticmethod
+    def _bundle_styles(assets, bundles, sources, resolve) -> None:
+        themes = sorted(
+            path for path in sources if posixpath.dirname(path) == THEME_DIR and path.endswith(".css")
+        )
+        styles: dict[str, MacsAsset] = {}
+        for theme in themes:
+            target = theme_bundle_path(posixpath.splitext(posixpath.basename(theme))[0])
+            target_dir = posixpath.dirname(target)
+
+            def url_for(path: str) -> str:
+                reference = posixpath.relpath(path, target_dir)
+                return f"{reference}?{HASH_PARAM}={resolve(path).digest}" if path in sources else reference
+
+            try:
+                css = bundle_stylesheet(
+                    [theme, *SHARED_STYLESHEETS], lambda path: sources[path].decode("utf-8"), target, url_for
+                )
+            except (BundleError, KeyError) as err:
+                _LOGGER.warning("Serving theme stylesheets unbundled, they can't be bundled: %s", err)
+                return
+            content = css.encode("utf-8")
+            styles[target] = MacsAsset(target, content, "text/css", _digest(content))
+        assets.update(styles)
+        if styles:
+            bundles[posixpath.dirname(theme_bundle_path("default"))] = sorted(styles)
+
+    @staticmethod
+    def _content_type(path: str) -> str:
+        suffix = posixpath.splitext(path)[1].lower()
+        return CONTENT_TYPES.get(suffix) or mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+    def _rewrite(self, path, content, sources, resolve, visiting) -> bytes:
+        suffix = posixpath.splitext(path)[1].lower()
+        if suffix == ".js":
+            pattern, group = _JS_IMPORT, 3
+        elif suffix == ".css":
+            pattern, group = _CSS_URL, 3
+        elif suffix == ".html":
+            pattern, group = _HTML_ATTR, 3
+        else:
+            return content
+
+        text = content.decode("utf-8")
+        base = posixpath.dirname(path)
+
+        def replace(match: re.Match) -> str:
+            reference = match.group(group)
+            target = posixpath.normpath(posixpath.join(base, reference))
+            # Unknown targets and import cycles keep their plain (revalidated) URL.
+            if target not in sources or target in visiting or target in (CARD_ENTRY, FRONTEND_ENTRY):
+                return match.group(0)
+            digest = resolve(target).digest
+            start, end = match.span(group)
+            offset = match.start(0)
+            whole = match.group(0)
+            return f"{whole[: start - offset]}{reference}?{HASH_PARAM}={digest}{whole[end - offset:]}"
+
+        return pattern.sub(replace, text).encode("utf-8")
+
+    @staticmethod
+    def _manifest_statement(manifest: dict[str, str]) -> str:
+        data = json.dumps(manifest, separators=(",", ":"))
+        return f"window.__MACS_ASSETS__ = Object.assign(window.__MACS_ASSETS__ || {{}}, {data});"
+
+
+def async_get_asset_registry(hass) -> MacsAssetRegistry | None:
+    return hass.data.get(DOMAIN, {}).get("assets")
+
+
+class MacsAssetView(HomeAssistantView):
+    """
+    Serves www/ from the asset registry under /macs.
+
+    A request whose ?h= matches the file's content hash is cached as immutable; anything else
+    (plain paths, stale hashes) is served with no-cache and an ETag, so it revalidates with a 304.
+    Text assets are compressed (brotli or gzip, per Accept-Encoding) on first request, in the
+    executor, and the result is kept in the registry's compression cache.
+
+    An authenticated request for macs.html (the card signs the iframe URL with auth/sign_path)
+    gets it rendered with the current MACS state and the catalog inlined (see render.py), so the
+    iframe can paint the right character without waiting for constants or the card's init message.
+    """
+
+    url = ASSET_URL + "/{path:.+}"
+    name = "macs:assets"
+    requires_auth = False
+
+    async def get(self, request: web.Request, path: str) -> web.StreamResponse:
+        hass = request.app["hass"]
+        registry = async_get_asset_registry(hass)
+        asset = registry.get(path) if registry is not None else None
+        if asset is None:
+            raise web.HTTPNotFound()
+
+        if path == FRONTEND_ENTRY and request.get(KEY_AUTHENTICATED):
+            return await self._async_render(request, registry, asset)
+
+        encoding = None
+        if asset.content_type in COMPRESSIBLE_TYPES and len(asset.content) >= MIN_COMPRESS_SIZE:
+            encoding = preferred_encoding(request.headers.get("Accept-Encoding", ""))
+
+        # Each encoding is its own representation, so it gets its own (strong) ETag.
+        etag = f'"{asset.digest}-{encoding}"' if encoding else f'"{asset.digest}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": IMMUTABLE_CACHE if request.query.get(HASH_PARAM) == asset.digest else REVALIDATE_CACHE,
+        }
+        if asset.content_type in COMPRESSIBLE_TYPES:
+            headers["Vary"] = "Accept-Encoding"
+        if etag in request.headers.get("If-None-Match", ""):
+            return web.Response(status=304, headers=headers)
+
+        body = asset.content
+        if encoding:
+            body = registry.compressed.get(asset, encoding)
+            if body is None:
+                body = await hass.async_add_executor_job(_compress, asset.content, encoding)
+                registry.compressed.put(asset, encoding, body)
+            headers["Content-Encoding"] = encoding
+        return web.Response(body=body, content_type=asset.content_type, headers=headers)
+
+    @staticmethod
+    async def _async_render(request: web.Request, registry: MacsAssetRegistry, asset: MacsAsset) -> web.Response:
+        hass = request.app["hass"]
+        catalog = await async_load_catalog(hass)
+        body = render_frontend(registry, asset, catalog, async_build_snapshot(hass), request.query.get("theme"))
+        headers = {"Cache-Control": NO_STORE, "Vary": "Accept-Encoding"}
+        encoding = preferred_encoding(request.headers.get("Accept-Encoding", ""))
+        if encoding:
+            body = await hass.async_add_executor_job(_compress, body, encoding)
+            headers["Content-Encoding"] = encoding
+        return web.Response(body=body, content_type=asset.content_type, headers=headers)
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+from typing import Any, Callable
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DOMAIN, EVENT_TURN
+
+_LOGGER = logging.getLogger(__name__)
+
+# hass.data key of the assist_pipeline integration (PipelineData with .pipeline_debug).
+# assist_pipeline fires no bus events for its runs (they only go to the caller of each run), and its
+# own pipeline_debug websocket commands read this same data, so there is no public source to use.
+# The data is private and read defensively: if its shape changes, turns are simply not tracked.
+ASSIST_PIPELINE_DATA = "assist_pipeline"
+
+# Pipeline events can still arrive after the conversation entity changed; look again after these delays.
+RECHECK_DELAYS = (0.25, 0.7)
+
+# Parsed runs kept, so a run is only parsed again when new events were added to it.
+MAX_CACHED_RUNS = 20
+
+
+def extract_turn(events: list[Any]) -> dict[str, str]:
+    """Pull heard/reply/error/ts out of pipeline debug events (extract() in assistPipeline.js)."""
+    heard = reply = error = ts = ""
+    for event in events:
+        event_type = str(getattr(event, "type", ""))
+        data = getattr(event, "data", None) or {}
+        timestamp = getattr(event, "timestamp", "")
+        if not ts and timestamp:
+            ts = str(timestamp)
+        if not heard and event_type == "intent-start":
+            heard = data.get("intent_input") or ""
+        if event_type == "stt-end":
+            heard = ((data.get("stt_output") or {}).get("text")) or heard
+        if event_type == "intent-end":
+            speech = ((((data.get("intent_output") or {}).get("response") or {}).get("speech") or {}).get("plain") or {})
+            reply = speech.get("speech") or reply
+        if event_type == "error":
+            error = f"{data.get('code') or 'error'}: {data.get('message') or ''}".strip()
+    return {"heard": heard, "reply": reply, "error": error, "ts": ts}
+
+
+class MacsPipelineTracker:
+    """
+    Follows Assist pipeline runs once for all cards and all config entries.
+
+    When a conversation entity changes, the newest run of each pipeline is read straight from the
+    assist_pipeline debug data and parsed. Parsed runs are cached by run id, and every new or changed
+    turn is fired as a macs_turn event: {id, pipeline_id, heard, reply, error, ts}.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._runs: OrderedDict[str, tuple[int, dict[str, str]]] = OrderedDict()
+        self._unsub_bus: Callable[[], None] | None = None
+        self._unsub_timers: list[Callable[[], None]] = []
+        # Config entries using this tracker (see async_use_pipeline_tracker).
+        self.users = 0
+        self._read_failed = False
+
+    @callback
+    def async_start(self) -> None:
+        self._unsub_bus = self.hass.bus.async_listen(
+            EVENT_STATE_CHANGED, self._async_conversation_changed, event_filter=self._is_conversation_event
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        if self._unsub_bus is not None:
+            self._unsub_bus()
+            self._unsub_bus = None
+        for unsub in self._unsub_timers:
+            unsub()
+        self._unsub_timers.clear()
+
+    def recent_turns(self, pipeline_id: str | None = None) -> list[dict[str, str]]:
+        """Cached turns, newest first."""
+        turns = [turn for _, turn in reversed(self._runs.values())]
+        if pipeline_id:
+            turns = [turn for turn in turns if turn["pipeline_id"] == pipeline_id]
+        return turns
+
+    @staticmethod
+    @callback
+    def _is_conversation_event(event_data: Any) -> bool:
+        data = getattr(event_data, "data", event_data)
+        return str(data.get("entity_id", "")).startswith("conversation.")
+
+    @callback
+    def _async_conversation_changed(self, event: Event) -> None:
+        self._async_check_runs()
+        for delay in RECHECK_DELAYS:
+            self._schedule_recheck(delay)
+
+    def _schedule_recheck(self, delay: float) -> None:
+        unsub: Callable[[], None] | None = None
+
+        @callback
+        def _recheck(_now) -> None:
+            if unsub in self._unsub_timers:
+                self._unsub_timers.remove(unsub)
+            self._async_check_runs()
+
+        unsub = async_call_later(self.hass, delay, _recheck)
+        self._unsub_timers.append(unsub)
+
+    @callback
+    def _async_check_runs(self) -> None:
+        try:
+            latest = self._latest_runs()
+        except Exception:  # private data of another integration, any shape is possible
+            if not self._read_failed:
+                self._read_failed = True
+                _LOGGER.warning("Macs could not read Assist pipeline runs; turns are not tracked", exc_info=True)
+            return
+        for pipeline_id, run_id, run in latest:
+            self._async_update_run(pipeline_id, run_id, run)
+
+    def _latest_runs(self) -> list[tuple[str, str, Any]]:
+        """(pipeline_id, run_id, run) of the newest run of each pipeline in the assist_pipeline debug data."""
+        pipeline_data = self.hass.data.get(ASSIST_PIPELINE_DATA)
+        pipeline_debug = getattr(pipeline_data, "pipeline_debug", None)
+        if not isinstance(pipeline_debug, dict):
+            return []
+        latest = []
+        for pipeline_id, runs in list(pipeline_debug.items()):
+            if not isinstance(runs, dict) or not runs:
+                continue
+            run_id = next(reversed(runs))
+            latest.append((pipeline_id, run_id, runs[run_id]))
+        return latest
+
+    @callback
+    def _async_update_run(self, pipeline_id: str, run_id: str, run: Any) -> None:
+        events = getattr(run, "events", None)
+        events = list(events) if isinstance(events, list) else []
+        cached = self._runs.get(run_id)
+        if cached is not None and cached[0] == len(events):
+            return
+        parsed = extract_turn(events)
+        if not (parsed["heard"] or parsed["reply"] or parsed["error"]):
+            return
+        turn = {"id": run_id, "pipeline_id": pipeline_id, **parsed}
+        changed = cached is None or cached[1] != turn
+        self._runs[run_id] = (len(events), turn)
+        self._runs.move_to_end(run_id)
+        while len(self._runs) > MAX_CACHED_RUNS:
+            self._runs.popitem(last=False)
+        if changed:
+            self.hass.bus.async_fire(EVENT_TURN, turn)
+
+
+def async_get_pipeline_tracker(hass: HomeAssistant) -> MacsPipelineTracker | None:
+    return hass.data.get(DOMAIN, {}).get("pipeline_tracker")
+
+
+@callback
+def async_use_pipeline_tracker(hass: HomeAssistant) -> Callable[[], None]:
+    """
+    Start the shared tracker for a config entry, creating it on first use.
+
+    Returns the callback that releases it again; the tracker stops once the last entry released it,
+    so every turn is fired as one macs_turn event however many entries are loaded.
+    """
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    tracker = domain_data.get("pipeline_tracker")
+    if tracker is None:
+        tracker = domain_data["pipeline_tracker"] = MacsPipelineTracker(hass)
+        tracker.async_start()
+    tracker.users += 1
+    released = False
+
+    @callback
+    def _async_release() -> None:
+        nonlocal released
+        if released:
+            return
+        released = True
+        tracker.users -= 1
+        if tracker.users > 0:
+            return
+        tracker.async_stop()
+        if hass.data.get(DOMAIN, {}).get("pipeline_tracker") is tracker:
+            hass.data[DOMAIN].pop("pipeline_tracker")
+
+    return _async_release
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import json
+import posixpath
+import re
+from collections.abc import Callable
+
+# Entry modules bundled when bundling is on: the Lovelace card and the iframe runtime.
+CARD_BUNDLE_ENTRY = "macs.js"
+FRONTEND_BUNDLE_ENTRY = "frontend/scripts/MacsFrontend.js"
+
+# importWithVersion() resolves its argument against its own module, not the caller's.
+IMPORT_HANDLER_DIR = "frontend/scripts"
+
+# Per-theme stylesheets: the theme (with its @imports inlined) followed by the shared sheets, in
+# the order macs.html links them, written to STYLE_BUNDLE_DIR/<theme>.css.
+THEME_DIR = "frontend/styles/themes"
+STYLE_BUNDLE_DIR = "frontend/styles/bundles"
+SHARED_STYLESHEETS = ("frontend/styles/base.css", "frontend/styles/moods.css", "frontend/styles/weather.css")
+
+# import { a, b as c } from "./x.js";  /  import "./x.js";
+_NAMED_IMPORT = re.compile(r"""^[ \t]*import\s*\{([^}]*)\}\s*from\s*(["'])(\.{1,2}/[^"'?#]+)(?:\?[^"']*)?\2[ \t]*;?""", re.M)
+_BARE_IMPORT = re.compile(r"""^[ \t]*import\s*(["'])(\.{1,2}/[^"'?#]+)(?:\?[^"']*)?\1[ \t]*;?""", re.M)
+_OTHER_IMPORT = re.compile(r"""^[ \t]*import\s+[\w*$]""", re.M)
+# export const X / export function X / export class X / export async function X
+_EXPORT_DECLARATION = re.compile(r"""^([ \t]*)export\s+((?:async\s+)?function\*?|class|const|let|var)\s+([\w$]+)""", re.M)
+_EXPORT_LIST = re.compile(r"""^[ \t]*export\s*\{([^}]*)\}[ \t]*;?""", re.M)
+_OTHER_EXPORT = re.compile(r"""^[ \t]*export\b""", re.M)
+_DYNAMIC_IMPORT = re.compile(r"""\bimportWithVersion\(\s*(["'])([^"']+)\1\s*\)""")
+
+_CSS_IMPORT = re.compile(r"""@import\s+(?:url\(\s*)?(["']?)([^"')\s;]+)\1\s*\)?\s*([^;]*);""")
+_CSS_URL = re.compile(r"""url\(\s*(["']?)((?!data:|#|/|[a-z]+:)[^"')]+)\1\s*\)""")
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_STRING = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')""")
+
+
+class BundleError(Exception):
+    """A module uses syntax the bundler doesn't rewrite, or the import graph has a cycle."""
+
+
+def _resolve(base: str, reference: str) -> str:
+    return posixpath.normpath(posixpath.join(base, reference))
+
+
+def _split_names(names: str) -> list[tuple[str, str]]:
+    """'a, b as c' -> [("a", "a"), ("b", "c")]"""
+    pairs = []
+    for part in names.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, alias = part.partition(" as ")
+        pairs.append((name.strip(), (alias or name).strip()))
+    return pairs
+
+
+def module_dependencies(path: str, source: str) -> list[str]:
+    """Modules `path` loads: relative static imports, and importWithVersion() literals."""
+    base = posixpath.dirname(path)
+    deps = [_resolve(base, match.group(3)) for match in _NAMED_IMPORT.finditer(source)]
+    deps += [_resolve(base, match.group(2)) for match in _BARE_IMPORT.finditer(source)]
+    deps += [_resolve(IMPORT_HANDLER_DIR, match.group(2)) for match in _DYNAMIC_IMPORT.finditer(source)]
+    return list(dict.fromkeys(deps))
+
+
+def module_order(entry: str, read: Callable[[str], str]) -> list[str]:
+    """The entry's module graph, dependencies before dependents. Raises BundleError on a cycle."""
+    order: list[str] = []
+    state: dict[str, str] = {}
+
+    def visit(path: str) -> None:
+        if state.get(path) == "done":
+            return
+        if state.get(path) == "visiting":
+            raise BundleError(f"import cycle through {path}")
+        state[path] = "visiting"
+        for dep in module_dependencies(path, read(path)):
+            visit(dep)
+        state[path] = "done"
+        order.append(path)
+
+    visit(entry)
+    return order
+
+
+def wrap_module(path: str, source: str) -> str:
+    """
+    One module as an async factory: imports become awaits on the bundle's loader, exports are
+    returned as the namespace object, and import.meta.url is the module's unbundled URL.
+    """
+    base = posixpath.dirname(path)
+
+    def named_import(match: re.Match) -> str:
+        bindings = ", ".join(name if name == alias else f"{name}: {alias}" for name, alias in _split_names(match.group(1)))
+        return f"const {{ {bindings} }} = await __macsRequire({json.dumps(_resolve(base, match.group(3)))});"
+
+    body = _NAMED_IMPORT.sub(named_import, source)
+    body = _BARE_IMPORT.sub(lambda match: f"await __macsRequire({json.dumps(_resolve(base, match.group(2)))});", body)
+    if _OTHER_IMPORT.search(body):
+        raise BundleError(f"{path}: only named and bare relative imports are bundled")
+
+    exports: list[tuple[str, str]] = []
+
+    def export_declaration(match: re.Match) -> str:
+        exports.append((match.group(3), match.group(3)))
+        return f"{match.group(1)}{match.group(2)} {match.group(3)}"
+
+    def export_list(match: re.Match) -> str:
+        exports.extend(_split_names(match.group(1)))
+        return ""
+
+    body = _EXPORT_DECLARATION.sub(export_declaration, body)
+    body = _EXPORT_LIST.sub(export_list, body)
+    if _OTHER_EXPORT.search(body):
+        raise BundleError(f"{path}: only named exports are bundled")
+    body = body.replace("import.meta.url", "__macsMeta.url")
+
+    namespace = ", ".join(name if name == alias else f"{alias}: {name}" for name, alias in exports)
+    return (
+        f"__macsBundle.define({json.dumps(path)}, __macsBundleMeta({json.dumps(path)}), async (__macsMeta, __macsRequire) => {{\n"
+        f"{body.rstrip()}\n"
+        f"return Object.freeze({{ {namespace} }});\n"
+        f"}});\n"
+    )
+
+
+_PRELUDE = """\
+// M.A.C.S. bundle of {entry}: {count} modules. Disable "Bundle frontend modules" in the integration options to load them separately.
+const __macsBundle = (window.__MACS_BUNDLE__ = window.__MACS_BUNDLE__ || (() => {{
+    const factories = {{}};
+    const loaded = {{}};
+    const load = (path) => loaded[path] || (loaded[path] = factories[path].factory(factories[path].meta, load));
+    return {{
+        define(path, meta, factory) {{ if (!factories[path]) factories[path] = {{ factory, meta }}; }},
+        has: (path) => Object.prototype.hasOwnProperty.call(factories, path),
+        load,
+    }};
+}})());
+"""
+
+
+def bundle(entry: str, read: Callable[[str], str]) -> tuple[str, list[str]]:
+    """
+    Bundle `entry` and every module it loads into one ES module.
+
+    Modules are defined in dependency order and evaluated lazily, each once, as in the browser's
+    module loader; importWithVersion() serves bundled modules from window.__MACS_BUNDLE__.
+    Returns the bundle source and its module paths.
+    """
+    order = module_order(entry, read)
+    root = "../" * entry.count("/") or "./"
+    parts = [
+        _PRELUDE.format(entry=entry, count=len(order)),
+        # Module URLs keep the bundle's query (v=, h=), like the unbundled imports of the entry.
+        f"function __macsBundleMeta(path) {{\n"
+        f"    const url = new URL(path, new URL({json.dumps(root)}, import.meta.url));\n"
+        f"    url.search = new URL(import.meta.url).search;\n"
+        f"    return {{ url: url.href }};\n"
+        f"}}\n",
+    ]
+    parts += [wrap_module(path, read(path)) for path in order]
+    parts.append(f"await __macsBundle.load({json.dumps(entry)});\n")
+    return "\n".join(parts), order
+
+
+def minify_css(css: str) -> str:
+    """Drop comments and the whitespace around punctuation; strings, values and selectors are kept."""
+    parts = _CSS_STRING.split(_CSS_COMMENT.sub("", css))
+    for index in range(0, len(parts), 2):
+        text = re.sub(r"\s+", " ", parts[index])
+        text = re.sub(r"\s*([{};,>])\s*", r"\1", text)
+        parts[index] = re.sub(r":\s+", ":", text).replace(";}", "}")
+    return "".join(parts).strip()
+
+
+def bundle_stylesheet(
+    paths: list[str], read: Callable[[str], str], target: str, url_for: Callable[[str], str] | None = None
+) -> str:
+    """
+    Concatenate stylesheets into one minified sheet at `target`: @imports are inlined (each file
+    once, where it is first imported) and relative url()s rebased onto the target's directory,
+    through `url_for` when given (e.g. to add content hashes).
+    """
+    seen: set[str] = set()
+    target_dir = posixpath.dirname(target)
+
+    def inline(path: str) -> str:
+        if path in seen:
+            return ""
+        seen.add(path)
+        base = posixpath.dirname(path)
+        css = _CSS_COMMENT.sub("", read(path))
+
+        def import_rule(match: re.Match) -> str:
+            if match.group(3).strip():
+                raise BundleError(f"{path}: conditional @import of {match.group(2)}")
+            return inline(_resolve(base, match.group(2)))
+
+        def url(match: re.Match) -> str:
+            resolved = _resolve(base, match.group(2))
+            reference = url_for(resolved) if url_for else posixpath.relpath(resolved, target_dir)
+            return f'url("{reference}")'
+
+        css = _CSS_IMPORT.sub(import_rule, css)
+        return _CSS_URL.sub(url, css)
+
+    return minify_css("\n".join(inline(path) for path in paths))
+
+
+def theme_bundle_path(theme: str) -> str:
+    return f"{STYLE_BUNDLE_DIR}/{theme}.css"
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+CONSTANTS_PATH = Path(__file__).parent / "www" / "shared" / "constants.json"
+THEMES_PATH = Path(__file__).parent / "www" / "frontend" / "styles" / "themes"
+
+
+class MacsCatalog:
+    """
+    Shared frontend constants (www/shared/constants.json) and the available themes.
+
+    Read once with load(), in the executor, then used by entity setup for defaults and options
+    and served to the frontend by macs/catalog. etag changes whenever either of them does.
+    """
+
+    def __init__(self, constants: dict[str, Any], themes: list[str]) -> None:
+        self.constants = constants
+        self.themes = themes
+        payload = json.dumps({"constants": constants, "themes": themes}, sort_keys=True, separators=(",", ":"))
+        self.etag = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+        self.defaults: dict[str, Any] = {}
+        defaults = constants.get("defaults", [])
+        for entry in defaults if isinstance(defaults, list) else []:
+            if isinstance(entry, dict) and entry.get("entity"):
+                self.defaults[str(entry["entity"])] = entry.get("default")
+
+        self.debug_labels: list[str] = []
+        targets = constants.get("debugTargets", [])
+        for entry in targets if isinstance(targets, list) else []:
+            label = str(entry.get("label", "")).strip() if isinstance(entry, dict) else ""
+            if label:
+                self.debug_labels.append(label)
+
+    @classmethod
+    def load(cls, constants_path: Path = CONSTANTS_PATH, themes_path: Path = THEMES_PATH) -> MacsCatalog:
+        """Read the catalog from disk; blocking."""
+        try:
+            constants = json.loads(constants_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            constants = {}
+        if not isinstance(constants, dict):
+            constants = {}
+        themes = sorted(f.stem for f in themes_path.glob("*.css"))
+        return cls(constants, themes)
+
+    def default(self, key: str, fallback: Any) -> Any:
+        """Frontend default for `key`, as the type of `fallback` (which is used when it's missing or invalid)."""
+        value = self.defaults.get(key, fallback)
+        if isinstance(fallback, bool):
+            return value if isinstance(value, bool) else fallback
+        if isinstance(fallback, (int, float)):
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return fallback
+        return str(value) if value is not None else fallback
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"etag": self.etag, "constants": self.constants, "themes": self.themes}
+
+
+async def async_load_catalog(hass: HomeAssistant) -> MacsCatalog:
+    """The catalog, read on first use and then kept for the lifetime of Home Assistant."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    catalog = domain_data.get("catalog")
+    if catalog is None:
+        catalog = await hass.async_add_executor_job(MacsCatalog.load)
+        catalog = domain_data.setdefault("catalog", catalog)
+    return catalog
@@ -1,13 +1,117 @@
 from __future__ import annotations
 
+from typing import Any
+
+import voluptuous as vol
+
 from homeassistant import config_entries
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import selector
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    CONF_AGGREGATE_STATE,
+    CONF_WRITE_COALESCE_WINDOW,
+    CONF_SENSOR_DEADBAND,
+    CONF_WEATHER_CONDITIONS_ENTITY,
+    CONF_MESSAGE_LIMIT,
+    CONF_MESSAGE_RATE,
+    CONF_MESSAGE_MERGE_WINDOW,
+    CONF_BUNDLE_FRONTEND,
+    CONF_SETUP_WARN_THRESHOLD,
+    CONF_METRICS_SENSOR,
+)
+from .messages import DEFAULT_MESSAGE_MERGE_WINDOW, DEFAULT_MESSAGE_RATE
+from .migration import CONFIG_ENTRY_MINOR_VERSION, CONFIG_ENTRY_VERSION
+from .timing import DEFAULT_SETUP_WARN_THRESHOLD
+from .sensors import SENSOR_SPECS, UNIT_ALIASES, sensor_option_key
 
 class MacsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
-    VERSION = 1
+    VERSION = CONFIG_ENTRY_VERSION
+    MINOR_VERSION = CONFIG_ENTRY_MINOR_VERSION
 
     async def async_step_user(self, user_input=None) -> FlowResult:
         # No options in V1; just create a single entry.
-        return self.async_create_entry(title="Macs", data={})
\ No newline at end of file
+        return self.async_create_entry(title="Macs", data={})
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> config_entries.OptionsFlow:
+        return MacsOptionsFlow()
+
+
+class MacsOptionsFlow(config_entries.OptionsFlow):
+    def __init__(self) -> None:
+        self._options: dict[str, Any] = {}
+
+    async def async_step_init(self, user_input=None) -> FlowResult:
+        options = self.config_entry.options
+        if user_input is not None:
+            # Keep options the integration stores for itself (e.g. assist_exposure_initialized).
+            self._options = {**options, **user_input}
+            return await self.async_step_sensors()
+
+        schema = vol.Schema(
+            {
+                vol.Optional(CONF_AGGREGATE_STATE, default=options.get(CONF_AGGREGATE_STATE, False)): bool,
+                vol.Optional(
+                    CONF_WRITE_COALESCE_WINDOW, default=options.get(CONF_WRITE_COALESCE_WINDOW, 0)
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+                vol.Optional(CONF_MESSAGE_LIMIT, default=options.get(CONF_MESSAGE_LIMIT, False)): bool,
+                vol.Optional(
+                    CONF_MESSAGE_RATE, default=options.get(CONF_MESSAGE_RATE, DEFAULT_MESSAGE_RATE)
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=600)),
+                vol.Optional(
+                    CONF_MESSAGE_MERGE_WINDOW,
+                    default=options.get(CONF_MESSAGE_MERGE_WINDOW, DEFAULT_MESSAGE_MERGE_WINDOW),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+                vol.Optional(CONF_BUNDLE_FRONTEND, default=options.get(CONF_BUNDLE_FRONTEND, True)): bool,
+                vol.Optional(
+                    CONF_SETUP_WARN_THRESHOLD,
+                    default=options.get(CONF_SETUP_WARN_THRESHOLD, DEFAULT_SETUP_WARN_THRESHOLD),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=60)),
+                vol.Optional(CONF_METRICS_SENSOR, default=options.get(CONF_METRICS_SENSOR, False)): bool,
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=schema)
+
+    async def async_step_sensors(self, user_input=None) -> FlowResult:
+        """Source sensors the integration normalizes into the MACS numbers and weather condition switches."""
+        if user_input is not None:
+            # Optional fields left empty are absent from user_input; drop their previous values.
+            options = {
+                key: value
+                for key, value in self._options.items()
+                if key != CONF_WEATHER_CONDITIONS_ENTITY
+                and not any(key.startswith(spec["prefix"] + "_") for spec in SENSOR_SPECS.values())
+            }
+            return self.async_create_entry(data={**options, **user_input})
+
+        fields: dict[Any, Any] = {}
+        for attr, spec in SENSOR_SPECS.items():
+            entity_key = sensor_option_key(attr, "entity")
+            unit_key = sensor_option_key(attr, "unit")
+            min_key = sensor_option_key(attr, "min")
+            max_key = sensor_option_key(attr, "max")
+            units = ["auto", *UNIT_ALIASES[spec["kind"]]]
+            fields[vol.Optional(entity_key, description={"suggested_value": self._options.get(entity_key)})] = (
+                selector.EntitySelector(selector.EntitySelectorConfig(domain=["sensor", "number", "input_number"]))
+            )
+            fields[vol.Optional(unit_key, default=self._options.get(unit_key, "auto"))] = selector.SelectSelector(
+                selector.SelectSelectorConfig(options=units, mode=selector.SelectSelectorMode.DROPDOWN)
+            )
+            for key in (min_key, max_key):
+                fields[vol.Optional(key, description={"suggested_value": self._options.get(key)})] = (
+                    selector.NumberSelector(selector.NumberSelectorConfig(mode=selector.NumberSelectorMode.BOX, step="any"))
+                )
+        fields[
+            vol.Optional(
+                CONF_WEATHER_CONDITIONS_ENTITY,
+                description={"suggested_value": self._options.get(CONF_WEATHER_CONDITIONS_ENTITY)},
+            )
+        ] = selector.EntitySelector(selector.EntitySelectorConfig(domain=["weather", "sensor"]))
+        fields[vol.Optional(CONF_SENSOR_DEADBAND, default=self._options.get(CONF_SENSOR_DEADBAND, 0))] = vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=50)
+        )
+        return self.async_show_form(step_id="sensors", data_schema=vol.Schema(fields))
@@ -51,6 +51,13 @@ SERVICE_SEND_ASSISTANT_MESSAGE = "send_assistant_message"
 ATTR_MESSAGE = "message"
 
 EVENT_MESSAGE = "macs_message"
+EVENT_TURN = "macs_turn"
+
+SERVICE_SET_STATE = "set_state"
+
+SERVICE_START_RECORDING = "start_recording"
+SERVICE_STOP_RECORDING = "stop_recording"
+ATTR_DURATION = "duration"
 
 SERVICE_SET_WEATHER_CONDITIONS_SNOWY = "set_weather_conditions_snowy"
 ATTR_WEATHER_CONDITIONS_SNOWY = "weather_conditions_snowy"
@@ -78,3 +85,21 @@ SERVICE_SET_WEATHER_CONDITIONS_CLEAR_NIGHT = "set_weather_conditions_clear_night
 ATTR_WEATHER_CONDITIONS_CLEAR_NIGHT = "weather_conditions_clear_night"
 SERVICE_SET_WEATHER_CONDITIONS_EXCEPTIONAL = "set_weather_conditions_exceptional"
 ATTR_WEATHER_CONDITIONS_EXCEPTIONAL = "weather_conditions_exceptional"
+
+# Dispatcher signal sent whenever a MACS entity writes its state.
+SIGNAL_STATE_UPDATED = "macs_state_updated"
+
+# Options flow settings
+CONF_AGGREGATE_STATE = "aggregate_state"
+CONF_WRITE_COALESCE_WINDOW = "write_coalesce_window"
+CONF_SENSOR_DEADBAND = "sensor_deadband"
+CONF_WEATHER_CONDITIONS_ENTITY = "weather_conditions_entity"
+CONF_MESSAGE_LIMIT = "message_limit"
+CONF_MESSAGE_RATE = "message_rate"
+CONF_MESSAGE_MERGE_WINDOW = "message_merge_window"
+CONF_BUNDLE_FRONTEND = "bundle_frontend"
+CONF_SETUP_WARN_THRESHOLD = "setup_warn_threshold"
+CONF_METRICS_SENSOR = "metrics_sensor"
+
+# Option keys written by the integration itself rather than the options flow.
+INTERNAL_OPTIONS = ("assist_exposure_initialized",)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .assets import async_get_asset_registry
+from .const import DOMAIN
+from .metrics import async_get_metrics
+from .state import entity_handles
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Diagnostics for a MACS config entry: options, setup phase timings, per-entity write counters, service and event metrics, message limiter and asset cache counters."""
+    writes: dict[str, Any] = {}
+    for unique_id, entity in sorted(entity_handles(hass, entry.entry_id).items()):
+        writes[unique_id] = {"entity_id": entity.entity_id, **entity.write_stats()}
+
+    entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
+    limiter = entry_data.get("message_limiter")
+    setup_timer = entry_data.get("setup_timer")
+    deferred_setup_timer = entry_data.get("deferred_setup_timer")
+    assets = async_get_asset_registry(hass)
+
+    return {
+        "options": dict(entry.options),
+        "setup": setup_timer.as_dict() if setup_timer is not None else None,
+        "deferred_setup": deferred_setup_timer.as_dict() if deferred_setup_timer is not None else None,
+        "writes": writes,
+        "totals": {
+            key: sum(stats[key] for stats in writes.values())
+            for key in ("state_writes", "suppressed_writes", "coalesced_writes")
+        },
+        "metrics": async_get_metrics(hass).as_dict(),
+        "messages": dict(limiter.stats) if limiter is not None else None,
+        "assets": {
+            "files": len(assets.assets),
+            "bytes": sum(len(asset.content) for asset in assets.assets.values()),
+            "bundles": {entry: len(modules) for entry, modules in assets.bundles.items()},
+            "compressed_entries": len(assets.compressed),
+            "compressed_bytes": assets.compressed.size,
+            **assets.compressed.stats,
+        }
+        if assets is not None
+        else None,
+    }
@@ -1,86 +1,130 @@
 from __future__ import annotations
 
-import json
-from pathlib import Path
+import time
+from typing import Any
 
 from homeassistant.components.select import SelectEntity
 from homeassistant.components.number import NumberEntity, NumberMode
 from homeassistant.components.switch import SwitchEntity
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.core import callback
 from homeassistant.helpers.device_registry import DeviceInfo
-from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.dispatcher import async_dispatcher_connect, async_dispatcher_send
+from homeassistant.helpers.entity import Entity, EntityCategory
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.restore_state import RestoreEntity
 
-from .const import DOMAIN, MOODS, MACS_DEVICE
-
-def _load_debug_labels() -> list[str]:
-    path = Path(__file__).parent / "www" / "shared" / "constants.json"
-    try:
-        raw = json.loads(path.read_text(encoding="utf-8"))
-    except (OSError, json.JSONDecodeError):
-        return []
-    if isinstance(raw, dict):
-        raw = raw.get("debugTargets", [])
-    if not isinstance(raw, list):
-        return []
-    labels: list[str] = []
-    for entry in raw:
-        if not isinstance(entry, dict):
-            continue
-        label = str(entry.get("label", "")).strip()
-        if label:
-            labels.append(label)
-    return labels
-
-
-def _load_frontend_defaults() -> dict:
-    path = Path(__file__).parent / "www" / "shared" / "constants.json"
-    try:
-        raw = json.loads(path.read_text(encoding="utf-8"))
-    except (OSError, json.JSONDecodeError):
-        return {}
-    if not isinstance(raw, dict):
-        return {}
-    defaults = raw.get("defaults", [])
-    if not isinstance(defaults, list):
-        return {}
-    mapped = {}
-    for entry in defaults:
-        if not isinstance(entry, dict):
-            continue
-        entity = entry.get("entity")
-        if not entity:
-            continue
-        mapped[str(entity)] = entry.get("default")
-    return mapped
-
-
-_FRONTEND_DEFAULTS = _load_frontend_defaults()
-
-
-def _get_default_number(key: str, fallback: float) -> float:
-    value = _FRONTEND_DEFAULTS.get(key, fallback)
-    try:
-        return float(value)
-    except (TypeError, ValueError):
-        return fallback
-
-
-def _get_default_str(key: str, fallback: str) -> str:
-    value = _FRONTEND_DEFAULTS.get(key, fallback)
-    return str(value) if value is not None else fallback
-
-
-def _get_default_bool(key: str, fallback: bool) -> bool:
-    value = _FRONTEND_DEFAULTS.get(key, fallback)
-    return value if isinstance(value, bool) else fallback
-
-
-DEFAULT_MOOD = _get_default_str("mood", "idle")
-if DEFAULT_MOOD not in MOODS:
-    DEFAULT_MOOD = "idle"
+from .catalog import MacsCatalog
+from .const import DOMAIN, MOODS, MACS_DEVICE, SIGNAL_STATE_UPDATED, CONF_WRITE_COALESCE_WINDOW
+from .metrics import MacsMetrics
+from .state import async_build_snapshot, entity_handles
+
+
+# Base for every MACS entity: keeps a handle to the entity object in the per-entry
+# handle table while it is added, so services can set values without a service-registry round trip,
+# and signals every state write so aggregate views of the MACS state can follow along.
+class MacsEntity(Entity):
+    # High-frequency entities publish at most once per configured coalescing window.
+    _macs_coalesce_writes = False
+
+    _macs_state_writes = 0
+    _macs_suppressed_writes = 0
+    _macs_coalesced_writes = 0
+    _macs_last_write = 0.0
+    _macs_pending_write = None
+
+    # (key in constants.json "defaults", fallback) for the initial value, read from the catalog.
+    _macs_default: tuple[str, Any] | None = None
+
+    def __init__(self, catalog: MacsCatalog) -> None:
+        super().__init__()
+        if self._macs_default is None:
+            return
+        key, fallback = self._macs_default
+        value = catalog.default(key, fallback)
+        if isinstance(self, NumberEntity):
+            self._attr_native_value = value
+        elif isinstance(self, SwitchEntity):
+            self._attr_is_on = value
+        else:
+            options = list(self._attr_options or [])
+            if value not in options:
+                value = fallback if fallback in options or not options else options[0]
+            self._attr_current_option = value
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        super().async_write_ha_state()
+        self._macs_state_writes += 1
+        self._macs_last_write = time.monotonic()
+        async_dispatcher_send(self.hass, SIGNAL_STATE_UPDATED, self.unique_id)
+
+    @callback
+    def _async_update_value(self, attr: str, value) -> None:
+        """Set an _attr_* value and publish it; unchanged values are not written."""
+        if getattr(self, attr) == value:
+            self._macs_suppressed_writes += 1
+            return
+        setattr(self, attr, value)
+
+        window = self._coalesce_window()
+        if window <= 0:
+            self.async_write_ha_state()
+            return
+        if self._macs_pending_write is not None:
+            # A write is already scheduled and will publish this (latest) value.
+            self._macs_coalesced_writes += 1
+            return
+        wait = self._macs_last_write + window - time.monotonic()
+        if wait <= 0:
+            self.async_write_ha_state()
+            return
+        self._macs_pending_write = async_call_later(self.hass, wait, self._async_flush_pending_write)
+
+    @callback
+    def _async_flush_pending_write(self, _now) -> None:
+        self._macs_pending_write = None
+        self.async_write_ha_state()
+
+    @callback
+    def async_flush_pending_write(self) -> None:
+        """Publish a coalesced value still waiting for its window right away."""
+        if self._macs_pending_write is None:
+            return
+        self._macs_pending_write()
+        self._async_flush_pending_write(None)
+
+    def _coalesce_window(self) -> float:
+        if not self._macs_coalesce_writes or self.platform is None or self.platform.config_entry is None:
+            return 0.0
+        try:
+            return float(self.platform.config_entry.options.get(CONF_WRITE_COALESCE_WINDOW, 0))
+        except (TypeError, ValueError):
+            return 0.0
+
+    def write_stats(self) -> dict[str, int]:
+        return {
+            "state_writes": self._macs_state_writes,
+            "suppressed_writes": self._macs_suppressed_writes,
+            "coalesced_writes": self._macs_coalesced_writes,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        entity_handles(self.hass, self.platform.config_entry.entry_id)[self.unique_id] = self
+
+    async def async_will_remove_from_hass(self) -> None:
+        if self._macs_pending_write is not None:
+            self._macs_pending_write()
+            self._macs_pending_write = None
+        handles = entity_handles(self.hass, self.platform.config_entry.entry_id)
+        if handles.get(self.unique_id) is self:
+            handles.pop(self.unique_id)
+        await super().async_will_remove_from_hass()
+
 
 # macs_mood dropdown select entity
-class MacsMoodSelect(SelectEntity, RestoreEntity):
+class MacsMoodSelect(MacsEntity, SelectEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Mood"
     _attr_translation_key = "mood"
@@ -88,12 +132,11 @@ class MacsMoodSelect(SelectEntity, RestoreEntity):
     _attr_suggested_object_id = "macs_mood"
     _attr_icon = "mdi:emoticon"
     _attr_options = MOODS
-    _attr_current_option = DEFAULT_MOOD
+    _macs_default = ("mood", "idle")
 
     async def async_select_option(self, option: str) -> None:
         if option in MOODS:
-            self._attr_current_option = option
-            self.async_write_ha_state()
+            self._async_update_value("_attr_current_option", option)
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -107,7 +150,7 @@ class MacsMoodSelect(SelectEntity, RestoreEntity):
 
 
 # macs_brightness number entity
-class MacsBrightnessNumber(NumberEntity, RestoreEntity):
+class MacsBrightnessNumber(MacsEntity, NumberEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Brightness"
     _attr_translation_key = "brightness"
@@ -120,11 +163,11 @@ class MacsBrightnessNumber(NumberEntity, RestoreEntity):
     _attr_native_step = 1
     _attr_native_unit_of_measurement = "%"
     _attr_mode = NumberMode.SLIDER
-    _attr_native_value = _get_default_number("brightness", 100)
+    _macs_coalesce_writes = True
+    _macs_default = ("brightness", 100)
 
     async def async_set_native_value(self, value: float) -> None:
-        self._attr_native_value = max(0, min(100, value))
-        self.async_write_ha_state()
+        self._async_update_value("_attr_native_value", max(0, min(100, value)))
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -142,7 +185,7 @@ class MacsBrightnessNumber(NumberEntity, RestoreEntity):
         return MACS_DEVICE
 
 
-class MacsBatteryChargeNumber(NumberEntity, RestoreEntity):
+class MacsBatteryChargeNumber(MacsEntity, NumberEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Battery Charge"
     _attr_translation_key = "battery_charge"
@@ -155,11 +198,10 @@ class MacsBatteryChargeNumber(NumberEntity, RestoreEntity):
     _attr_native_step = 1
     _attr_native_unit_of_measurement = "%"
     _attr_mode = NumberMode.SLIDER
-    _attr_native_value = _get_default_number("battery_charge", 100)
+    _macs_default = ("battery_charge", 100)
 
     async def async_set_native_value(self, value: float) -> None:
-        self._attr_native_value = max(0, min(100, value))
-        self.async_write_ha_state()
+        self._async_update_value("_attr_native_value", max(0, min(100, value)))
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -177,7 +219,7 @@ class MacsBatteryChargeNumber(NumberEntity, RestoreEntity):
         return MACS_DEVICE
 
 
-class MacsTemperatureNumber(NumberEntity, RestoreEntity):
+class MacsTemperatureNumber(MacsEntity, NumberEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Temperature"
     _attr_translation_key = "temperature"
@@ -190,11 +232,10 @@ class MacsTemperatureNumber(NumberEntity, RestoreEntity):
     _attr_native_step = 1
     _attr_native_unit_of_measurement = "%"
     _attr_mode = NumberMode.SLIDER
-    _attr_native_value = _get_default_number("temperature", 22)
+    _macs_default = ("temperature", 22)
 
     async def async_set_native_value(self, value: float) -> None:
-        self._attr_native_value = max(0, min(100, value))
-        self.async_write_ha_state()
+        self._async_update_value("_attr_native_value", max(0, min(100, value)))
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -212,7 +253,7 @@ class MacsTemperatureNumber(NumberEntity, RestoreEntity):
         return MACS_DEVICE
 
 
-class MacsWindSpeedNumber(NumberEntity, RestoreEntity):
+class MacsWindSpeedNumber(MacsEntity, NumberEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Wind Speed"
     _attr_translation_key = "windspeed"
@@ -225,11 +266,11 @@ class MacsWindSpeedNumber(NumberEntity, RestoreEntity):
     _attr_native_step = 1
     _attr_native_unit_of_measurement = "%"
     _attr_mode = NumberMode.SLIDER
-    _attr_native_value = _get_default_number("windspeed", 0)
+    _macs_coalesce_writes = True
+    _macs_default = ("windspeed", 0)
 
     async def async_set_native_value(self, value: float) -> None:
-        self._attr_native_value = max(0, min(100, value))
-        self.async_write_ha_state()
+        self._async_update_value("_attr_native_value", max(0, min(100, value)))
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -247,7 +288,7 @@ class MacsWindSpeedNumber(NumberEntity, RestoreEntity):
         return MACS_DEVICE
 
 
-class MacsPrecipitationNumber(NumberEntity, RestoreEntity):
+class MacsPrecipitationNumber(MacsEntity, NumberEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Precipitation"
     _attr_translation_key = "precipitation"
@@ -260,11 +301,11 @@ class MacsPrecipitationNumber(NumberEntity, RestoreEntity):
     _attr_native_step = 1
     _attr_native_unit_of_measurement = "%"
     _attr_mode = NumberMode.SLIDER
-    _attr_native_value = _get_default_number("precipitation", 0)
+    _macs_coalesce_writes = True
+    _macs_default = ("precipitation", 0)
 
     async def async_set_native_value(self, value: float) -> None:
-        self._attr_native_value = max(0, min(100, value))
-        self.async_write_ha_state()
+        self._async_update_value("_attr_native_value", max(0, min(100, value)))
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -282,22 +323,20 @@ class MacsPrecipitationNumber(NumberEntity, RestoreEntity):
         return MACS_DEVICE
 
 
-class MacsAnimationsEnabledSwitch(SwitchEntity, RestoreEntity):
+class MacsAnimationsEnabledSwitch(MacsEntity, SwitchEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Animations Enabled"
     _attr_translation_key = "animations_enabled"
     _attr_unique_id = "macs_animations_enabled"
     _attr_suggested_object_id = "macs_animations_enabled"
     _attr_icon = "mdi:animation"
-    _attr_is_on = _get_default_bool("animations_enabled", True)
+    _macs_default = ("animations_enabled", True)
 
     async def async_turn_on(self, **kwargs) -> None:
-        self._attr_is_on = True
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", True)
 
     async def async_turn_off(self, **kwargs) -> None:
-        self._attr_is_on = False
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", False)
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -311,22 +350,20 @@ class MacsAnimationsEnabledSwitch(SwitchEntity, RestoreEntity):
         return MACS_DEVICE
 
 
-class MacsChargingSwitch(SwitchEntity, RestoreEntity):
+class MacsChargingSwitch(MacsEntity, SwitchEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Charging"
     _attr_translation_key = "charging"
     _attr_unique_id = "macs_charging"
     _attr_suggested_object_id = "macs_charging"
     _attr_icon = "mdi:battery-charging"
-    _attr_is_on = _get_default_bool("charging", False)
+    _macs_default = ("charging", False)
 
     async def async_turn_on(self, **kwargs) -> None:
-        self._attr_is_on = True
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", True)
 
     async def async_turn_off(self, **kwargs) -> None:
-        self._attr_is_on = False
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", False)
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -340,38 +377,28 @@ class MacsChargingSwitch(SwitchEntity, RestoreEntity):
         return MACS_DEVICE
 
 
-_DEBUG_LABELS = _load_debug_labels()
-DEBUG_OPTIONS = (
-    "None",
-    "All",
-    *_DEBUG_LABELS,
-)
-
-DEFAULT_DEBUG = _get_default_str("debug", "None")
-if DEFAULT_DEBUG not in DEBUG_OPTIONS:
-    DEFAULT_DEBUG = "None"
-
-
-class MacsDebugSelect(SelectEntity, RestoreEntity):
+class MacsDebugSelect(MacsEntity, SelectEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Debug"
     _attr_translation_key = "debug"
     _attr_unique_id = "macs_debug"
     _attr_suggested_object_id = "macs_debug"
     _attr_icon = "mdi:bug"
-    _attr_options = DEBUG_OPTIONS
-    _attr_current_option = DEFAULT_DEBUG
     _attr_entity_category = EntityCategory.CONFIG
+    _macs_default = ("debug", "None")
+
+    def __init__(self, catalog: MacsCatalog) -> None:
+        self._attr_options = ["None", "All", *catalog.debug_labels]
+        super().__init__(catalog)
 
     async def async_select_option(self, option: str) -> None:
-        if option in DEBUG_OPTIONS:
-            self._attr_current_option = option
-            self.async_write_ha_state()
+        if option in self._attr_options:
+            self._async_update_value("_attr_current_option", option)
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
         last_state = await self.async_get_last_state()
-        if last_state and last_state.state in DEBUG_OPTIONS:
+        if last_state and last_state.state in self._attr_options:
             self._attr_current_option = last_state.state
 
     @property
@@ -379,22 +406,20 @@ class MacsDebugSelect(SelectEntity, RestoreEntity):
         return MACS_DEVICE
 
 
-class MacsWeatherConditionsSnowySwitch(SwitchEntity, RestoreEntity):
+class MacsWeatherConditionsSnowySwitch(MacsEntity, SwitchEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Snowy"
     _attr_translation_key = "weather_conditions_snowy"
     _attr_unique_id = "macs_weather_conditions_snowy"
     _attr_suggested_object_id = "macs_weather_conditions_snowy"
     _attr_icon = "mdi:snowflake"
-    _attr_is_on = _get_default_bool("weather_conditions_snowy", False)
+    _macs_default = ("weather_conditions_snowy", False)
 
     async def async_turn_on(self, **kwargs) -> None:
-        self._attr_is_on = True
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", True)
 
     async def async_turn_off(self, **kwargs) -> None:
-        self._attr_is_on = False
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", False)
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -408,22 +433,20 @@ class MacsWeatherConditionsSnowySwitch(SwitchEntity, RestoreEntity):
         return MACS_DEVICE
 
 
-class MacsWeatherConditionsCloudySwitch(SwitchEntity, RestoreEntity):
+class MacsWeatherConditionsCloudySwitch(MacsEntity, SwitchEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Cloudy"
     _attr_translation_key = "weather_conditions_cloudy"
     _attr_unique_id = "macs_weather_conditions_cloudy"
     _attr_suggested_object_id = "macs_weather_conditions_cloudy"
     _attr_icon = "mdi:weather-cloudy"
-    _attr_is_on = _get_default_bool("weather_conditions_cloudy", False)
+    _macs_default = ("weather_conditions_cloudy", False)
 
     async def async_turn_on(self, **kwargs) -> None:
-        self._attr_is_on = True
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", True)
 
     async def async_turn_off(self, **kwargs) -> None:
-        self._attr_is_on = False
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", False)
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -437,22 +460,20 @@ class MacsWeatherConditionsCloudySwitch(SwitchEntity, RestoreEntity):
         return MACS_DEVICE
 
 
-class MacsWeatherConditionsRainySwitch(SwitchEntity, RestoreEntity):
+class MacsWeatherConditionsRainySwitch(MacsEntity, SwitchEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Rainy"
     _attr_translation_key = "weather_conditions_rainy"
     _attr_unique_id = "macs_weather_conditions_rainy"
     _attr_suggested_object_id = "macs_weather_conditions_rainy"
     _attr_icon = "mdi:weather-rainy"
-    _attr_is_on = _get_default_bool("weather_conditions_rainy", False)
+    _macs_default = ("weather_conditions_rainy", False)
 
     async def async_turn_on(self, **kwargs) -> None:
-        self._attr_is_on = True
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", True)
 
     async def async_turn_off(self, **kwargs) -> None:
-        self._attr_is_on = False
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", False)
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -466,22 +487,20 @@ class MacsWeatherConditionsRainySwitch(SwitchEntity, RestoreEntity):
         return MACS_DEVICE
 
 
-class MacsWeatherConditionsWindySwitch(SwitchEntity, RestoreEntity):
+class MacsWeatherConditionsWindySwitch(MacsEntity, SwitchEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Windy"
     _attr_translation_key = "weather_conditions_windy"
     _attr_unique_id = "macs_weather_conditions_windy"
     _attr_suggested_object_id = "macs_weather_conditions_windy"
     _attr_icon = "mdi:weather-windy"
-    _attr_is_on = _get_default_bool("weather_conditions_windy", False)
+    _macs_default = ("weather_conditions_windy", False)
 
     async def async_turn_on(self, **kwargs) -> None:
-        self._attr_is_on = True
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", True)
 
     async def async_turn_off(self, **kwargs) -> None:
-        self._attr_is_on = False
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", False)
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -495,22 +514,20 @@ class MacsWeatherConditionsWindySwitch(SwitchEntity, RestoreEntity):
         return MACS_DEVICE
 
 
-class MacsWeatherConditionsSunnySwitch(SwitchEntity, RestoreEntity):
+class MacsWeatherConditionsSunnySwitch(MacsEntity, SwitchEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Sunny"
     _attr_translation_key = "weather_conditions_sunny"
     _attr_unique_id = "macs_weather_conditions_sunny"
     _attr_suggested_object_id = "macs_weather_conditions_sunny"
     _attr_icon = "mdi:weather-sunny"
-    _attr_is_on = _get_default_bool("weather_conditions_sunny", False)
+    _macs_default = ("weather_conditions_sunny", False)
 
     async def async_turn_on(self, **kwargs) -> None:
-        self._attr_is_on = True
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", True)
 
     async def async_turn_off(self, **kwargs) -> None:
-        self._attr_is_on = False
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", False)
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -524,22 +541,20 @@ class MacsWeatherConditionsSunnySwitch(SwitchEntity, RestoreEntity):
         return MACS_DEVICE
 
 
-class MacsWeatherConditionsStormySwitch(SwitchEntity, RestoreEntity):
+class MacsWeatherConditionsStormySwitch(MacsEntity, SwitchEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Stormy"
     _attr_translation_key = "weather_conditions_stormy"
     _attr_unique_id = "macs_weather_conditions_stormy"
     _attr_suggested_object_id = "macs_weather_conditions_stormy"
     _attr_icon = "mdi:weather-lightning"
-    _attr_is_on = _get_default_bool("weather_conditions_stormy", False)
+    _macs_default = ("weather_conditions_stormy", False)
 
     async def async_turn_on(self, **kwargs) -> None:
-        self._attr_is_on = True
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", True)
 
     async def async_turn_off(self, **kwargs) -> None:
-        self._attr_is_on = False
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", False)
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -553,22 +568,20 @@ class MacsWeatherConditionsStormySwitch(SwitchEntity, RestoreEntity):
         return MACS_DEVICE
 
 
-class MacsWeatherConditionsFoggySwitch(SwitchEntity, RestoreEntity):
+class MacsWeatherConditionsFoggySwitch(MacsEntity, SwitchEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Foggy"
     _attr_translation_key = "weather_conditions_foggy"
     _attr_unique_id = "macs_weather_conditions_foggy"
     _attr_suggested_object_id = "macs_weather_conditions_foggy"
     _attr_icon = "mdi:weather-fog"
-    _attr_is_on = _get_default_bool("weather_conditions_foggy", False)
+    _macs_default = ("weather_conditions_foggy", False)
 
     async def async_turn_on(self, **kwargs) -> None:
-        self._attr_is_on = True
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", True)
 
     async def async_turn_off(self, **kwargs) -> None:
-        self._attr_is_on = False
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", False)
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -582,22 +595,20 @@ class MacsWeatherConditionsFoggySwitch(SwitchEntity, RestoreEntity):
         return MACS_DEVICE
 
 
-class MacsWeatherConditionsHailSwitch(SwitchEntity, RestoreEntity):
+class MacsWeatherConditionsHailSwitch(MacsEntity, SwitchEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Hail"
     _attr_translation_key = "weather_conditions_hail"
     _attr_unique_id = "macs_weather_conditions_hail"
     _attr_suggested_object_id = "macs_weather_conditions_hail"
     _attr_icon = "mdi:weather-hail"
-    _attr_is_on = _get_default_bool("weather_conditions_hail", False)
+    _macs_default = ("weather_conditions_hail", False)
 
     async def async_turn_on(self, **kwargs) -> None:
-        self._attr_is_on = True
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", True)
 
     async def async_turn_off(self, **kwargs) -> None:
-        self._attr_is_on = False
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", False)
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -611,22 +622,20 @@ class MacsWeatherConditionsHailSwitch(SwitchEntity, RestoreEntity):
         return MACS_DEVICE
 
 
-class MacsWeatherConditionsLightningSwitch(SwitchEntity, RestoreEntity):
+class MacsWeatherConditionsLightningSwitch(MacsEntity, SwitchEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Lightning"
     _attr_translation_key = "weather_conditions_lightning"
     _attr_unique_id = "macs_weather_conditions_lightning"
     _attr_suggested_object_id = "macs_weather_conditions_lightning"
     _attr_icon = "mdi:weather-lightning"
-    _attr_is_on = _get_default_bool("weather_conditions_lightning", False)
+    _macs_default = ("weather_conditions_lightning", False)
 
     async def async_turn_on(self, **kwargs) -> None:
-        self._attr_is_on = True
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", True)
 
     async def async_turn_off(self, **kwargs) -> None:
-        self._attr_is_on = False
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", False)
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -640,22 +649,20 @@ class MacsWeatherConditionsLightningSwitch(SwitchEntity, RestoreEntity):
         return MACS_DEVICE
 
 
-class MacsWeatherConditionsPartlyCloudySwitch(SwitchEntity, RestoreEntity):
+class MacsWeatherConditionsPartlyCloudySwitch(MacsEntity, SwitchEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Partly Cloudy"
     _attr_translation_key = "weather_conditions_partlycloudy"
     _attr_unique_id = "macs_weather_conditions_partlycloudy"
     _attr_suggested_object_id = "macs_weather_conditions_partlycloudy"
     _attr_icon = "mdi:weather-partly-cloudy"
-    _attr_is_on = _get_default_bool("weather_conditions_partlycloudy", False)
+    _macs_default = ("weather_conditions_partlycloudy", False)
 
     async def async_turn_on(self, **kwargs) -> None:
-        self._attr_is_on = True
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", True)
 
     async def async_turn_off(self, **kwargs) -> None:
-        self._attr_is_on = False
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", False)
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -669,22 +676,20 @@ class MacsWeatherConditionsPartlyCloudySwitch(SwitchEntity, RestoreEntity):
         return MACS_DEVICE
 
 
-class MacsWeatherConditionsPouringSwitch(SwitchEntity, RestoreEntity):
+class MacsWeatherConditionsPouringSwitch(MacsEntity, SwitchEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Pouring"
     _attr_translation_key = "weather_conditions_pouring"
     _attr_unique_id = "macs_weather_conditions_pouring"
     _attr_suggested_object_id = "macs_weather_conditions_pouring"
     _attr_icon = "mdi:weather-pouring"
-    _attr_is_on = _get_default_bool("weather_conditions_pouring", False)
+    _macs_default = ("weather_conditions_pouring", False)
 
     async def async_turn_on(self, **kwargs) -> None:
-        self._attr_is_on = True
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", True)
 
     async def async_turn_off(self, **kwargs) -> None:
-        self._attr_is_on = False
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", False)
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -698,22 +703,20 @@ class MacsWeatherConditionsPouringSwitch(SwitchEntity, RestoreEntity):
         return MACS_DEVICE
 
 
-class MacsWeatherConditionsClearNightSwitch(SwitchEntity, RestoreEntity):
+class MacsWeatherConditionsClearNightSwitch(MacsEntity, SwitchEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Clear Night"
     _attr_translation_key = "weather_conditions_clear_night"
     _attr_unique_id = "macs_weather_conditions_clear_night"
     _attr_suggested_object_id = "macs_weather_conditions_clear_night"
     _attr_icon = "mdi:weather-night"
-    _attr_is_on = _get_default_bool("weather_conditions_clear_night", False)
+    _macs_default = ("weather_conditions_clear_night", False)
 
     async def async_turn_on(self, **kwargs) -> None:
-        self._attr_is_on = True
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", True)
 
     async def async_turn_off(self, **kwargs) -> None:
-        self._attr_is_on = False
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", False)
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -727,22 +730,20 @@ class MacsWeatherConditionsClearNightSwitch(SwitchEntity, RestoreEntity):
         return MACS_DEVICE
 
 
-class MacsWeatherConditionsExceptionalSwitch(SwitchEntity, RestoreEntity):
+class MacsWeatherConditionsExceptionalSwitch(MacsEntity, SwitchEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Exceptional"
     _attr_translation_key = "weather_conditions_exceptional"
     _attr_unique_id = "macs_weather_conditions_exceptional"
     _attr_suggested_object_id = "macs_weather_conditions_exceptional"
     _attr_icon = "mdi:alert-circle-outline"
-    _attr_is_on = _get_default_bool("weather_conditions_exceptional", False)
+    _macs_default = ("weather_conditions_exceptional", False)
 
     async def async_turn_on(self, **kwargs) -> None:
-        self._attr_is_on = True
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", True)
 
     async def async_turn_off(self, **kwargs) -> None:
-        self._attr_is_on = False
-        self.async_write_ha_state()
+        self._async_update_value("_attr_is_on", False)
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -756,7 +757,7 @@ class MacsWeatherConditionsExceptionalSwitch(SwitchEntity, RestoreEntity):
         return MACS_DEVICE
 
 
-class MacsThemeSelect(SelectEntity, RestoreEntity):
+class MacsThemeSelect(MacsEntity, SelectEntity, RestoreEntity):
     _attr_has_entity_name = True
     _attr_name = "Theme"
     _attr_translation_key = "theme"
@@ -764,32 +765,16 @@ class MacsThemeSelect(SelectEntity, RestoreEntity):
     _attr_suggested_object_id = "macs_theme"
     _attr_icon = "mdi:palette"
     _attr_entity_category = EntityCategory.CONFIG
+    _macs_default = ("theme", "default")
 
-    def __init__(self) -> None:
-        super().__init__()
-        self._themes = self._load_themes()
+    def __init__(self, catalog: MacsCatalog) -> None:
+        self._themes = list(catalog.themes)
         self._attr_options = self._themes
-        self._attr_current_option = self._get_default_theme()
-
-    def _load_themes(self) -> list[str]:
-        path = Path(__file__).parent / "www" / "frontend" / "styles" / "themes"
-        themes: list[str] = []
-        for f in path.glob("*.css"):
-            themes.append(f.stem)
-        return themes
-
-    def _get_default_theme(self) -> str:
-        default_theme = _get_default_str("theme", "default")
-        if default_theme in self._themes:
-            return default_theme
-        if self._themes:
-            return self._themes[0]
-        return "default"
+        super().__init__(catalog)
 
     async def async_select_option(self, option: str) -> None:
         if option in self._themes:
-            self._attr_current_option = option
-            self.async_write_ha_state()
+            self._async_update_value("_attr_current_option", option)
 
     async def async_added_to_hass(self) -> None:
         await super().async_added_to_hass()
@@ -800,3 +785,104 @@ class MacsThemeSelect(SelectEntity, RestoreEntity):
     @property
     def device_info(self) -> DeviceInfo:
         return MACS_DEVICE
+
+
+# Opt-in aggregate of the whole MACS state: mood as the state, everything else as attributes.
+# Rebuilt from the entity objects after they write, coalesced to one write per event-loop pass,
+# so a macs.set_state call touching many entities produces a single update here.
+class MacsStateSensor(SensorEntity):
+    _attr_has_entity_name = True
+    _attr_name = "State"
+    _attr_translation_key = "state"
+    _attr_unique_id = "macs_state"
+    _attr_suggested_object_id = "macs_state"
+    _attr_icon = "mdi:robot-happy"
+    _attr_should_poll = False
+    # The individual MACS entities are already recorded; don't store everything twice.
+    _unrecorded_attributes = frozenset({
+        "theme",
+        "debug",
+        "brightness",
+        "temperature",
+        "windspeed",
+        "precipitation",
+        "battery_charge",
+        "animations_enabled",
+        "charging",
+        "weather_conditions",
+        "weather_mask",
+    })
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._attr_extra_state_attributes = {}
+        self._publish_scheduled = False
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, SIGNAL_STATE_UPDATED, self._async_schedule_publish)
+        )
+        self._async_refresh()
+
+    @callback
+    def _async_schedule_publish(self, unique_id: str) -> None:
+        if self._publish_scheduled:
+            return
+        self._publish_scheduled = True
+        self.hass.loop.call_soon(self._async_publish)
+
+    @callback
+    def _async_publish(self) -> None:
+        self._publish_scheduled = False
+        if self.hass is None:
+            return
+        if self._async_refresh():
+            self.async_write_ha_state()
+
+    @callback
+    def _async_refresh(self) -> bool:
+        snapshot = async_build_snapshot(self.hass)
+        mood = snapshot.pop("mood")
+        if mood == self._attr_native_value and snapshot == self._attr_extra_state_attributes:
+            return False
+        self._attr_native_value = mood
+        self._attr_extra_state_attributes = snapshot
+        return True
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return MACS_DEVICE
+
+
+class MacsMetricsSensor(SensorEntity):
+    """Service calls handled by the integration, with latency and event counters as attributes; opt-in."""
+
+    _attr_has_entity_name = True
+    _attr_name = "Metrics"
+    _attr_translation_key = "metrics"
+    _attr_unique_id = "macs_metrics"
+    _attr_suggested_object_id = "macs_metrics"
+    _attr_icon = "mdi:speedometer"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_native_unit_of_measurement = "calls"
+    # Polled (see SCAN_INTERVAL in sensor.py) rather than written on every call.
+    _attr_should_poll = True
+    _unrecorded_attributes = frozenset({"services", "state_writes"})
+
+    def __init__(self, metrics: MacsMetrics, entry_id: str) -> None:
+        super().__init__()
+        self._metrics = metrics
+        self._entry_id = entry_id
+        self._attr_native_value = 0
+        self._attr_extra_state_attributes = {}
+
+    async def async_update(self) -> None:
+        data = self._metrics.as_dict(self._entry_id)
+        self._attr_native_value = data.pop("service_calls")
+        self._attr_extra_state_attributes = data
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return MACS_DEVICE
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from functools import partial
+from typing import Any, Callable
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Messages kept per entry; enough to fill the dialogue of any card (max_turns * 2 bubbles).
+MAX_MESSAGES = 50
+
+# Seconds to wait before writing, so a burst of messages costs one disk write.
+SAVE_DELAY = 10
+
+# Limiter defaults (options flow): messages per minute per role, and the burst merge window in seconds.
+DEFAULT_MESSAGE_RATE = 30
+DEFAULT_MESSAGE_MERGE_WINDOW = 0.5
+
+# Messages per role that may be sent back to back before the rate applies.
+MESSAGE_BURST = 5
+
+# A role repeating its previous text within this many seconds, with no message from another role in
+# between, is dropped as a duplicate.
+DEDUP_WINDOW = 30
+
+
+class MacsMessageHistory:
+    """Recent send_user_message / send_assistant_message payloads, oldest first, persisted in .storage."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, f"{DOMAIN}.messages.{entry_id}")
+        self._messages: deque[dict[str, Any]] = deque(maxlen=MAX_MESSAGES)
+
+    async def async_load(self) -> None:
+        data = await self._store.async_load()
+        if not isinstance(data, dict):
+            return
+        for message in data.get("messages", []):
+            if isinstance(message, dict) and message.get("text"):
+                self._messages.append(message)
+
+    @callback
+    def async_add(self, message: dict[str, Any]) -> None:
+        self._messages.append(message)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def recent(self, limit: int = MAX_MESSAGES) -> list[dict[str, Any]]:
+        """The last `limit` messages, oldest first."""
+        if limit <= 0:
+            return []
+        return list(self._messages)[-limit:]
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"messages": list(self._messages)}
+
+
+def async_get_message_history(hass: HomeAssistant) -> MacsMessageHistory | None:
+    """Message history of the (first) loaded MACS entry."""
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+        if entry_data and entry_data.get("messages") is not None:
+            return entry_data["messages"]
+    return None
+
+
+class MacsMessageLimiter:
+    """
+    Rate limiting for send_user_message / send_assistant_message, per role; opt-in (CONF_MESSAGE_LIMIT).
+
+    - A text identical to the role's previous message within DEDUP_WINDOW seconds is dropped, unless
+      another role has sent a message since (the same reply to a new question is kept).
+    - The first message after a quiet period is published right away; messages arriving within
+      the merge window after it are merged (one per line) into a single message published at the
+      end of the window.
+    - Every published message takes a token from the role's bucket (MESSAGE_BURST tokens, refilled
+      at the configured rate per minute); without a token it is dropped. A rate of 0 disables this.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        publish: Callable[[dict[str, Any]], None],
+        rate_per_minute: float = DEFAULT_MESSAGE_RATE,
+        merge_window: float = DEFAULT_MESSAGE_MERGE_WINDOW,
+    ) -> None:
+        self.hass = hass
+        self._publish = publish
+        self._rate = max(0.0, float(rate_per_minute)) / 60
+        self._merge_window = max(0.0, float(merge_window))
+        self._roles: dict[str, dict[str, Any]] = {}
+        self.stats = {"received": 0, "published": 0, "deduplicated": 0, "merged": 0, "dropped": 0}
+
+    def _role(self, role: str) -> dict[str, Any]:
+        state = self._roles.get(role)
+        if state is None:
+            state = self._roles[role] = {
+                "tokens": float(MESSAGE_BURST),
+                "refilled": time.monotonic(),
+                "last_text": None,
+                "last_text_at": 0.0,
+                "last_publish": 0.0,
+                "pending": None,
+                "unsub": None,
+            }
+        return state
+
+    @callback
+    def async_submit(self, message: dict[str, Any]) -> None:
+        now = time.monotonic()
+        role = message["role"]
+        state = self._role(role)
+        self.stats["received"] += 1
+
+        if message["text"] == state["last_text"] and now - state["last_text_at"] < DEDUP_WINDOW:
+            self.stats["deduplicated"] += 1
+            _LOGGER.debug("Dropped repeated %s message: %s", role, message["text"])
+            return
+        state["last_text"] = message["text"]
+        state["last_text_at"] = now
+        # Only consecutive repeats are duplicates; a message from another role ends the run.
+        for other, other_state in self._roles.items():
+            if other != role:
+                other_state["last_text"] = None
+
+        if state["pending"] is not None:
+            pending = state["pending"]
+            pending["text"] = f"{pending['text']}\n{message['text']}"
+            self.stats["merged"] += 1
+            return
+
+        wait = state["last_publish"] + self._merge_window - now
+        if wait <= 0:
+            self._async_publish(role, message)
+            return
+        state["pending"] = dict(message)
+        state["unsub"] = async_call_later(self.hass, wait, partial(self._async_flush_later, role))
+
+    @callback
+    def async_stop(self) -> None:
+        """Publish pending merged messages and cancel their timers."""
+        for role, state in self._roles.items():
+            if state["unsub"] is not None:
+                state["unsub"]()
+                state["unsub"] = None
+            if state["pending"] is not None:
+                self._async_flush(role)
+
+    @callback
+    def _async_flush_later(self, role: str, _now) -> None:
+        self._async_flush(role)
+
+    @callback
+    def _async_flush(self, role: str) -> None:
+        state = self._role(role)
+        state["unsub"] = None
+        message, state["pending"] = state["pending"], None
+        if message is not None:
+            self._async_publish(role, message)
+
+    @callback
+    def _async_publish(self, role: str, message: dict[str, Any]) -> None:
+        now = time.monotonic()
+        state = self._role(role)
+        if self._rate > 0:
+            elapsed = now - state["refilled"]
+            state["tokens"] = min(float(MESSAGE_BURST), state["tokens"] + elapsed * self._rate)
+            state["refilled"] = now
+            if state["tokens"] < 1:
+                self.stats["dropped"] += 1
+                _LOGGER.debug("Dropped %s message over the rate limit: %s", role, message["text"])
+                return
+            state["tokens"] -= 1
+        state["last_publish"] = now
+        self.stats["published"] += 1
+        self._publish(message)
+
+
+def async_get_message_limiter(hass: HomeAssistant) -> MacsMessageLimiter | None:
+    """Message limiter of the (first) loaded MACS entry."""
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+        if entry_data and entry_data.get("message_limiter") is not None:
+            return entry_data["message_limiter"]
+    return None
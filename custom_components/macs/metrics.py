@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+
+from .const import DOMAIN
+from .state import entity_handles
+
+# Latencies kept per service; p50/p95 are over the most recent calls.
+LATENCY_SAMPLES = 200
+
+
+def _percentile(samples: list[float], percent: float) -> float | None:
+    """Nearest-rank percentile of sorted samples."""
+    if not samples:
+        return None
+    rank = max(1, -(-len(samples) * percent // 100))
+    return samples[int(rank) - 1]
+
+
+@dataclass(slots=True)
+class MacsServiceStats:
+    calls: int = 0
+    errors: int = 0
+    latencies: deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+
+    def as_dict(self) -> dict[str, Any]:
+        samples = sorted(self.latencies)
+        p50 = _percentile(samples, 50)
+        p95 = _percentile(samples, 95)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "p50_ms": round(p50 * 1000, 3) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 3) if p95 is not None else None,
+        }
+
+
+class MacsMetrics:
+    """
+    Counters for diagnostics and the optional metrics sensor: per-service calls and latency,
+    macs_message events fired. Recording is a counter increment and a bounded append; percentiles
+    are only computed when read.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self.services: dict[str, MacsServiceStats] = {}
+        self.messages_fired = 0
+
+    def wrap_service(
+        self, service: str, handler: Callable[[ServiceCall], Awaitable[None]]
+    ) -> Callable[[ServiceCall], Awaitable[None]]:
+        """`handler`, counting its calls, failures and duration under `service`."""
+        stats = self.services.setdefault(service, MacsServiceStats())
+
+        async def timed_handler(call: ServiceCall) -> None:
+            started = time.perf_counter()
+            stats.calls += 1
+            try:
+                await handler(call)
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                stats.latencies.append(time.perf_counter() - started)
+
+        return timed_handler
+
+    @callback
+    def async_message_fired(self) -> None:
+        self.messages_fired += 1
+
+    @property
+    def service_calls(self) -> int:
+        return sum(stats.calls for stats in self.services.values())
+
+    def websocket_subscribers(self) -> int:
+        feed = self.hass.data.get(DOMAIN, {}).get("state_feed")
+        return feed.subscriber_count if feed is not None else 0
+
+    def as_dict(self, entry_id: str | None = None) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "services": {service: stats.as_dict() for service, stats in sorted(self.services.items())},
+            "service_calls": self.service_calls,
+            "messages_fired": self.messages_fired,
+            "websocket_subscribers": self.websocket_subscribers(),
+        }
+        if entry_id is not None:
+            data["state_writes"] = {
+                unique_id: entity.write_stats()["state_writes"]
+                for unique_id, entity in sorted(entity_handles(self.hass, entry_id).items())
+                if hasattr(entity, "write_stats")
+            }
+        return data
+
+
+def async_get_metrics(hass: HomeAssistant) -> MacsMetrics:
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    metrics = domain_data.get("metrics")
+    if metrics is None:
+        metrics = domain_data["metrics"] = MacsMetrics(hass)
+    return metrics
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# Config entry version written by the config flow; entries below it are migrated on setup.
+CONFIG_ENTRY_VERSION = 1
+CONFIG_ENTRY_MINOR_VERSION = 2
+
+# Fix ugly auto-generated IDs like select.m_a_c_s_weather, left by older versions of the device name.
+# These must match the _attr_unique_id values in entities.py
+ENTITY_ID_RENAMES: dict[str, str] = {
+    "macs_mood": "select.macs_mood",
+    "macs_brightness": "number.macs_brightness",
+    "macs_battery_charge": "number.macs_battery_charge",
+    "macs_temperature": "number.macs_temperature",
+    "macs_windspeed": "number.macs_windspeed",
+    "macs_precipitation": "number.macs_precipitation",
+    "macs_charging": "switch.macs_charging",
+    "macs_debug": "select.macs_debug",
+    "macs_theme": "select.macs_theme",
+    "macs_weather_conditions_snowy": "switch.macs_weather_conditions_snowy",
+    "macs_weather_conditions_cloudy": "switch.macs_weather_conditions_cloudy",
+    "macs_weather_conditions_rainy": "switch.macs_weather_conditions_rainy",
+    "macs_weather_conditions_windy": "switch.macs_weather_conditions_windy",
+    "macs_weather_conditions_sunny": "switch.macs_weather_conditions_sunny",
+    "macs_weather_conditions_stormy": "switch.macs_weather_conditions_stormy",
+    "macs_weather_conditions_foggy": "switch.macs_weather_conditions_foggy",
+    "macs_weather_conditions_hail": "switch.macs_weather_conditions_hail",
+    "macs_weather_conditions_lightning": "switch.macs_weather_conditions_lightning",
+    "macs_weather_conditions_partlycloudy": "switch.macs_weather_conditions_partlycloudy",
+    "macs_weather_conditions_pouring": "switch.macs_weather_conditions_pouring",
+    "macs_weather_conditions_clear_night": "switch.macs_weather_conditions_clear_night",
+    "macs_weather_conditions_exceptional": "switch.macs_weather_conditions_exceptional",
+}
+
+# Entities replaced by others, as (domain, unique_id): the debug switch became the debug select.
+LEGACY_ENTITIES = (("switch", "macs_debug"),)
+
+
+@dataclass(slots=True)
+class MacsMigrationPlan:
+    """Registry changes collected by the migration steps, applied together by async_apply()."""
+
+    renames: dict[str, str] = field(default_factory=dict)
+    removals: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.renames or self.removals)
+
+    def async_apply(self, registry: er.EntityRegistry) -> None:
+        # Removals first, so a legacy entity doesn't hold on to the ID its replacement is renamed to.
+        for entity_id in self.removals:
+            registry.async_remove(entity_id)
+        for entity_id, desired_entity_id in self.renames.items():
+            # Only rename if the desired entity_id is free
+            if desired_entity_id not in registry.entities:
+                registry.async_update_entity(entity_id, new_entity_id=desired_entity_id)
+
+
+# MACS registry entries, keyed by (domain, unique_id).
+_Entities = dict[tuple[str, str], er.RegistryEntry]
+
+
+def _plan_entity_ids(entities: _Entities, plan: MacsMigrationPlan) -> None:
+    """1.1 -> 1.2: drop the legacy debug switch and rename entities to their macs_* IDs."""
+    for key in LEGACY_ENTITIES:
+        if key in entities:
+            plan.removals.append(entities[key].entity_id)
+    for unique_id, desired_entity_id in ENTITY_ID_RENAMES.items():
+        entity = entities.get((desired_entity_id.split(".", 1)[0], unique_id))
+        if entity is not None and entity.entity_id != desired_entity_id:
+            plan.renames[entity.entity_id] = desired_entity_id
+
+
+# Migration steps by the minor version they migrate to, oldest first.
+MIGRATION_STEPS: tuple[tuple[int, Callable[[_Entities, MacsMigrationPlan], None]], ...] = (
+    (2, _plan_entity_ids),
+)
+
+
+def async_plan_migration(hass: HomeAssistant, entry: ConfigEntry) -> MacsMigrationPlan:
+    """The registry changes that bring `entry` to the current minor version, from one pass over the registry."""
+    plan = MacsMigrationPlan()
+    steps = [step for minor_version, step in MIGRATION_STEPS if entry.minor_version < minor_version]
+    if not steps:
+        return plan
+    entities: _Entities = {
+        (entity.domain, entity.unique_id): entity
+        for entity in er.async_get(hass).entities.values()
+        if entity.platform == DOMAIN
+    }
+    for step in steps:
+        step(entities, plan)
+    return plan
+
+
+async def async_migrate(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    if entry.version > CONFIG_ENTRY_VERSION:
+        # Downgraded from a version that changed the entry in ways this one doesn't understand.
+        return False
+    if entry.minor_version >= CONFIG_ENTRY_MINOR_VERSION:
+        return True
+
+    plan = async_plan_migration(hass, entry)
+    if plan:
+        _LOGGER.debug(
+            "Migrating Macs entry from %s.%s: renaming %s, removing %s",
+            entry.version,
+            entry.minor_version,
+            plan.renames,
+            plan.removals,
+        )
+        plan.async_apply(er.async_get(hass))
+    hass.config_entries.async_update_entry(
+        entry, version=CONFIG_ENTRY_VERSION, minor_version=CONFIG_ENTRY_MINOR_VERSION
+    )
+    return True
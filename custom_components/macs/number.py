@@ -3,6 +3,7 @@ from __future__ import annotations
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from .catalog import async_load_catalog
 from .entities import (
     MacsBrightnessNumber,
     MacsBatteryChargeNumber,
@@ -17,12 +18,13 @@ async def async_setup_entry(
     entry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
+    catalog = await async_load_catalog(hass)
     async_add_entities(
         [
-            MacsBrightnessNumber(),
-            MacsBatteryChargeNumber(),
-            MacsTemperatureNumber(),
-            MacsWindSpeedNumber(),
-            MacsPrecipitationNumber(),
+            MacsBrightnessNumber(catalog),
+            MacsBatteryChargeNumber(catalog),
+            MacsTemperatureNumber(catalog),
+            MacsWindSpeedNumber(catalog),
+            MacsPrecipitationNumber(catalog),
         ]
     )
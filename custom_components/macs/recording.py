@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.const import EVENT_CALL_SERVICE, EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_state_change_event
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, EVENT_MESSAGE, SERVICE_START_RECORDING, SERVICE_STOP_RECORDING
+
+_LOGGER = logging.getLogger(__name__)
+
+# Recordings are written to <config>/macs_recordings/<start time>.jsonl.
+RECORDING_DIR = "macs_recordings"
+RECORDING_FORMAT = 1
+
+# Buffered lines are appended to the file every few seconds, or sooner once this many are waiting.
+FLUSH_INTERVAL = 5
+FLUSH_LINES = 500
+
+
+class MacsTrafficRecorder:
+    """
+    Writes MACS traffic to a JSON-lines file for benchmarks/replay.py.
+
+    The first line is a header; each following line is one record, `t` seconds after the start:
+    {"t": 1.25, "k": "call", "s": "set_mood", "d": {...}}     a macs.* service call
+    {"t": 1.31, "k": "message", "d": {...}}                 a macs_message event
+    {"t": 2.5, "k": "state", "e": "sensor.x", "v": "21.5", "a": {...}}    a source sensor change
+    """
+
+    def __init__(self, hass: HomeAssistant, path: Path, source_entities: Iterable[str]) -> None:
+        self.hass = hass
+        self.path = path
+        self.records = 0
+        self._source_entities = sorted(set(source_entities))
+        self._started = time.monotonic()
+        self._buffer: list[str] = []
+        # Writes run one at a time, in order; a full buffer schedules at most one extra flush.
+        self._flush_lock = asyncio.Lock()
+        self._flush_scheduled = False
+        self._unsubs: list[Callable[[], None]] = []
+        self._unsub_flush: Callable[[], None] | None = None
+        self._unsub_stop: Callable[[], None] | None = None
+
+    async def async_start(self, duration: float | None = None) -> None:
+        header = {
+            "macs_recording": RECORDING_FORMAT,
+            "started": dt_util.utcnow().isoformat(),
+            "source_entities": self._source_entities,
+        }
+        await self.hass.async_add_executor_job(self._write, [self._dumps(header)], "w")
+        self._started = time.monotonic()
+        self._unsubs.append(self.hass.bus.async_listen(EVENT_CALL_SERVICE, self._async_service_called))
+        self._unsubs.append(self.hass.bus.async_listen(EVENT_MESSAGE, self._async_message_fired))
+        self._unsub_stop = self.hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_hass_stopping)
+        if self._source_entities:
+            self._unsubs.append(
+                async_track_state_change_event(self.hass, self._source_entities, self._async_source_changed)
+            )
+        if duration:
+            self._unsubs.append(async_call_later(self.hass, duration, self._async_duration_elapsed))
+
+    async def async_stop(self) -> None:
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs.clear()
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        await self._async_flush()
+        _LOGGER.info("Macs traffic recording stopped: %s records in %s", self.records, self.path)
+
+    @staticmethod
+    def _dumps(record: dict[str, Any]) -> str:
+        return json.dumps(record, separators=(",", ":"), default=str)
+
+    @callback
+    def _async_add(self, record: dict[str, Any]) -> None:
+        self._buffer.append(self._dumps({"t": round(time.monotonic() - self._started, 3), **record}))
+        self.records += 1
+        if len(self._buffer) >= FLUSH_LINES:
+            if not self._flush_scheduled:
+                self._flush_scheduled = True
+                self.hass.async_create_task(self._async_flush())
+        elif self._unsub_flush is None:
+            self._unsub_flush = async_call_later(self.hass, FLUSH_INTERVAL, self._async_flush_later)
+
+    @callback
+    def _async_service_called(self, event: Event) -> None:
+        service = event.data.get("service")
+        if event.data.get("domain") != DOMAIN or service in (SERVICE_START_RECORDING, SERVICE_STOP_RECORDING):
+            return
+        self._async_add({"k": "call", "s": service, "d": dict(event.data.get("service_data") or {})})
+
+    @callback
+    def _async_message_fired(self, event: Event) -> None:
+        self._async_add({"k": "message", "d": dict(event.data)})
+
+    @callback
+    def _async_source_changed(self, event: Event) -> None:
+        state = event.data.get("new_state")
+        if state is None:
+            return
+        attributes = {key: state.attributes[key] for key in ("unit_of_measurement",) if key in state.attributes}
+        self._async_add({"k": "state", "e": state.entity_id, "v": state.state, "a": attributes})
+
+    @callback
+    def _async_flush_later(self, _now) -> None:
+        self._unsub_flush = None
+        self.hass.async_create_task(self._async_flush())
+
+    async def _async_flush(self) -> None:
+        async with self._flush_lock:
+            # Taken under the lock, so lines reach the file in the order they were recorded.
+            self._flush_scheduled = False
+            lines, self._buffer = self._buffer, []
+            if lines:
+                await self.hass.async_add_executor_job(self._write, lines, "a")
+
+    def _write(self, lines: list[str], mode: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open(mode, encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+
+    async def _async_duration_elapsed(self, _now) -> None:
+        await async_stop_recording(self.hass)
+
+    async def _async_hass_stopping(self, _event: Event) -> None:
+        # A listen_once listener is gone once it has fired.
+        self._unsub_stop = None
+        await async_stop_recording(self.hass)
+
+
+def async_get_recorder(hass: HomeAssistant) -> MacsTrafficRecorder | None:
+    return hass.data.get(DOMAIN, {}).get("traffic_recorder")
+
+
+async def async_start_recording(
+    hass: HomeAssistant, source_entities: Iterable[str], duration: float | None = None
+) -> MacsTrafficRecorder:
+    """Start recording to a new file; only one recording runs at a time."""
+    if async_get_recorder(hass) is not None:
+        raise vol.Invalid("A MACS traffic recording is already running")
+    name = dt_util.utcnow().strftime("%Y%m%d-%H%M%S") + ".jsonl"
+    recorder = MacsTrafficRecorder(hass, Path(hass.config.path(RECORDING_DIR, name)), source_entities)
+    hass.data.setdefault(DOMAIN, {})["traffic_recorder"] = recorder
+    try:
+        await recorder.async_start(duration)
+    except Exception:
+        hass.data[DOMAIN].pop("traffic_recorder", None)
+        raise
+    _LOGGER.info("Macs traffic recording started: %s", recorder.path)
+    return recorder
+
+
+async def async_stop_recording(hass: HomeAssistant) -> MacsTrafficRecorder | None:
+    recorder = hass.data.get(DOMAIN, {}).pop("traffic_recorder", None)
+    if recorder is not None:
+        await recorder.async_stop()
+    return recorder
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import TYPE_CHECKING, Any
+
+from .bundle import THEME_DIR, theme_bundle_path
+from .catalog import MacsCatalog
+from .const import MOODS
+from .state import WEATHER_CONDITION_PREFIX
+
+if TYPE_CHECKING:
+    from .assets import MacsAsset, MacsAssetRegistry
+
+DEFAULT_THEME = "default"
+
+_BODY_MOOD = re.compile(r'(<body class=")mood-[a-z_]+')
+
+
+def initial_values(catalog: MacsCatalog, snapshot: dict[str, Any]) -> dict[str, Any]:
+    """Snapshot values keyed by frontend parameter (constants.json "defaults" keys), as the frontend reads them."""
+    conditions = set(snapshot.get("weather_conditions") or ())
+    values: dict[str, Any] = {}
+    defaults = catalog.constants.get("defaults", [])
+    for entry in defaults if isinstance(defaults, list) else []:
+        if not isinstance(entry, dict) or not entry.get("key") or not entry.get("entity"):
+            continue
+        entity = str(entry["entity"])
+        if entity.startswith(WEATHER_CONDITION_PREFIX):
+            value = entity.removeprefix(WEATHER_CONDITION_PREFIX) in conditions
+        else:
+            value = snapshot.get(entity)
+        if value is not None:
+            values[str(entry["key"])] = value
+    if snapshot.get("theme"):
+        values["theme"] = snapshot["theme"]
+    return values
+
+
+def render_frontend(
+    registry: MacsAssetRegistry,
+    page: MacsAsset,
+    catalog: MacsCatalog,
+    snapshot: dict[str, Any],
+    theme: str | None = None,
+) -> bytes:
+    """
+    macs.html with the current state inlined.
+
+    window.__MACS_INITIAL__ carries the catalog and the snapshot (read before query defaults and in
+    place of the constants fetch), the body starts in the current mood, and the theme stylesheet is
+    preloaded, so the first paint already shows the right character.
+    """
+    theme = theme if theme in catalog.themes else snapshot.get("theme")
+    if theme not in catalog.themes:
+        theme = DEFAULT_THEME
+    initial = {
+        "catalog": catalog.as_dict(),
+        "values": initial_values(catalog, snapshot),
+    }
+    # "<" is escaped so no value can close the script element.
+    data = json.dumps(initial, separators=(",", ":")).replace("<", "\\u003c")
+    head = f"<script>window.__MACS_INITIAL__ = {data};</script>\n\t"
+
+    stylesheet = theme_bundle_path(theme)
+    if registry.get(stylesheet) is None:
+        stylesheet = f"{THEME_DIR}/{theme}.css"
+    if registry.get(stylesheet) is not None:
+        head += f'<link rel="preload" as="style" href="{registry.url(stylesheet)}">\n\t'
+
+    text = page.content.decode("utf-8").replace("<title>", head + "<title>", 1)
+    mood = snapshot.get("mood")
+    if mood in MOODS:
+        text = _BODY_MOOD.sub(rf"\g<1>mood-{mood}", text, count=1)
+    return text.encode("utf-8")
@@ -3,6 +3,7 @@ from __future__ import annotations
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from .catalog import async_load_catalog
 from .entities import MacsThemeSelect, MacsMoodSelect, MacsDebugSelect
 
 
@@ -11,10 +12,11 @@ async def async_setup_entry(
     entry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
+    catalog = await async_load_catalog(hass)
     async_add_entities(
         [
-            MacsThemeSelect(),
-            MacsMoodSelect(),
-            MacsDebugSelect(),
+            MacsThemeSelect(catalog),
+            MacsMoodSelect(catalog),
+            MacsDebugSelect(catalog),
         ]
     )
\ No newline at end of file
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN, CONF_AGGREGATE_STATE, CONF_METRICS_SENSOR
+from .entities import MacsMetricsSensor, MacsStateSensor
+from .metrics import async_get_metrics
+
+# Only the metrics sensor polls; counters are read once a minute instead of written on every call.
+SCAN_INTERVAL = timedelta(seconds=60)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    entities = []
+    reg = er.async_get(hass)
+
+    # Both sensors are opt-in; drop an entity if it was switched off again.
+    if entry.options.get(CONF_AGGREGATE_STATE):
+        entities.append(MacsStateSensor())
+    else:
+        entity_id = reg.async_get_entity_id("sensor", DOMAIN, MacsStateSensor._attr_unique_id)
+        if entity_id:
+            reg.async_remove(entity_id)
+
+    if entry.options.get(CONF_METRICS_SENSOR):
+        entities.append(MacsMetricsSensor(async_get_metrics(hass), entry.entry_id))
+    else:
+        entity_id = reg.async_get_entity_id("sensor", DOMAIN, MacsMetricsSensor._attr_unique_id)
+        if entity_id:
+            reg.async_remove(entity_id)
+
+    if entities:
+        async_add_entities(entities)
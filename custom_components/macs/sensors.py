@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import logging
+import re
+from typing import Any, Callable
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import ATTR_UNIT_OF_MEASUREMENT, STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .const import (
+    CONF_SENSOR_DEADBAND,
+    CONF_WEATHER_CONDITIONS_ENTITY,
+    ATTR_TEMPERATURE,
+    ATTR_WINDSPEED,
+    ATTR_PRECIPITATION,
+    ATTR_BATTERY_CHARGE,
+)
+from .state import WEATHER_CONDITION_PREFIX, async_apply_state
+
+_LOGGER = logging.getLogger(__name__)
+
+# Server-side port of the numeric normalization in www/backend/sensorHandler.js and validators.js.
+# Keep the default ranges and unit aliases in sync with www/shared/constants.js
+
+DEFAULT_MAX_TEMP_C = 30
+DEFAULT_MIN_TEMP_C = 5
+DEFAULT_MAX_WIND_MPH = 50
+DEFAULT_MIN_WIND_MPH = 10
+DEFAULT_MAX_RAIN_MM = 10
+DEFAULT_MIN_RAIN_MM = 0
+
+# unit id -> aliases (matched lower-cased), per unit kind
+UNIT_ALIASES: dict[str, dict[str, tuple[str, ...]]] = {
+    "temp": {
+        "c": ("c", "°c", "celsius", "degc", "degree c", "degrees c", "degree celsius", "degrees celsius"),
+        "f": ("f", "°f", "fahrenheit", "degf", "degree f", "degrees f", "degree fahrenheit", "degrees fahrenheit"),
+    },
+    "wind": {
+        "mph": ("mph", "mi/h", "mile per hour", "miles per hour", "m/h"),
+        "kph": ("kph", "km/h", "kmh", "kilometre per hour", "kilometres per hour", "kilometer per hour", "kilometers per hour"),
+        "mps": ("mps", "m/s", "meter per second", "meters per second", "metre per second", "metres per second"),
+        "knots": ("knots", "knot", "kn", "kt", "kt/h", "kts"),
+    },
+    "rain": {
+        "%": ("%", "percent", "percentage", "chance", "chance of rain", "chance of precipitation", "probability", "probability of precipitation"),
+        "mm": ("mm", "millimeter", "millimeters", "millimetre", "millimetres"),
+        "in": ("in", "inch", "inches", "in."),
+    },
+    "battery": {
+        "%": ("%", "percent", "percentage"),
+        "v": ("v", "volt", "volts"),
+    },
+}
+
+UNIT_FALLBACKS: dict[str, str] = {"temp": "c", "wind": "mph", "rain": "mm", "battery": "%"}
+
+# Normalized state field -> option key prefix (the same names the card editor uses) and unit kind.
+SENSOR_SPECS: dict[str, dict[str, str]] = {
+    ATTR_TEMPERATURE: {"prefix": "temperature_sensor", "kind": "temp"},
+    ATTR_WINDSPEED: {"prefix": "wind_sensor", "kind": "wind"},
+    ATTR_PRECIPITATION: {"prefix": "precipitation_sensor", "kind": "rain"},
+    ATTR_BATTERY_CHARGE: {"prefix": "battery_charge_sensor", "kind": "battery"},
+}
+
+
+def sensor_option_key(attr: str, suffix: str) -> str:
+    """Option key of a sensor source setting, e.g. ("windspeed", "entity") -> "wind_sensor_entity"."""
+    return f"{SENSOR_SPECS[attr]['prefix']}_{suffix}"
+
+
+def normalize_unit(kind: str, value: Any) -> str:
+    """Resolve a unit string to a unit id; "" for auto/empty, the kind's fallback if it is not recognised."""
+    token = str(value or "").strip().lower()
+    if not token or token == "auto":
+        return ""
+    for unit_id, aliases in UNIT_ALIASES.get(kind, {}).items():
+        if token == unit_id or token in aliases:
+            return unit_id
+    return UNIT_FALLBACKS.get(kind, "")
+
+
+def resolve_unit(kind: str, sensor_unit: Any, config_unit: Any) -> str:
+    """Configured unit wins, then the sensor's unit_of_measurement, then the kind's fallback."""
+    return normalize_unit(kind, config_unit) or normalize_unit(kind, sensor_unit) or UNIT_FALLBACKS[kind]
+
+
+def default_range(kind: str, unit: str) -> tuple[float, float]:
+    """Default min/max of a unit kind, converted to the given unit."""
+    if kind == "temp":
+        if unit == "f":
+            return DEFAULT_MIN_TEMP_C * 1.8 + 32, DEFAULT_MAX_TEMP_C * 1.8 + 32
+        return DEFAULT_MIN_TEMP_C, DEFAULT_MAX_TEMP_C
+    if kind == "wind":
+        factor = {"kph": 1.609344, "mps": 0.44704, "knots": 0.8689762419}.get(unit, 1)
+        return DEFAULT_MIN_WIND_MPH * factor, DEFAULT_MAX_WIND_MPH * factor
+    if kind == "rain":
+        if unit == "in":
+            return DEFAULT_MIN_RAIN_MM * 0.0393700787, DEFAULT_MAX_RAIN_MM * 0.0393700787
+        if unit == "%":
+            return 0, 100
+        return DEFAULT_MIN_RAIN_MM, DEFAULT_MAX_RAIN_MM
+    return 0, 100
+
+
+def _to_float(value: Any) -> float | None:
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if number != number or number in (float("inf"), float("-inf")):
+        return None
+    return number
+
+
+def normalize_value(kind: str, value: Any, unit: str, min_value: Any = None, max_value: Any = None) -> float | None:
+    """Map a reading onto 0-100 between min and max (the unit's default range when not set)."""
+    number = _to_float(value)
+    if number is None:
+        return None
+    default_min, default_max = default_range(kind, unit)
+    low = _to_float(min_value)
+    high = _to_float(max_value)
+    low = default_min if low is None else low
+    high = default_max if high is None else high
+    if low == high:
+        return 0
+    low, high = min(low, high), max(low, high)
+    number = max(low, min(high, number))
+    normalized = (number - low) / (high - low) * 100
+    if kind == "battery":
+        return normalized
+    return round(normalized, 2)
+
+
+# Condition flag -> tokens that switch it on; mirrors the token matching in sensorHandler.js
+CONDITION_TOKENS: dict[str, tuple[str, ...]] = {
+    "partlycloudy": ("partlycloudy", "partly cloudy", "partly-cloudy"),
+    "clear_night": ("clear_night", "clear-night", "clear night"),
+    "snowy": ("snowy", "snowing", "snow"),
+    "rainy": ("rainy", "raining", "rain"),
+    "pouring": ("pouring",),
+    "windy": ("windy", "wind"),
+    "cloudy": ("cloudy", "clouds", "overcast"),
+    "sunny": ("sunny", "sun"),
+    "stormy": ("stormy", "storm"),
+    "foggy": ("foggy", "fog"),
+    "hail": ("hail",),
+    "lightning": ("lightning",),
+    "exceptional": ("exceptional",),
+}
+
+# Flags implied by another flag (applyDerivedConditions in sensorHandler.js).
+DERIVED_CONDITIONS: dict[str, str] = {
+    "partlycloudy": "cloudy",
+    "pouring": "rainy",
+}
+
+# Source key for the weather entity, next to the numeric state fields in SENSOR_SPECS.
+WEATHER_SOURCE = "weather_conditions"
+
+
+def condition_text(state: State) -> str:
+    """Condition text of a weather entity or condition sensor (attributes first, then the state)."""
+    attrs = state.attributes
+    for candidate in (attrs.get("weatherCondition"), attrs.get("weatherConditions"), attrs.get("weather"), state.state):
+        if isinstance(candidate, (list, tuple)) and candidate:
+            return ", ".join(str(item) for item in candidate)
+        if isinstance(candidate, str) and candidate.strip():
+            return candidate.strip()
+    return ""
+
+
+def condition_flags(text: str) -> dict[str, bool]:
+    """Map a condition text (e.g. "partlycloudy", "Light rain, windy") onto the MACS weather condition flags."""
+    normalized = " ".join(str(text or "").lower().split())
+    compact = re.sub(r"[\s-]+", "_", normalized)
+    spaced = re.sub(r"[_-]+", " ", normalized)
+
+    def has_token(token: str) -> bool:
+        return (
+            token in normalized
+            or re.sub(r"[\s-]+", "_", token) in compact
+            or re.sub(r"[_-]+", " ", token) in spaced
+        )
+
+    flags = {key: False for key in CONDITION_TOKENS}
+    for key, tokens in CONDITION_TOKENS.items():
+        if any(has_token(token) for token in tokens):
+            flags[key] = True
+    for key, implied in DERIVED_CONDITIONS.items():
+        if flags[key]:
+            flags[implied] = True
+    return flags
+
+
+class MacsSensorBridge:
+    """
+    Follows the source sensors configured in the integration options and publishes their
+    normalized values into the MACS number entities, so kiosks receive ready-to-use 0-100 values.
+    A configured weather entity is mapped onto the weather condition switches the same way.
+
+    Only the configured source entities are tracked. A value is published when it moves by at
+    least the configured deadband from the last published value, or reaches either end of the range.
+    All condition flags of a weather change are applied together in one pass.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        self.hass = hass
+        options = entry.options
+        self._sources: dict[str, list[str]] = {}
+        self._settings: dict[str, tuple[Any, Any, Any]] = {}
+        for attr in SENSOR_SPECS:
+            entity_id = str(options.get(sensor_option_key(attr, "entity")) or "").strip()
+            if not entity_id:
+                continue
+            self._sources.setdefault(entity_id, []).append(attr)
+            self._settings[attr] = (
+                options.get(sensor_option_key(attr, "unit")),
+                options.get(sensor_option_key(attr, "min")),
+                options.get(sensor_option_key(attr, "max")),
+            )
+        weather_entity_id = str(options.get(CONF_WEATHER_CONDITIONS_ENTITY) or "").strip()
+        if weather_entity_id:
+            self._sources.setdefault(weather_entity_id, []).append(WEATHER_SOURCE)
+        self._deadband = _to_float(options.get(CONF_SENSOR_DEADBAND)) or 0.0
+        self._published: dict[str, Any] = {}
+        self._unsub: Callable[[], None] | None = None
+
+    @property
+    def source_entities(self) -> list[str]:
+        return list(self._sources)
+
+    async def async_start(self) -> None:
+        if not self._sources:
+            return
+        self._unsub = async_track_state_change_event(self.hass, list(self._sources), self._async_source_changed)
+        values = {}
+        for entity_id in self._sources:
+            values.update(self._read_source(entity_id, self.hass.states.get(entity_id)))
+        await self._async_publish(values)
+
+    @callback
+    def async_stop(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def _async_source_changed(self, event: Event) -> None:
+        values = self._read_source(event.data["entity_id"], event.data.get("new_state"))
+        if values:
+            self.hass.async_create_task(self._async_publish(values))
+
+    def _read_source(self, entity_id: str, state: State | None) -> dict[str, Any]:
+        if state is None or state.state in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+            return {}
+        values: dict[str, Any] = {}
+        for attr in self._sources.get(entity_id, ()):
+            if attr == WEATHER_SOURCE:
+                flags = condition_flags(condition_text(state))
+                values.update({WEATHER_CONDITION_PREFIX + key: flags[key] for key in CONDITION_TOKENS})
+                continue
+            value = self._normalize(attr, state)
+            if value is not None:
+                values[attr] = value
+        return values
+
+    def _normalize(self, attr: str, state: State) -> float | None:
+        kind = SENSOR_SPECS[attr]["kind"]
+        config_unit, min_value, max_value = self._settings[attr]
+        unit = resolve_unit(kind, state.attributes.get(ATTR_UNIT_OF_MEASUREMENT), config_unit)
+        return normalize_value(kind, state.state, unit, min_value, max_value)
+
+    def _outside_deadband(self, attr: str, value: Any) -> bool:
+        last = self._published.get(attr)
+        if last is None or isinstance(value, bool) or value in (0, 100):
+            return last != value
+        return abs(value - last) >= self._deadband
+
+    async def _async_publish(self, values: dict[str, Any]) -> None:
+        values = {attr: value for attr, value in values.items() if self._outside_deadband(attr, value)}
+        if not values:
+            return
+        try:
+            await async_apply_state(self.hass, values)
+        except vol.Invalid as err:
+            # Entities not added yet or already removed during unload.
+            _LOGGER.debug("Macs sensor values not published: %s", err)
+            return
+        self._published.update(values)
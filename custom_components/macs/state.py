@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.helpers import config_validation as cv
+
+from .const import (
+    DOMAIN,
+    MOODS,
+    ATTR_MOOD,
+    ATTR_BRIGHTNESS,
+    ATTR_TEMPERATURE,
+    ATTR_WINDSPEED,
+    ATTR_PRECIPITATION,
+    ATTR_BATTERY_CHARGE,
+    ATTR_ANIMATIONS_ENABLED,
+    ATTR_CHARGING,
+    ATTR_WEATHER_CONDITIONS_SNOWY,
+    ATTR_WEATHER_CONDITIONS_CLOUDY,
+    ATTR_WEATHER_CONDITIONS_RAINY,
+    ATTR_WEATHER_CONDITIONS_WINDY,
+    ATTR_WEATHER_CONDITIONS_SUNNY,
+    ATTR_WEATHER_CONDITIONS_STORMY,
+    ATTR_WEATHER_CONDITIONS_FOGGY,
+    ATTR_WEATHER_CONDITIONS_HAIL,
+    ATTR_WEATHER_CONDITIONS_LIGHTNING,
+    ATTR_WEATHER_CONDITIONS_PARTLYCLOUDY,
+    ATTR_WEATHER_CONDITIONS_POURING,
+    ATTR_WEATHER_CONDITIONS_CLEAR_NIGHT,
+    ATTR_WEATHER_CONDITIONS_EXCEPTIONAL,
+)
+
+
+def entity_handles(hass: HomeAssistant, entry_id: str) -> dict[str, Any]:
+    """Per-entry handle table of live MACS entity objects, keyed by unique_id."""
+    entry_data = hass.data.setdefault(DOMAIN, {}).setdefault(entry_id, {})
+    return entry_data.setdefault("entities", {})
+
+
+def async_get_entity(hass: HomeAssistant, unique_id: str) -> Any | None:
+    """Return the live MACS entity object for a unique_id, if one has been added."""
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+        if not entry_data:
+            continue
+        entity = entry_data.get("entities", {}).get(unique_id)
+        if entity is not None:
+            return entity
+    return None
+
+
+def async_flush_pending_writes(hass: HomeAssistant) -> None:
+    """Publish coalesced writes that are still waiting, so the state machine holds every entity's current value."""
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+        if not entry_data:
+            continue
+        for entity in list(entry_data.get("entities", {}).values()):
+            entity.async_flush_pending_write()
+
+
+# State fields mapped to the unique_id of the MACS entity that stores them.
+# These must match the _attr_unique_id values in entities.py
+SELECT_FIELDS: dict[str, str] = {
+    ATTR_MOOD: "macs_mood",
+}
+
+NUMBER_FIELDS: dict[str, str] = {
+    ATTR_BRIGHTNESS: "macs_brightness",
+    ATTR_TEMPERATURE: "macs_temperature",
+    ATTR_WINDSPEED: "macs_windspeed",
+    ATTR_PRECIPITATION: "macs_precipitation",
+    ATTR_BATTERY_CHARGE: "macs_battery_charge",
+}
+
+SWITCH_FIELDS: dict[str, str] = {
+    ATTR_ANIMATIONS_ENABLED: "macs_animations_enabled",
+    ATTR_CHARGING: "macs_charging",
+}
+
+WEATHER_CONDITION_FIELDS: dict[str, str] = {
+    ATTR_WEATHER_CONDITIONS_SNOWY: "macs_weather_conditions_snowy",
+    ATTR_WEATHER_CONDITIONS_CLOUDY: "macs_weather_conditions_cloudy",
+    ATTR_WEATHER_CONDITIONS_RAINY: "macs_weather_conditions_rainy",
+    ATTR_WEATHER_CONDITIONS_WINDY: "macs_weather_conditions_windy",
+    ATTR_WEATHER_CONDITIONS_SUNNY: "macs_weather_conditions_sunny",
+    ATTR_WEATHER_CONDITIONS_STORMY: "macs_weather_conditions_stormy",
+    ATTR_WEATHER_CONDITIONS_FOGGY: "macs_weather_conditions_foggy",
+    ATTR_WEATHER_CONDITIONS_HAIL: "macs_weather_conditions_hail",
+    ATTR_WEATHER_CONDITIONS_LIGHTNING: "macs_weather_conditions_lightning",
+    ATTR_WEATHER_CONDITIONS_PARTLYCLOUDY: "macs_weather_conditions_partlycloudy",
+    ATTR_WEATHER_CONDITIONS_POURING: "macs_weather_conditions_pouring",
+    ATTR_WEATHER_CONDITIONS_CLEAR_NIGHT: "macs_weather_conditions_clear_night",
+    ATTR_WEATHER_CONDITIONS_EXCEPTIONAL: "macs_weather_conditions_exceptional",
+}
+
+# Config selects are part of the snapshot but not settable through macs.set_state.
+CONFIG_FIELDS: dict[str, str] = {
+    "theme": "macs_theme",
+    "debug": "macs_debug",
+}
+
+WEATHER_CONDITION_PREFIX = "weather_conditions_"
+
+STATE_FIELDS: dict[str, str] = {
+    **SELECT_FIELDS,
+    **NUMBER_FIELDS,
+    **SWITCH_FIELDS,
+    **WEATHER_CONDITION_FIELDS,
+}
+
+_PERCENT = vol.All(vol.Coerce(float), vol.Range(min=0, max=100))
+
+SET_STATE_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(ATTR_MOOD): vol.All(cv.string, vol.Lower, vol.In(MOODS)),
+            **{vol.Optional(attr): _PERCENT for attr in NUMBER_FIELDS},
+            **{vol.Optional(attr): cv.boolean for attr in SWITCH_FIELDS},
+            **{vol.Optional(attr): cv.boolean for attr in WEATHER_CONDITION_FIELDS},
+        }
+    ),
+    cv.has_at_least_one_key(*STATE_FIELDS),
+)
+
+
+def _current_value(attr: str, entity: Any) -> Any:
+    if attr in SELECT_FIELDS:
+        return entity.current_option
+    if attr in NUMBER_FIELDS:
+        return entity.native_value
+    return entity.is_on
+
+
+async def async_apply_state(hass: HomeAssistant, values: dict[str, Any], context: Context | None = None) -> list[str]:
+    """
+    Apply validated state fields to the MACS entities in one pass.
+
+    Every entity is resolved before anything is set, so a missing entity leaves all values untouched.
+    Entities whose value already matches are skipped and not written. Returns the changed entity_ids.
+    """
+    targets = []
+    for attr, value in values.items():
+        unique_id = STATE_FIELDS.get(attr)
+        if unique_id is None:
+            raise vol.Invalid(f"Unknown Macs state field '{attr}'.")
+        entity = async_get_entity(hass, unique_id)
+        if entity is None:
+            raise vol.Invalid(f"Macs entity '{unique_id}' not found (platform not set up)")
+        targets.append((attr, value, entity))
+
+    changed: list[str] = []
+    for attr, value, entity in targets:
+        if _current_value(attr, entity) == value:
+            continue
+        if context is not None:
+            entity.async_set_context(context)
+        if attr in SELECT_FIELDS:
+            await entity.async_select_option(value)
+        elif attr in NUMBER_FIELDS:
+            await entity.async_set_native_value(value)
+        elif value:
+            await entity.async_turn_on()
+        else:
+            await entity.async_turn_off()
+        changed.append(entity.entity_id)
+    return changed
+
+
+def async_build_snapshot(hass: HomeAssistant) -> dict[str, Any]:
+    """
+    Collect the whole MACS state from the live entity objects.
+
+    Weather conditions are reported both as a list of active condition keys (snowy, partlycloudy, ...)
+    and as a bitmask in WEATHER_CONDITION_FIELDS order. Values of entities that are not added yet are None.
+    Pending coalesced writes are published first, so the snapshot never runs ahead of the entity states.
+    """
+    async_flush_pending_writes(hass)
+    snapshot: dict[str, Any] = {}
+    for attr, unique_id in {**SELECT_FIELDS, **CONFIG_FIELDS}.items():
+        entity = async_get_entity(hass, unique_id)
+        snapshot[attr] = entity.current_option if entity is not None else None
+    for attr, unique_id in NUMBER_FIELDS.items():
+        entity = async_get_entity(hass, unique_id)
+        snapshot[attr] = entity.native_value if entity is not None else None
+    for attr, unique_id in SWITCH_FIELDS.items():
+        entity = async_get_entity(hass, unique_id)
+        snapshot[attr] = entity.is_on if entity is not None else None
+
+    conditions: list[str] = []
+    mask = 0
+    for bit, (attr, unique_id) in enumerate(WEATHER_CONDITION_FIELDS.items()):
+        entity = async_get_entity(hass, unique_id)
+        if entity is not None and entity.is_on:
+            conditions.append(attr.removeprefix(WEATHER_CONDITION_PREFIX))
+            mask |= 1 << bit
+    snapshot["weather_conditions"] = conditions
+    snapshot["weather_mask"] = mask
+    return snapshot
@@ -3,6 +3,7 @@ from __future__ import annotations
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from .catalog import async_load_catalog
 from .entities import (
     MacsChargingSwitch,
     MacsAnimationsEnabledSwitch,
@@ -27,22 +28,23 @@ async def async_setup_entry(
     entry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
+    catalog = await async_load_catalog(hass)
     async_add_entities(
         [
-            MacsChargingSwitch(),
-            MacsAnimationsEnabledSwitch(),
-            MacsWeatherConditionsSnowySwitch(),
-            MacsWeatherConditionsCloudySwitch(),
-            MacsWeatherConditionsRainySwitch(),
-            MacsWeatherConditionsWindySwitch(),
-            MacsWeatherConditionsSunnySwitch(),
-            MacsWeatherConditionsStormySwitch(),
-            MacsWeatherConditionsFoggySwitch(),
-            MacsWeatherConditionsHailSwitch(),
-            MacsWeatherConditionsLightningSwitch(),
-            MacsWeatherConditionsPartlyCloudySwitch(),
-            MacsWeatherConditionsPouringSwitch(),
-            MacsWeatherConditionsClearNightSwitch(),
-            MacsWeatherConditionsExceptionalSwitch(),
+            MacsChargingSwitch(catalog),
+            MacsAnimationsEnabledSwitch(catalog),
+            MacsWeatherConditionsSnowySwitch(catalog),
+            MacsWeatherConditionsCloudySwitch(catalog),
+            MacsWeatherConditionsRainySwitch(catalog),
+            MacsWeatherConditionsWindySwitch(catalog),
+            MacsWeatherConditionsSunnySwitch(catalog),
+            MacsWeatherConditionsStormySwitch(catalog),
+            MacsWeatherConditionsFoggySwitch(catalog),
+            MacsWeatherConditionsHailSwitch(catalog),
+            MacsWeatherConditionsLightningSwitch(catalog),
+            MacsWeatherConditionsPartlyCloudySwitch(catalog),
+            MacsWeatherConditionsPouringSwitch(catalog),
+            MacsWeatherConditionsClearNightSwitch(catalog),
+            MacsWeatherConditionsExceptionalSwitch(catalog),
         ]
     )
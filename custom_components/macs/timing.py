@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds a single setup phase may take before a warning is logged (options flow; 0 disables the warning).
+DEFAULT_SETUP_WARN_THRESHOLD = 1.0
+
+
+class MacsSetupTimer:
+    """
+    Durations of the phases of one async_setup_entry run (or of its deferred part).
+
+    lap(name) closes the phase that started at the previous lap (or at creation) and records its
+    duration; async_gather() runs independent steps of one phase concurrently; finish() closes the
+    run. Phases over the threshold are logged as warnings.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_SETUP_WARN_THRESHOLD, label: str = "setup") -> None:
+        self._label = label
+        self._threshold = max(0.0, float(threshold))
+        self._started = time.perf_counter()
+        self._last = self._started
+        self.started_at = dt_util.utcnow().isoformat()
+        self.phases: dict[str, float] = {}
+        self.total: float | None = None
+
+    def _record(self, name: str, duration: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + duration
+        if self._threshold and duration > self._threshold:
+            _LOGGER.warning(
+                "Macs %s phase '%s' took %.3f s (warning threshold %.3f s)", self._label, name, duration, self._threshold
+            )
+
+    def lap(self, name: str) -> float:
+        """Record the phase `name` as ending now; returns its duration in seconds."""
+        now = time.perf_counter()
+        duration, self._last = now - self._last, now
+        self._record(name, duration)
+        return duration
+
+    async def async_gather(self, name: str, **steps: Awaitable[Any]) -> list[Any]:
+        """Run `steps` concurrently as the phase `name`; each one's own duration is recorded as name.step."""
+
+        async def measure(step: str, awaitable: Awaitable[Any]) -> Any:
+            started = time.perf_counter()
+            try:
+                return await awaitable
+            finally:
+                self._record(f"{name}.{step}", time.perf_counter() - started)
+
+        results = await asyncio.gather(*(measure(step, awaitable) for step, awaitable in steps.items()))
+        self.lap(name)
+        return results
+
+    def finish(self) -> float:
+        self.total = time.perf_counter() - self._started
+        _LOGGER.debug(
+            "Macs %s took %.3f s: %s",
+            self._label,
+            self.total,
+            ", ".join(f"{name} {duration * 1000:.1f} ms" for name, duration in self.phases.items()),
+        )
+        return self.total
+
+    def as_dict(self) -> dict[str, Any]:
+        """Milliseconds per phase, in the order they finished."""
+        return {
+            "started": self.started_at,
+            "total_ms": round(self.total * 1000, 3) if self.total is not None else None,
+            "phases_ms": {name: round(duration * 1000, 3) for name, duration in self.phases.items()},
+            "warn_threshold_s": self._threshold,
+        }
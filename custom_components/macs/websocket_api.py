@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from typing import Any, Callable
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .assist import async_get_pipeline_tracker
+from .catalog import async_load_catalog
+from .const import DOMAIN, SIGNAL_STATE_UPDATED
+from .messages import MAX_MESSAGES, async_get_message_history
+from .state import async_build_snapshot
+
+
+class MacsStateFeed:
+    """
+    Shared source for macs/subscribe.
+
+    Keeps one MACS snapshot and a sequence number. Entity writes made in the same pass are
+    coalesced into one diff, computed once and sent to every subscriber. New subscribers get
+    the current snapshot with the current sequence number, then each diff with seq + 1.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self.seq = 0
+        self.snapshot: dict[str, Any] = {}
+        self._subscribers: dict[int, Callable[[dict[str, Any]], None]] = {}
+        self._next_token = 0
+        self._unsub_dispatcher: Callable[[], None] | None = None
+        self._publish_scheduled = False
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @callback
+    def async_subscribe(self, send: Callable[[dict[str, Any]], None]) -> Callable[[], None]:
+        if not self._subscribers:
+            # Nothing was followed while nobody listened; start from the live state.
+            self.snapshot = async_build_snapshot(self.hass)
+            self._unsub_dispatcher = async_dispatcher_connect(
+                self.hass, SIGNAL_STATE_UPDATED, self._async_schedule_publish
+            )
+        self._next_token += 1
+        token = self._next_token
+        self._subscribers[token] = send
+        send({"seq": self.seq, "snapshot": dict(self.snapshot)})
+
+        @callback
+        def unsubscribe() -> None:
+            self._subscribers.pop(token, None)
+            if not self._subscribers and self._unsub_dispatcher is not None:
+                self._unsub_dispatcher()
+                self._unsub_dispatcher = None
+
+        return unsubscribe
+
+    @callback
+    def _async_schedule_publish(self, unique_id: str) -> None:
+        if self._publish_scheduled:
+            return
+        self._publish_scheduled = True
+        self.hass.loop.call_soon(self._async_publish)
+
+    @callback
+    def _async_publish(self) -> None:
+        self._publish_scheduled = False
+        if not self._subscribers:
+            return
+        snapshot = async_build_snapshot(self.hass)
+        diff = {key: value for key, value in snapshot.items() if self.snapshot.get(key) != value}
+        if not diff:
+            return
+        self.snapshot = snapshot
+        self.seq += 1
+        message = {"seq": self.seq, "diff": diff}
+        for send in list(self._subscribers.values()):
+            send(message)
+
+
+def async_get_state_feed(hass: HomeAssistant) -> MacsStateFeed:
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    feed = domain_data.get("state_feed")
+    if feed is None:
+        feed = domain_data["state_feed"] = MacsStateFeed(hass)
+    return feed
+
+
+@callback
+def async_setup_websocket(hass: HomeAssistant) -> None:
+    websocket_api.async_register_command(hass, websocket_subscribe)
+    websocket_api.async_register_command(hass, websocket_messages)
+    websocket_api.async_register_command(hass, websocket_catalog)
+
+
+@websocket_api.websocket_command({vol.Required("type"): "macs/subscribe"})
+@callback
+def websocket_subscribe(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Send the MACS snapshot, then sequence-numbered diffs of the values that changed."""
+    msg_id = msg["id"]
+
+    @callback
+    def send(payload: dict[str, Any]) -> None:
+        connection.send_message(websocket_api.event_message(msg_id, payload))
+
+    feed = async_get_state_feed(hass)
+    connection.send_result(msg_id)
+    connection.subscriptions[msg_id] = feed.async_subscribe(send)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "macs/messages",
+        vol.Optional("limit", default=MAX_MESSAGES): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_MESSAGES)),
+        vol.Optional("pipeline_id"): str,
+    }
+)
+@callback
+def websocket_messages(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Recent dialogue in one response: sent messages (oldest first) and, with pipeline_id, that pipeline's turns (newest first)."""
+    history = async_get_message_history(hass)
+    messages = history.recent(msg["limit"]) if history is not None else []
+
+    turns: list[dict[str, Any]] = []
+    pipeline_id = msg.get("pipeline_id")
+    tracker = async_get_pipeline_tracker(hass)
+    if pipeline_id and tracker is not None:
+        turns = tracker.recent_turns(pipeline_id)[: msg["limit"]]
+
+    connection.send_result(msg["id"], {"messages": messages, "turns": turns})
+
+
+@websocket_api.websocket_command({vol.Required("type"): "macs/catalog", vol.Optional("etag"): str})
+@websocket_api.async_response
+async def websocket_catalog(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Frontend constants and themes; only the etag (with unchanged: true) if the client's copy is current."""
+    catalog = await async_load_catalog(hass)
+    if msg.get("etag") == catalog.etag:
+        connection.send_result(msg["id"], {"etag": catalog.etag, "unchanged": True})
+        return
+    connection.send_result(msg["id"], catalog.as_dict())
@@ -17,7 +17,7 @@
  * and the M.A.C.S. frontend character.
  */
 
-import { VERSION, DEFAULTS, MOOD_ENTITY_ID, BRIGHTNESS_ENTITY_ID, THEME_ENTITY_ID, ANIMATIONS_ENTITY_ID, DEBUG_ENTITY_ID, MACS_MESSAGE_EVENT } from "../shared/constants.js";
+import { VERSION, DEFAULTS, MOOD_ENTITY_ID, BRIGHTNESS_ENTITY_ID, THEME_ENTITY_ID, ANIMATIONS_ENTITY_ID, DEBUG_ENTITY_ID, STATE_ENTITY_ID, MACS_MESSAGE_EVENT } from "../shared/constants.js";
 import { normMood, normBrightness, normTheme, safeUrl, getTargetOrigin, assistStateToMood, getValidUrl} from "./validators.js";
 import { SatelliteTracker } from "./assistSatellite.js";
 import { AssistPipelineTracker } from "./assistPipeline.js";
@@ -29,6 +29,9 @@ import { MessagePoster } from "../shared/messagePoster.js";
 const debug = createDebugger(import.meta.url);
 
 
+// Seconds a signed iframe URL is valid; it is only needed for the iframe's first request.
+const SIGNED_URL_EXPIRES = 30;
+
 // Kiosk UI hides HA chrome and forces the card to full-viewport.
 const KIOSK_STYLE_ID = "macs-kiosk-style";
 const kioskCssUrl = getValidUrl("backend/kiosk.css");
@@ -107,6 +110,9 @@ export class MacsCard extends HTMLElement {
             this._lastMood = undefined;
             this._lastTheme = undefined;
             this._lastSrc = undefined;
+            this._srcTheme = undefined;
+            // Documents loaded into the iframe since the card was created (see iframeLoads).
+            this._iframeLoads = 0;
             this._kioskHidden = false;
             this._isPreview = false;
             this._iframeReady = false;
@@ -122,6 +128,12 @@ export class MacsCard extends HTMLElement {
             this._syntheticTurns = [];
             this._unsubMessageEvents = null;
             this._messageSubToken = 0;
+            // MACS state pushed by the integration (macs/subscribe): snapshot + sequence-numbered diffs.
+            this._macsState = null;
+            this._macsSeq = null;
+            this._unsubMacsState = null;
+            this._macsStateSubToken = 0;
+            this._watchedStates = null;
 
             // Keep home assistant state
             this._hass = null;
@@ -162,6 +174,7 @@ export class MacsCard extends HTMLElement {
             }
             this._lastConfigSignature = null;
             this._lastBridgeConfigSignature = null;
+            this._watchedStates = null;
         }
     }
 
@@ -193,6 +206,7 @@ export class MacsCard extends HTMLElement {
         } catch (_) {}
         this._unsubMessageEvents = null;
 
+        this._unsubscribeMacsState();
     }
 
     connectedCallback() {
@@ -344,6 +358,10 @@ export class MacsCard extends HTMLElement {
             this._lastMood = mood;
             this._sendMoodToIframe(mood);
         }
+        if (snapshot.theme && snapshot.theme !== this._lastTheme) {
+            this._lastTheme = snapshot.theme;
+            this._sendThemeToIframe(snapshot.theme);
+        }
         if (Number.isFinite(snapshot.brightness) && snapshot.brightness !== this._lastBrightness) {
             this._lastBrightness = snapshot.brightness;
             this._sendBrightnessToIframe(snapshot.brightness);
@@ -437,6 +455,10 @@ export class MacsCard extends HTMLElement {
             this._postToIframe({ type: "macs:charging", recipient: "frontend", charging });
         }
     }
+    _sendThemeToIframe(theme) {
+        this._postToIframe({ type: "macs:theme", recipient: "frontend", theme });
+    }
+
     _sendBrightnessToIframe(brightness) {
         this._postToIframe({ type: "macs:brightness", recipient: "frontend", brightness });
     }
@@ -603,30 +625,7 @@ export class MacsCard extends HTMLElement {
 
         this._hass.connection.subscribeEvents((ev) => {
             try {
-                const data = ev?.data || {};
-                const role = (data.role || "assistant").toString().trim().toLowerCase();
-                const text = (data.text || "").toString().trim();
-                if (!text) return;
-                const ts = (data.ts || new Date().toISOString()).toString();
-                const runId = (data.id || `synthetic_${Date.now()}_${Math.random().toString(16).slice(2)}`).toString();
-                const turn = { runId, ts };
-                if (role === "user") {
-                    turn.heard = text;
-                } else {
-                    turn.reply = text;
-                }
-
-                const existing = this._syntheticTurns?.findIndex?.((entry) => entry.runId === runId) ?? -1;
-                if (existing >= 0) {
-                    this._syntheticTurns.splice(existing, 1);
-                }
-                if (!this._syntheticTurns) this._syntheticTurns = [];
-                this._syntheticTurns.unshift(turn);
-                const maxMessages = this._getMaxMessages();
-                if (maxMessages && this._syntheticTurns.length > maxMessages) {
-                    this._syntheticTurns.length = maxMessages;
-                }
-                this._sendTurnsToIframe();
+                if (this._addSyntheticMessage(ev?.data)) this._sendTurnsToIframe();
             } catch (_) {}
         }, MACS_MESSAGE_EVENT).then((unsub) => {
             if (token !== this._messageSubToken) {
@@ -639,11 +638,210 @@ export class MacsCard extends HTMLElement {
                 return;
             }
             this._unsubMessageEvents = unsub;
+            // Subscribed; fill in what was said before this card connected.
+            this._backfillMessages();
         }).catch(() => {
             if (token === this._messageSubToken) this._unsubMessageEvents = null;
         });
     }
 
+    // Add a macs_message payload ({id, role, text, ts}) as a synthetic turn. Returns true if added.
+    _addSyntheticMessage(data) {
+        data = data || {};
+        const role = (data.role || "assistant").toString().trim().toLowerCase();
+        const text = (data.text || "").toString().trim();
+        if (!text) return false;
+        const ts = (data.ts || new Date().toISOString()).toString();
+        const runId = (data.id || `synthetic_${Date.now()}_${Math.random().toString(16).slice(2)}`).toString();
+        const turn = { runId, ts };
+        if (role === "user") {
+            turn.heard = text;
+        } else {
+            turn.reply = text;
+        }
+
+        const existing = this._syntheticTurns?.findIndex?.((entry) => entry.runId === runId) ?? -1;
+        if (existing >= 0) {
+            this._syntheticTurns.splice(existing, 1);
+        }
+        if (!this._syntheticTurns) this._syntheticTurns = [];
+        this._syntheticTurns.unshift(turn);
+        const maxMessages = this._getMaxMessages();
+        if (maxMessages && this._syntheticTurns.length > maxMessages) {
+            this._syntheticTurns.length = maxMessages;
+        }
+        return true;
+    }
+
+    // The integration renders macs.html with the current state inlined for authenticated requests,
+    // so the iframe URL is signed (auth/sign_path) when it points at the integration's own page.
+    // Without a signature (other host, older Home Assistant) the plain URL is loaded.
+    _loadIframe(src) {
+        const url = safeUrl(src);
+        const sameOrigin = typeof window !== "undefined" && url.origin === window.location.origin;
+        if (!this._hass || !sameOrigin || !url.pathname.startsWith("/macs/")) {
+            this._iframe.src = src;
+            return;
+        }
+        this._hass.callWS({ type: "auth/sign_path", path: url.pathname + url.search, expires: SIGNED_URL_EXPIRES })
+            .then((res) => res?.path ? url.origin + res.path : src)
+            .catch(() => src)
+            .then((signed) => {
+                // A newer URL may have been set while this one was being signed.
+                if (this._lastSrc === src) this._iframe.src = signed;
+            });
+    }
+
+    // One round trip for the recent dialogue kept by the integration (macs/messages).
+    _backfillMessages() {
+        if (!this._hass) return;
+        const request = { type: "macs/messages", limit: this._getMaxMessages() };
+        const pipelineId = this._config?.assist_pipeline_enabled
+            ? (this._config.assist_pipeline_entity || "").toString().trim()
+            : "";
+        if (pipelineId) request.pipeline_id = pipelineId;
+
+        this._hass.callWS(request).then((res) => {
+            const messages = Array.isArray(res?.messages) ? res.messages : [];
+            messages.forEach((message) => this._addSyntheticMessage(message));
+            const turns = Array.isArray(res?.turns) ? res.turns : [];
+            // Oldest first, so the newest turn ends up on top.
+            turns.slice().reverse().forEach((turn) => this._pipelineTracker?.handleTurnEvent?.(turn));
+            this._sendTurnsToIframe();
+        }).catch(() => {});
+    }
+
+    _ensureStateSubscription() {
+        if (!this._hass || this._unsubMacsState) return;
+        const token = ++this._macsStateSubToken;
+        this._unsubMacsState = "pending";
+
+        this._hass.connection.subscribeMessage((msg) => {
+            if (token !== this._macsStateSubToken) return;
+            this._onMacsState(msg);
+        }, { type: "macs/subscribe" }).then((unsub) => {
+            if (token !== this._macsStateSubToken) {
+                try {
+                    const result = unsub();
+                    if (result && typeof result.catch === "function") {
+                        result.catch(() => {});
+                    }
+                } catch (_) {}
+                return;
+            }
+            this._unsubMacsState = unsub;
+        }).catch(() => {
+            // Integration without macs/subscribe: stay on reading hass.states.
+            if (token === this._macsStateSubToken) this._unsubMacsState = "unsupported";
+        });
+    }
+
+    _unsubscribeMacsState() {
+        this._macsStateSubToken++;
+        try {
+            const u = this._unsubMacsState;
+            if (typeof u === "function") {
+                const result = u();
+                if (result && typeof result.catch === "function") {
+                    result.catch(() => {});
+                }
+            }
+        } catch (_) {}
+        this._unsubMacsState = null;
+        this._macsState = null;
+        this._macsSeq = null;
+    }
+
+    _onMacsState(msg) {
+        if (!msg || typeof msg !== "object") return;
+        if (msg.snapshot) {
+            this._macsState = { ...msg.snapshot };
+            this._macsSeq = msg.seq;
+        } else if (msg.diff && this._macsState) {
+            if (msg.seq !== this._macsSeq + 1) {
+                // Missed a diff; start over from a fresh snapshot.
+                debug("macs/subscribe sequence gap", { expected: this._macsSeq + 1, got: msg.seq });
+                this._unsubscribeMacsState();
+                this._ensureStateSubscription();
+                return;
+            }
+            Object.assign(this._macsState, msg.diff);
+            this._macsSeq = msg.seq;
+        } else {
+            return;
+        }
+        this._update();
+    }
+
+    _getWatchedEntityIds() {
+        // Non-MACS entities this card reads; MACS values themselves arrive via macs/subscribe.
+        const cfg = this._config || {};
+        const ids = [];
+        if (cfg.assist_satellite_enabled) ids.push(cfg.assist_satellite_entity);
+        if (cfg.temperature_sensor_enabled) ids.push(cfg.temperature_sensor_entity);
+        if (cfg.wind_sensor_enabled) ids.push(cfg.wind_sensor_entity);
+        if (cfg.precipitation_sensor_enabled) ids.push(cfg.precipitation_sensor_entity);
+        if (cfg.battery_charge_sensor_enabled) ids.push(cfg.battery_charge_sensor_entity);
+        if (cfg.battery_state_sensor_enabled) ids.push(cfg.battery_state_sensor_entity);
+        if (cfg.weather_conditions_enabled) ids.push(cfg.weather_conditions_entity);
+        return ids.map((id) => (id || "").toString().trim()).filter(Boolean);
+    }
+
+    _watchedStatesChanged(hass) {
+        // HA replaces a state object whenever the entity changes, so identity is enough.
+        const ids = this._getWatchedEntityIds();
+        const prev = this._watchedStates;
+        let changed = !prev || prev.size !== ids.length;
+        const next = new Map();
+        ids.forEach((id) => {
+            const st = hass.states?.[id];
+            next.set(id, st);
+            if (!changed && prev.get(id) !== st) changed = true;
+        });
+        this._watchedStates = next;
+        return changed;
+    }
+
+    _readMacsState(hass) {
+        // Pushed state from macs/subscribe.
+        const pushed = this._macsState;
+        if (pushed) {
+            return {
+                baseMood: normMood(pushed.mood),
+                theme: normTheme(pushed.theme),
+                brightness: normBrightness(pushed.brightness),
+                animationsEnabled: pushed.animations_enabled !== false,
+                debugMode: (pushed.debug || "None").toString(),
+            };
+        }
+
+        // Aggregate mode: a single state object carries mood, theme, brightness etc.
+        const aggregate = hass.states[STATE_ENTITY_ID] || null;
+        if (aggregate) {
+            const attrs = aggregate.attributes || {};
+            return {
+                baseMood: normMood(aggregate.state),
+                theme: normTheme(attrs.theme),
+                brightness: normBrightness(attrs.brightness),
+                animationsEnabled: attrs.animations_enabled !== false,
+                debugMode: (attrs.debug || "None").toString(),
+            };
+        }
+
+        const moodState = hass.states[MOOD_ENTITY_ID] || null;
+        const themeState = hass.states[THEME_ENTITY_ID] || null;
+        const brightnessState = hass.states[BRIGHTNESS_ENTITY_ID] || null;
+        const animationsState = hass.states[ANIMATIONS_ENTITY_ID] || null;
+        const debugState = hass.states[DEBUG_ENTITY_ID] || null;
+        return {
+            baseMood: normMood(moodState?.state),
+            theme: normTheme(themeState?.state),
+            brightness: normBrightness(brightnessState?.state),
+            animationsEnabled: animationsState ? animationsState.state === "on" : true,
+            debugMode: debugState ? (debugState.state || "None") : "None",
+        };
+    }
+
     _sendSensorIfChanged() {
         if (!this._sensorHandler) return;
         // Only post deltas to keep iframe traffic minimal.
@@ -656,18 +854,37 @@ export class MacsCard extends HTMLElement {
     }
 
 
+    // Number of times the character has been (re)loaded; with stable_iframe_url it stays at 1.
+    get iframeLoads() {
+        return this._iframeLoads || 0;
+    }
+
+
     /* ---------- hass hook ---------- */
 
     set hass(hass) {
         if (!this._config || !this._iframe) return;
 
         this._hass = hass;
-        this._updatePreviewState();
         this._ensureMessageSubscription();
+        this._ensureStateSubscription();
 
         // Always keep hass fresh (safe + cheap)
         this._pipelineTracker?.setHass?.(hass);
 
+        // HA calls this for every state change anywhere. Once MACS values are pushed to us,
+        // only changes to the few external entities this card reads need a full update.
+        const watchedChanged = this._watchedStatesChanged(hass);
+        if (this._macsState && this._iframeBootstrapped && !watchedChanged) return;
+
+        this._update();
+    }
+
+    _update() {
+        const hass = this._hass;
+        if (!hass || !this._config || !this._iframe) return;
+        this._updatePreviewState();
+
         // Only re-apply config if the pipeline settings changed since last time we applied it
         const enabled = !!this._config?.assist_pipeline_enabled;
         const pid = this._config?.assist_pipeline_entity || "";
@@ -682,11 +899,7 @@ export class MacsCard extends HTMLElement {
         //this._ensureSubscriptions();
 
         // Read current HA state into local values.
-        const moodState = hass.states[MOOD_ENTITY_ID] || null;
-        //const mood = normMood(moodState?.state);
-        const baseMood = normMood(moodState?.state);
-        const themeState = hass.states[THEME_ENTITY_ID] || null;
-        const theme = normTheme(themeState?.state);
+        const { baseMood, theme, brightness, animationsEnabled, debugMode } = this._readMacsState(hass);
         // Optional: auto mood from selected satellite state
         let assistMood = null;
         let satState = "";
@@ -710,12 +923,6 @@ export class MacsCard extends HTMLElement {
             this._lastAssistSatelliteState = null;
         }
 
-        const brightnessState = hass.states[BRIGHTNESS_ENTITY_ID] || null;
-        const brightness = normBrightness(brightnessState?.state);
-        const animationsState = hass.states[ANIMATIONS_ENTITY_ID] || null;
-        const animationsEnabled = animationsState ? animationsState.state === "on" : true;
-        const debugState = hass.states[DEBUG_ENTITY_ID] || null;
-        const debugMode = debugState ? (debugState.state || "None") : "None";
         if (typeof window !== "undefined") {
             window.__MACS_DEBUG__ = debugMode;
         }
@@ -724,6 +931,7 @@ export class MacsCard extends HTMLElement {
         let sensorValues = null;
         if (this._sensorHandler) {
             this._sensorHandler.setHass(hass);
+            this._sensorHandler.setMacsState?.(this._macsState);
             sensorValues = this._sensorHandler.update?.() || this._sensorHandler.getPayload?.() || null;
         }
         const batteryActive = Number.isFinite(sensorValues?.battery_charge);
@@ -761,24 +969,36 @@ export class MacsCard extends HTMLElement {
             base.searchParams.delete("extensions");
         }
 
-        // Always include theme, mood, brightness, and sensor data as URL params for initial iframe load/reload.
-        base.searchParams.set("theme", theme);
-        base.searchParams.set("mood", mood);
-        base.searchParams.set("brightness", brightness.toString());
-        if (sensorValues && Number.isFinite(sensorValues.temperature)) {
-            base.searchParams.set("temperature", sensorValues.temperature.toString());
-        }
-        if (sensorValues && Number.isFinite(sensorValues.windspeed)) {
-            base.searchParams.set("windspeed", sensorValues.windspeed.toString());
-        }
-        if (sensorValues && Number.isFinite(sensorValues.precipitation)) {
-            base.searchParams.set("precipitation", sensorValues.precipitation.toString());
-        }
-        if (sensorValues && Number.isFinite(sensorValues.battery_charge)) {
-            base.searchParams.set("battery_charge", sensorValues.battery_charge.toString());
+        // Include theme, mood, brightness, and sensor data as URL params for initial iframe load/reload.
+        // A loaded iframe swaps themes itself (macs:theme), so the theme in the current URL is kept
+        // unless the URL changes anyway.
+        // With stable_iframe_url the URL only carries the load-time params above, so it never changes
+        // with state: the iframe is loaded once and every value reaches it by postMessage (macs:init, then updates).
+        const stableSrc = !!this._config.stable_iframe_url;
+        const srcTheme = this._iframeBootstrapped && this._srcTheme ? this._srcTheme : theme;
+        if (!stableSrc) {
+            base.searchParams.set("theme", srcTheme);
+            base.searchParams.set("mood", mood);
+            base.searchParams.set("brightness", brightness.toString());
+            if (sensorValues && Number.isFinite(sensorValues.temperature)) {
+                base.searchParams.set("temperature", sensorValues.temperature.toString());
+            }
+            if (sensorValues && Number.isFinite(sensorValues.windspeed)) {
+                base.searchParams.set("windspeed", sensorValues.windspeed.toString());
+            }
+            if (sensorValues && Number.isFinite(sensorValues.precipitation)) {
+                base.searchParams.set("precipitation", sensorValues.precipitation.toString());
+            }
+            if (sensorValues && Number.isFinite(sensorValues.battery_charge)) {
+                base.searchParams.set("battery_charge", sensorValues.battery_charge.toString());
+            }
         }
 
-        const newSrc = base.toString();
+        let newSrc = base.toString();
+        if (!stableSrc && newSrc !== this._lastSrc && srcTheme !== theme) {
+            base.searchParams.set("theme", theme);
+            newSrc = base.toString();
+        }
 
         this._pendingState = { mood, theme, brightness, animationsEnabled, sensorValues };
 
@@ -789,11 +1009,14 @@ export class MacsCard extends HTMLElement {
             this._iframeLoaded = false;
             this._iframeBootstrapped = false;
             this._initSent = false;
-            this._iframe.src = newSrc;
             this._lastSrc = newSrc;
+            this._loadIframe(newSrc);
+            this._srcTheme = theme;
             // On first load, attach onload handler
             if (!this._loadedOnce) {
                 this._iframe.onload = () => {
+                    this._iframeLoads++;
+                    debug("iframe loaded", { loads: this._iframeLoads });
                     this._iframeLoaded = true;
                     this._handleIframeReady();
                 };
@@ -812,11 +1035,10 @@ export class MacsCard extends HTMLElement {
                 this._lastMood = mood;
                 this._sendMoodToIframe(mood);
             }
-            // Theme change is handled by iframe src update, not postMessage.
-            // if (theme !== this._lastTheme) {
-            //     this._lastTheme = theme;
-            //     this._sendThemeToIframe(theme);
-            // }
+            if (theme !== this._lastTheme) {
+                this._lastTheme = theme;
+                this._sendThemeToIframe(theme);
+            }
             this._sendSensorIfChanged();
             if(brightness !== this._lastBrightness) {
                 this._lastBrightness = brightness;
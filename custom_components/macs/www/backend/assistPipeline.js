@@ -3,7 +3,7 @@
  * -----------------------
  * Tracks conversation runs for the Assist pipeline and surfaces turns for the UI.
  */
-import { DEFAULTS, CONVERSATION_ENTITY_ID } from "../shared/constants.js";
+import { DEFAULTS, MACS_TURN_EVENT } from "../shared/constants.js";
 import { createDebugger } from "../shared/debugger.js";
 
 const debug = createDebugger(import.meta.url);
@@ -29,7 +29,7 @@ export class AssistPipelineTracker {
         this._lastSeen = { runId: null, ts: null };
 
         // Keep an unsubscribe function so we can clean up later
-        this._unsubStateChanged = null;
+        this._unsubTurnEvents = null;
 
         this._disposed = false;
         this._subToken = 0;
@@ -74,7 +74,7 @@ export class AssistPipelineTracker {
         this._disposed = true;
 
         try {
-            const u = this._unsubStateChanged;
+            const u = this._unsubTurnEvents;
             if (typeof u === "function") {
                 const result = u();
                 if (result && typeof result.catch === "function") {
@@ -82,7 +82,7 @@ export class AssistPipelineTracker {
                 }
             }
         } catch (_) {}
-        this._unsubStateChanged = null;
+        this._unsubTurnEvents = null;
 
         try { if (this._fetchDebounce) clearTimeout(this._fetchDebounce); } catch (_) {}
         this._fetchDebounce = null;
@@ -215,8 +215,27 @@ export class AssistPipelineTracker {
         }
     }
 
-    // Subscribe to conversation entity changes to trigger pipeline refresh
-    ensureSubscriptions() {       
+    // Turns parsed by the integration's pipeline tracker (one per run, re-sent when the run changes)
+    handleTurnEvent(data) {
+        if (!data || !this.pipelineEnabled()) return;
+        if ((data.pipeline_id || "").toString() !== this._pipelineId) return;
+        const runId = (data.id || "").toString();
+        if (!runId) return;
+        const turn = {
+            runId,
+            heard: (data.heard || "").toString(),
+            reply: (data.reply || "").toString(),
+            error: (data.error || "").toString(),
+            ts: (data.ts || "").toString(),
+        };
+        if (!turn.heard && !turn.reply && !turn.error) return;
+        this.upsertTurn(turn);
+        if (this._onTurns) this._onTurns(this.getTurns());
+    }
+
+    // Subscribe to the turns the integration fires for each pipeline run.
+    // (The newest run is still fetched once via pipeline_debug when the pipeline is enabled or the iframe loads.)
+    ensureSubscriptions() {
         debug("ensure subscriptions...");
 
         if (!this._hass || this._disposed) return;
@@ -224,16 +243,15 @@ export class AssistPipelineTracker {
         const shouldSub = this.pipelineEnabled();
 
         // Need to subscribe
-        if (shouldSub && !this._unsubStateChanged) {
+        if (shouldSub && !this._unsubTurnEvents) {
             const token = ++this._subToken;
-            this._unsubStateChanged = "pending"; // any non-null sentinel
+            this._unsubTurnEvents = "pending"; // any non-null sentinel
 
             this._hass.connection.subscribeEvents((ev) => {
                 try {
-                    if (ev?.data?.entity_id !== CONVERSATION_ENTITY_ID) return;
-                    this.triggerFetchNewest();
+                    this.handleTurnEvent(ev?.data);
                 } catch (_) {}
-            }, "state_changed").then((unsub) => {
+            }, MACS_TURN_EVENT).then((unsub) => {
                 // If we've been disposed or a newer subscribe attempt happened, immediately clean up.
                 if (this._disposed || token !== this._subToken || !this.pipelineEnabled()) {
                     try {
@@ -244,17 +262,17 @@ export class AssistPipelineTracker {
                     } catch (_) {}
                     return;
                 }
-                this._unsubStateChanged = unsub;
+                this._unsubTurnEvents = unsub;
             }).catch(() => {
-                if (token === this._subToken) this._unsubStateChanged = null;
+                if (token === this._subToken) this._unsubTurnEvents = null;
             });
 
             return;
         }
 
         // Need to unsubscribe
-        if (!shouldSub && this._unsubStateChanged) {
-            const u = this._unsubStateChanged;
+        if (!shouldSub && this._unsubTurnEvents) {
+            const u = this._unsubTurnEvents;
             if (typeof u === "function") {
                 try {
                     const result = u();
@@ -263,7 +281,7 @@ export class AssistPipelineTracker {
                     }
                 } catch (_) {}
             }
-            this._unsubStateChanged = null;
+            this._unsubTurnEvents = null;
         }
     }
 
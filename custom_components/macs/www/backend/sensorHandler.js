@@ -3,8 +3,8 @@
  * --------------
  * Normalizes HA sensor states and derives weather condition flags.
  */
-import { TEMPERATURE_ENTITY_ID, WIND_ENTITY_ID, PRECIPITATION_ENTITY_ID, BATTERY_CHARGE_ENTITY_ID, BATTERY_STATE_ENTITY_ID } from "../shared/constants.js";
-import { toNumber, normalizeTemperatureValue, normalizeWindValue, normalizeRainValue, normalizeBatteryValue, normalizeUnit, normalizeChargingState } from "./validators.js";
+import { TEMPERATURE_ENTITY_ID, WIND_ENTITY_ID, PRECIPITATION_ENTITY_ID, BATTERY_CHARGE_ENTITY_ID, BATTERY_STATE_ENTITY_ID, STATE_ENTITY_ID } from "../shared/constants.js";
+import { toNumber, toNumberOrNull, normalizeTemperatureValue, normalizeWindValue, normalizeRainValue, normalizeBatteryValue, normalizeUnit, normalizeChargingState } from "./validators.js";
 import { createDebugger } from "../shared/debugger.js";
 
 const debug = createDebugger(import.meta.url);
@@ -144,6 +144,10 @@ export class SensorHandler {
             weatherConditions: null,
         };
         this._lastValues = {};
+        // Attributes of the aggregate MACS state entity, when the integration publishes it.
+        this._aggregate = null;
+        // MACS state pushed via macs/subscribe; same keys as the aggregate's attributes.
+        this._macsState = null;
     }
 
     setConfig(config) {
@@ -154,9 +158,15 @@ export class SensorHandler {
         this._hass = hass || null;
     }
 
+    setMacsState(state) {
+        this._macsState = state || null;
+    }
+
     update() {
         if (!this._hass) return null;
 
+        this._aggregate = this._macsState || this._hass.states?.[STATE_ENTITY_ID]?.attributes || null;
+
         const temperature = this._normalizeNumeric(NUMERIC_SPECS.temperature);
         const windspeed = this._normalizeNumeric(NUMERIC_SPECS.windspeed);
         const precipitation = this._normalizeNumeric(NUMERIC_SPECS.precipitation);
@@ -192,11 +202,17 @@ export class SensorHandler {
         };
     }
 
-    _readManualValue(entityId) {
+    _readManualValue(entityId, key) {
         if (!this._hass || !entityId) return null;
-        const st = this._hass.states?.[entityId];
-        if (!st) return null;
-        const value = toNumber(st.state);
+        let raw;
+        if (this._aggregate && key) {
+            raw = this._aggregate[key];
+        } else {
+            const st = this._hass.states?.[entityId];
+            if (!st) return null;
+            raw = st.state;
+        }
+        const value = toNumberOrNull(raw);
         if (value === null) return null;
         const clamped = Math.max(0, Math.min(100, value));
         return {
@@ -264,7 +280,7 @@ export class SensorHandler {
     _normalizeNumeric(spec) {
         if (!spec) return null;
         if (!this._config?.[spec.enabledKey]) {
-            return this._readManualValue(spec.manualEntityId);
+            return this._readManualValue(spec.manualEntityId, spec.key);
         }
         const entityId = (this._config?.[spec.entityKey] || "").toString().trim();
         if (!entityId) {
@@ -314,6 +330,12 @@ export class SensorHandler {
         if (!this._hass?.states) {
             return null;
         }
+        if (!useSensor && this._aggregate && typeof this._aggregate.charging === "boolean") {
+            return {
+                value: this._aggregate.charging ? "on" : "off",
+                normalized: this._aggregate.charging,
+            };
+        }
         const st = this._hass.states?.[entityId];
         if (!st) {
             return null;
@@ -462,6 +484,13 @@ export class SensorHandler {
         }
 
         const flags = emptyWeatherConditions();
+        if (this._aggregate && Array.isArray(this._aggregate.weather_conditions)) {
+            this._aggregate.weather_conditions.forEach((key) => {
+                if (Object.prototype.hasOwnProperty.call(flags, key)) flags[key] = true;
+            });
+            applyDerivedConditions(flags);
+            return flags;
+        }
         for (let i = 0; i < CONDITION_KEYS.length; i++) {
             const key = CONDITION_KEYS[i];
             const id = CONDITION_ENTITY_IDS[key];
@@ -571,6 +600,8 @@ export class SensorHandler {
     dispose() {
         this._hass = null;
         this._config = null;
+        this._aggregate = null;
+        this._macsState = null;
         this._values = {
             temperature: null,
             windspeed: null,
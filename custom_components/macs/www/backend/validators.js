@@ -2,7 +2,7 @@
  * Shared helpers for normalising values and safely handling URLs
  */
 
-import {DEFAULTS, DEFAULT_MAX_TEMP_C, DEFAULT_MIN_TEMP_C, DEFAULT_MAX_WIND_MPH, DEFAULT_MIN_WIND_MPH, DEFAULT_MAX_RAIN_MM, DEFAULT_MIN_RAIN_MM, TEMPERATURE_UNIT_ITEMS, WIND_UNIT_ITEMS, PRECIPITATION_UNIT_ITEMS, BATTERY_CHARGE_UNIT_ITEMS, VERSION, rootUrl} from "../shared/constants.js";
+import {DEFAULTS, DEFAULT_MAX_TEMP_C, DEFAULT_MIN_TEMP_C, DEFAULT_MAX_WIND_MPH, DEFAULT_MIN_WIND_MPH, DEFAULT_MAX_RAIN_MM, DEFAULT_MIN_RAIN_MM, TEMPERATURE_UNIT_ITEMS, WIND_UNIT_ITEMS, PRECIPITATION_UNIT_ITEMS, BATTERY_CHARGE_UNIT_ITEMS, VERSION, rootUrl, assetHash} from "../shared/constants.js";
 
 
 
@@ -21,7 +21,9 @@ export function getTargetOrigin(absoluteUrlString) {
 export function getValidUrl(path, params = null) {
     const url = new URL(path, rootUrl);
     const search = new URLSearchParams();
-    if (VERSION && VERSION !== "Unknown") {
+    if (assetHash(path)) {
+        search.set("h", assetHash(path));
+    } else if (VERSION && VERSION !== "Unknown") {
         search.set("v", VERSION);
     }
     if (params instanceof URLSearchParams) {
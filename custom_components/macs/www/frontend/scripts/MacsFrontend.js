@@ -43,6 +43,13 @@ const { createWeatherFx } = await importWithVersion("./weatherFx.js");
 // load default settings from JSON
 await loadSharedConstants();
 
+// Stylesheet requests so far and the time spent loading them (one per theme when bundled, several when not)
+if (typeof performance !== "undefined" && performance.getEntriesByType) {
+	const sheets = performance.getEntriesByType("resource").filter((entry) => /\.css(\?|$)/.test(entry.name));
+	const duration = sheets.reduce((end, entry) => Math.max(end, entry.responseEnd), 0) - sheets.reduce((start, entry) => Math.min(start, entry.startTime), Infinity);
+	debug(`Stylesheets: ${sheets.length} requests, ${sheets.length ? Math.round(duration) : 0}ms`);
+}
+
 // Is the iframe being rendered in a card preview (we don't want kiosk mode etc)
 const isCardPreview = (() => {
 	const edit = getQueryParamOrDefault("edit");
@@ -295,12 +302,31 @@ function handleMessage(payload) {
 	// Make sure we have a valid payload (message)
 	if (!payload || typeof payload !== 'object') return;
 
-	// Sets the theme
+	// Sets the theme by swapping the theme stylesheet; the runtime keeps running.
+	// The new sheet is added next to the old one, which is only removed once the new one has loaded,
+	// so there is no unstyled frame (and a theme that fails to load leaves the current one in place).
 	const setTheme = (theme) => {
 		const themeLink = document.getElementById("macs-theme");
-		if (themeLink) {
-			themeLink.href = window.__MACS_WITH_VERSION__(`frontend/styles/themes/${theme || "default"}.css`);
-		}
+		if (!themeLink) return;
+		const href = window.__MACS_THEME_HREF__(encodeURIComponent(theme || "default"));
+		if (themeLink.getAttribute("href") === href || themeLink.dataset.pendingHref === href) return;
+		document.querySelectorAll("link[data-macs-theme-pending]").forEach((link) => link.remove());
+		themeLink.dataset.pendingHref = href;
+		const next = document.createElement("link");
+		next.rel = "stylesheet";
+		next.href = href;
+		next.dataset.macsThemePending = "";
+		next.onload = () => {
+			themeLink.remove();
+			next.removeAttribute("data-macs-theme-pending");
+			next.id = "macs-theme";
+		};
+		next.onerror = () => {
+			next.remove();
+			delete themeLink.dataset.pendingHref;
+			debug("Theme stylesheet failed to load: " + href);
+		};
+		themeLink.after(next);
 	}
 
 	switch (payload.type) {
@@ -308,6 +334,8 @@ function handleMessage(payload) {
 		case 'macs:init': {
 			// then apply the config
 			applyConfigPayload(payload.config);
+			// the theme may have changed since the page was requested
+			if (payload.theme) setTheme(payload.theme);
 			        			if (typeof payload.mood !== "undefined") {
 							if (moodFx) moodFx.setBaseMood(payload.mood || 'idle');
 						}
@@ -384,6 +412,10 @@ function handleMessage(payload) {
 			if (batteryFx) batteryFx.setBatteryState(payload.charging);
 			return;
 		}
+		case 'macs:theme': {
+			setTheme(payload.theme);
+			return;
+		}
 		case 'macs:brightness': {
 			if (kioskFx) kioskFx.setBrightness(payload.brightness ?? '100');
 			return;
@@ -4,6 +4,8 @@
  * Shared utility helpers for the frontend runtime.
  */
 
+import { loadCatalog } from "../../shared/catalog.js";
+
 export const QUERY_PARAMS = typeof location !== "undefined" ? new URLSearchParams(location.search) : new URLSearchParams();
 
 let defaultsByKey = {};
@@ -11,8 +13,8 @@ let weatherConditionKeys = [];
 let defaultsLoadPromise = null;
 
 
-// Loads shared default constants from /macs/shared/constants.json.
-// The result is cached so the file is only fetched once.
+// Loads shared default constants (shared/constants.json) from the catalog.
+// The result is cached so they are only loaded once.
 export const loadSharedConstants = () => {
 	// If a load is already in progress or has completed, return the existing promise to avoid duplicate fetches.
 	if (defaultsLoadPromise) return defaultsLoadPromise;
@@ -20,19 +22,9 @@ export const loadSharedConstants = () => {
 	// Create and store the promise so subsequent calls reuse it.
 	defaultsLoadPromise = (async () => {
 		try {
-			// Fetch the JSON file, disabling cache to ensure fresh data.
-			const baseUrl = new URL("/macs/shared/constants.json", window.location.origin);
-			const response = await fetch(baseUrl.toString(), { cache: "no-store" });
-			let data = response && response.ok ? await response.json() : null;
-			if (!data) {
-				try {
-					const fallbackUrl = new URL("shared/constants.json", window.location.href);
-					const fallbackResponse = await fetch(fallbackUrl.toString(), { cache: "no-store" });
-					data = fallbackResponse && fallbackResponse.ok ? await fallbackResponse.json() : null;
-				} catch (_) {
-					data = null;
-				}
-			}
+			// Shared with the debugger: one websocket call (or fetch) per window.
+			const catalog = await loadCatalog();
+			const data = catalog ? catalog.constants : null;
 
 			// Extract the "defaults" array
 			const defaults = data && typeof data === "object" ? data.defaults : null;
@@ -77,12 +69,21 @@ export const loadSharedConstants = () => {
 };
 
 
-// Returns the value of a URL query parameter if present, otherwise falls back to a default value defined in defaultsByKey.
+// Returns the value of a URL query parameter if present, otherwise the value the integration inlined
+// into the page (window.__MACS_INITIAL__), otherwise falls back to a default value defined in defaultsByKey.
 export const getQueryParamOrDefault = (param) => {
 	// return the query param if present
 	const value = QUERY_PARAMS.get(param);
 	if (value !== null) return value;
 
+	// then the current state rendered into macs.html
+	const initial = typeof window !== "undefined" && window.__MACS_INITIAL__ ? window.__MACS_INITIAL__.values : null;
+	if (initial && Object.prototype.hasOwnProperty.call(initial, param) && initial[param] !== null) {
+		const current = initial[param];
+		if (typeof current === "boolean") return current ? "true" : "false";
+		return String(current);
+	}
+
 	// otherwise use the default value
 	const fallback = Object.prototype.hasOwnProperty.call(defaultsByKey, param) ? defaultsByKey[param] : undefined;
 	if (fallback === null || typeof fallback === "undefined") return "";
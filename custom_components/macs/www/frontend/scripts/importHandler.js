@@ -1,15 +1,31 @@
 /**
  * Import Handler
  * -------
- * Single function which appends version to javascript imports
+ * Single function which appends version to javascript imports (or loads them from the bundle)
  */
 
 export function importWithVersion(relativePath) {
 	var baseUrl = import.meta.url;
 	var url = new URL(relativePath, baseUrl);
 
+	// Prefer the content hash from the asset manifest: it gives the same URL as the static imports
+	// of other modules, so the module is only instantiated once, and it is cached as immutable.
+	var assets = (typeof window !== "undefined" && window.__MACS_ASSETS__) || null;
+	var rootPath = new URL("../../", baseUrl).pathname;
+	var assetPath = url.pathname.startsWith(rootPath) ? url.pathname.slice(rootPath.length) : "";
+	url.search = "";
+
+	// When the integration serves the runtime as one bundle, its modules come from there.
+	var bundle = (typeof window !== "undefined" && window.__MACS_BUNDLE__) || null;
+	if (bundle && assetPath && bundle.has(assetPath)) {
+		return bundle.load(assetPath);
+	}
+
+	if (assets && assets[assetPath]) {
+		url.searchParams.set("h", assets[assetPath]);
+	}
 	// window.__MACS_VERSION__ is set in the header script of macs.html
-	if (typeof window !== "undefined" && window.__MACS_VERSION__) {
+	else if (typeof window !== "undefined" && window.__MACS_VERSION__) {
 		url.searchParams.set("v", window.__MACS_VERSION__);
 	}
 
@@ -0,0 +1,85 @@
+/**
+ * Catalog
+ * -------
+ * Shared constants (shared/constants.json) and the theme list, loaded once per window.
+ * With a Home Assistant connection (the card's window, or the parent of the iframe) they come from
+ * the integration's macs/catalog websocket command, which only answers "unchanged" when the copy
+ * kept in localStorage is current. Without one, the content-hashed constants.json is fetched.
+ * A macs.html rendered by the integration already carries the catalog (window.__MACS_INITIAL__).
+ */
+import { assetHash } from "./constants.js";
+
+const STORAGE_KEY = "macs-catalog";
+const CONNECTION_TIMEOUT_MS = 5000;
+
+const readStored = () => {
+    try {
+        const stored = JSON.parse(window.localStorage.getItem(STORAGE_KEY) || "null");
+        return stored && stored.etag && stored.constants ? stored : null;
+    } catch (_) {
+        return null;
+    }
+};
+
+const store = (catalog) => {
+    try { window.localStorage.setItem(STORAGE_KEY, JSON.stringify(catalog)); } catch (_) {}
+};
+
+// window.hassConnection is set by the Home Assistant frontend; the iframe is same-origin, so it can use its parent's.
+const findConnection = async () => {
+    for (const win of [window, window.parent]) {
+        try {
+            if (!win || !win.hassConnection) continue;
+            const timeout = new Promise((resolve) => setTimeout(() => resolve(null), CONNECTION_TIMEOUT_MS));
+            const result = await Promise.race([win.hassConnection, timeout]);
+            if (result && result.conn) return result.conn;
+        } catch (_) {}
+    }
+    return null;
+};
+
+const loadOverWebsocket = async () => {
+    const conn = await findConnection();
+    if (!conn) return null;
+    const stored = readStored();
+    const message = { type: "macs/catalog" };
+    if (stored) message.etag = stored.etag;
+    const result = await conn.sendMessagePromise(message);
+    if (result && result.unchanged && stored) return stored;
+    if (!result || !result.constants) return null;
+    const catalog = { etag: result.etag, constants: result.constants, themes: result.themes || [] };
+    store(catalog);
+    return catalog;
+};
+
+const loadOverHttp = async () => {
+    // The content-hashed URL changes whenever the file does, so a cached copy can be used.
+    const hash = assetHash("shared/constants.json");
+    const cache = hash ? "default" : "no-store";
+    for (const url of [new URL("/macs/shared/constants.json", window.location.origin), new URL("shared/constants.json", window.location.href)]) {
+        try {
+            if (hash) url.searchParams.set("h", hash);
+            const response = await fetch(url.toString(), { cache });
+            const constants = response && response.ok ? await response.json() : null;
+            if (constants) return { etag: "", constants, themes: [] };
+        } catch (_) {}
+    }
+    return null;
+};
+
+// Resolves to { etag, constants, themes }, or null if nothing could be loaded.
+export function loadCatalog() {
+    if (typeof window === "undefined") return Promise.resolve(null);
+    // Kept on window so every instance of this module (bundled or not) shares the one load.
+    const initial = window.__MACS_INITIAL__ && window.__MACS_INITIAL__.catalog;
+    if (!window.__MACS_CATALOG__ && initial && initial.constants) {
+        window.__MACS_CATALOG__ = Promise.resolve(initial);
+    }
+    if (!window.__MACS_CATALOG__) {
+        window.__MACS_CATALOG__ = loadOverWebsocket()
+            .catch(() => null)
+            .then((catalog) => catalog || loadOverHttp())
+            .catch(() => null);
+    }
+    return window.__MACS_CATALOG__;
+}
@@ -21,11 +21,21 @@ const resolveVersion = () => {
 };
 export const VERSION = resolveVersion();
 
+// Content hashes of the static files, injected by the integration (path relative to /macs/ -> hash).
+export const assetHash = (path) => {
+    const assets = (typeof window !== "undefined" && window.__MACS_ASSETS__) || null;
+    return (assets && assets[path]) || "";
+};
+
 // get URL for macs.html
 const selfUrl = new URL(import.meta.url);
 export const rootUrl = new URL("../", selfUrl);
 export const htmlUrl = new URL("macs.html", rootUrl);
 htmlUrl.search = selfUrl.search; // query params, including manifest version (macs.html?hacstag=n)
+if (assetHash("macs.html")) htmlUrl.searchParams.set("h", assetHash("macs.html"));
+else htmlUrl.searchParams.delete("h");
+const previewUrl = new URL("shared/images/loading.jpg", rootUrl);
+if (assetHash("shared/images/loading.jpg")) previewUrl.searchParams.set("h", assetHash("shared/images/loading.jpg"));
 
 // default config values
 export const DEFAULTS = {
@@ -37,7 +47,7 @@ export const DEFAULTS = {
     assist_satellite_entity: "",    // entity_id of a satellite device to monitor assistant state from
     assist_satellite_custom: false, // whether the satellite entity is custom (true) or selected from HA assistant satellites (false)
     max_turns: 2,                   // number of turns (voice requests) to show in the iframe
-    preview_image: new URL("shared/images/loading.jpg", rootUrl).toString(),
+    preview_image: previewUrl.toString(),
     assist_outcome_duration_ms: 1000,
     // Weather sensor inputs (frontend UI defaults)
     temperature_sensor_enabled: false,
@@ -75,6 +85,7 @@ export const DEFAULTS = {
     auto_brightness_min: 0,
     auto_brightness_max: 100,
     auto_brightness_pause_animations: true,
+    stable_iframe_url: false,       // keep live values out of the iframe URL, so state changes never reload the character
 };
 
 // change autoBrightness defaults to ""?
@@ -86,6 +97,7 @@ export const DEFAULT_MIN_WIND_MPH = 10;
 export const DEFAULT_MAX_RAIN_MM = 10;
 export const DEFAULT_MIN_RAIN_MM = 0;
 export const MACS_MESSAGE_EVENT = "macs_message";
+export const MACS_TURN_EVENT = "macs_turn";
 
 // Unit options used by the card editor.
 export const TEMPERATURE_UNIT_ITEMS = [
@@ -126,6 +138,8 @@ export const BATTERY_CHARGE_ENTITY_ID = "number.macs_battery_charge";
 export const BATTERY_STATE_ENTITY_ID = "switch.macs_charging";
 export const ANIMATIONS_ENTITY_ID = "switch.macs_animations_enabled";
 export const DEBUG_ENTITY_ID = "select.macs_debug";
+// Optional aggregate entity (integration option) carrying the whole MACS state as attributes.
+export const STATE_ENTITY_ID = "sensor.macs_state";
 export const CONVERSATION_ENTITY_ID = "conversation.home_assistant";
 
 
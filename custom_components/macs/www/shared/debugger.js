@@ -4,6 +4,7 @@
  * Shared debug logger and UI panel with target filtering.
  */
 import { VERSION } from "./constants.js";
+import { loadCatalog } from "./catalog.js";
 
 export function setDebugOverride(mode, debugInstance) {
     if (typeof mode === "undefined") return;
@@ -84,25 +85,9 @@ export function createDebugger(namespace) {
         if (window.__MACS_DEBUG_TARGETS__ || targetsLoading) return;
         targetsLoading = true;
         try {
-            const baseUrl = new URL("/macs/shared/constants.json", window.location.origin);
-            if (VERSION && VERSION !== "Unknown") {
-                baseUrl.searchParams.set("v", VERSION);
-            }
-            fetch(baseUrl.toString(), { cache: "no-store" })
-                .then(async (resp) => {
-                    if (resp && resp.ok) return resp.json();
-                    try {
-                        const fallbackUrl = new URL("shared/constants.json", window.location.href);
-                        if (VERSION && VERSION !== "Unknown") {
-                            fallbackUrl.searchParams.set("v", VERSION);
-                        }
-                        const fallbackResp = await fetch(fallbackUrl.toString(), { cache: "no-store" });
-                        return fallbackResp && fallbackResp.ok ? await fallbackResp.json() : null;
-                    } catch (_) {
-                        return null;
-                    }
-                })
-                .then((data) => {
+            loadCatalog()
+                .then((catalog) => {
+                    const data = catalog ? catalog.constants : null;
                     const targets = Array.isArray(data)
                         ? data
                         : (data && Array.isArray(data.debugTargets) ? data.debugTargets : null);
@@ -0,0 +1,33 @@
+"""Fixtures for the MACS tests; they run on pytest-homeassistant-custom-component (see requirements.txt)."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.setup import async_setup_component  # noqa: E402
+from pytest_homeassistant_custom_component.common import MockConfigEntry  # noqa: E402
+
+from custom_components.macs.const import DOMAIN  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    yield
+
+
+@pytest.fixture
+async def macs_entry(hass: HomeAssistant) -> MockConfigEntry:
+    """A set up MACS entry."""
+    for component in ("http", "lovelace", "websocket_api"):
+        assert await async_setup_component(hass, component, {})
+    entry = MockConfigEntry(domain=DOMAIN, title="Macs")
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
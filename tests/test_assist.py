@@ -0,0 +1,67 @@
+"""The Assist pipeline tracker: one per hass, and safe when the assist_pipeline data looks different."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from homeassistant.core import Event, HomeAssistant, callback
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.macs.assist import ASSIST_PIPELINE_DATA, async_get_pipeline_tracker
+from custom_components.macs.const import DOMAIN, EVENT_TURN
+
+
+def _collect(hass: HomeAssistant) -> list[dict]:
+    turns: list[dict] = []
+
+    @callback
+    def on_turn(event: Event) -> None:
+        turns.append(dict(event.data))
+
+    hass.bus.async_listen(EVENT_TURN, on_turn)
+    return turns
+
+
+def _run(text: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        events=[SimpleNamespace(type="intent-start", data={"intent_input": text}, timestamp="2026-01-01T00:00:00")]
+    )
+
+
+async def _conversation_changed(hass: HomeAssistant, state: str) -> None:
+    hass.states.async_set("conversation.home_assistant", state)
+    await hass.async_block_till_done()
+
+
+async def test_one_tracker_for_all_entries(hass: HomeAssistant, macs_entry) -> None:
+    second = MockConfigEntry(domain=DOMAIN, title="Macs 2")
+    second.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(second.entry_id)
+    await hass.async_block_till_done()
+    tracker = async_get_pipeline_tracker(hass)
+    assert tracker is not None and tracker.users == 2
+
+    hass.data[ASSIST_PIPELINE_DATA] = SimpleNamespace(
+        pipeline_debug={"pipeline": OrderedDict(run1=_run("turn on the lights"))}
+    )
+    turns = _collect(hass)
+    await _conversation_changed(hass, "1")
+    assert [turn["heard"] for turn in turns] == ["turn on the lights"]
+
+    assert await hass.config_entries.async_unload(second.entry_id)
+    assert async_get_pipeline_tracker(hass) is tracker and tracker.users == 1
+    assert await hass.config_entries.async_unload(macs_entry.entry_id)
+    assert async_get_pipeline_tracker(hass) is None
+
+
+async def test_unexpected_pipeline_data_is_ignored(hass: HomeAssistant, macs_entry) -> None:
+    turns = _collect(hass)
+    for pipeline_data in (
+        object(),
+        SimpleNamespace(pipeline_debug=None),
+        SimpleNamespace(pipeline_debug={"pipeline": ["not", "runs"]}),
+        SimpleNamespace(pipeline_debug={"pipeline": OrderedDict(run1=SimpleNamespace(events=None))}),
+    ):
+        hass.data[ASSIST_PIPELINE_DATA] = pipeline_data
+        await _conversation_changed(hass, str(id(pipeline_data)))
+    assert turns == []
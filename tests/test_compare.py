@@ -0,0 +1,56 @@
+"""benchmarks/compare.py verdicts."""
+from __future__ import annotations
+
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+COMPARE = Path(__file__).resolve().parents[1] / "benchmarks" / "compare.py"
+
+
+@pytest.fixture(scope="module")
+def compare():
+    spec = importlib.util.spec_from_file_location("macs_benchmark_compare", COMPARE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _write(path: Path, version: str, **values) -> str:
+    row = {"name": "set_latency_by_registry_size", "params": {"registry_entries": 5000}, **values}
+    path.write_text(json.dumps({"version": version, "results": [row]}), encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    ("before", "after", "regressions"),
+    [
+        # Latency doubling is a regression, halving is not.
+        ({"p50_ms": 0.02}, {"p50_ms": 0.04}, 1),
+        ({"p50_ms": 0.04}, {"p50_ms": 0.02}, 0),
+        # A rate halving is a regression, doubling is not.
+        ({"calls_per_second": 40000}, {"calls_per_second": 20000}, 1),
+        ({"calls_per_second": 20000}, {"calls_per_second": 40000}, 0),
+        # Nested timings are compared under dotted keys.
+        ({"setup": {"phases_ms": {"platforms": 10.0}}}, {"setup": {"phases_ms": {"platforms": 30.0}}}, 1),
+        ({"latency": {"p95_ms": 0.1, "calls": 10}}, {"latency": {"p95_ms": 0.2, "calls": 10}}, 1),
+        # Counts are not compared either way.
+        ({"calls": 1000, "received": 10}, {"calls": 10, "received": 1000}, 0),
+    ],
+)
+def test_verdicts(compare, tmp_path: Path, capsys, before, after, regressions) -> None:
+    old = _write(tmp_path / "old.json", "old", **before)
+    new = _write(tmp_path / "new.json", "new", **after)
+    assert compare.main(old, new) == (1 if regressions else 0)
+    assert f"{regressions} metric(s) more than 10% worse" in capsys.readouterr().out
+
+
+def test_set_latency_row(compare, tmp_path: Path, capsys) -> None:
+    # The fields bench_set_latency_by_registry_size records: slower calls are three regressions.
+    old = _write(tmp_path / "old.json", "old", calls=1000, p50_ms=0.025, p95_ms=0.03, calls_per_second=40000.0)
+    new = _write(tmp_path / "new.json", "new", calls=1000, p50_ms=0.05, p95_ms=0.06, calls_per_second=20000.0)
+    assert compare.main(old, new) == 1
+    assert "3 metric(s) more than 10% worse" in capsys.readouterr().out
+    assert compare.main(new, old) == 0
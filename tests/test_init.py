@@ -0,0 +1,29 @@
+"""Import and setup smoke tests."""
+from __future__ import annotations
+
+import importlib
+import pkgutil
+
+import pytest
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+
+import custom_components.macs as macs
+
+
+@pytest.mark.parametrize("module", [info.name for info in pkgutil.iter_modules(macs.__path__)])
+def test_module_imports(module: str) -> None:
+    # Catches errors at module level (e.g. a NameError) that only show when a platform is loaded.
+    importlib.import_module(f"{macs.__name__}.{module}")
+
+
+async def test_setup_and_unload(hass: HomeAssistant, macs_entry) -> None:
+    assert macs_entry.state is ConfigEntryState.LOADED
+    for entity_id in ("select.macs_mood", "select.macs_debug", "number.macs_brightness", "switch.macs_charging"):
+        assert hass.states.get(entity_id) is not None, entity_id
+    assert hass.states.get("select.macs_debug").attributes["options"][:2] == ["None", "All"]
+
+    assert await hass.config_entries.async_unload(macs_entry.entry_id)
+    await hass.async_block_till_done()
+    assert macs_entry.state is ConfigEntryState.NOT_LOADED
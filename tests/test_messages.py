@@ -0,0 +1,54 @@
+"""macs.send_*_message with and without the message limiter."""
+from __future__ import annotations
+
+from homeassistant.core import Event, HomeAssistant, callback
+
+from custom_components.macs.const import (
+    DOMAIN,
+    ATTR_MESSAGE,
+    CONF_MESSAGE_LIMIT,
+    CONF_MESSAGE_MERGE_WINDOW,
+    EVENT_MESSAGE,
+    SERVICE_SEND_ASSISTANT_MESSAGE,
+    SERVICE_SEND_USER_MESSAGE,
+)
+
+
+def _collect(hass: HomeAssistant) -> list[str]:
+    texts: list[str] = []
+
+    @callback
+    def on_message(event: Event) -> None:
+        texts.append(event.data["text"])
+
+    hass.bus.async_listen(EVENT_MESSAGE, on_message)
+    return texts
+
+
+async def _send(hass: HomeAssistant, service: str, text: str) -> None:
+    await hass.services.async_call(DOMAIN, service, {ATTR_MESSAGE: text}, blocking=True)
+    await hass.async_block_till_done()
+
+
+async def test_messages_not_limited_by_default(hass: HomeAssistant, macs_entry) -> None:
+    texts = _collect(hass)
+    for _ in range(3):
+        await _send(hass, SERVICE_SEND_ASSISTANT_MESSAGE, "OK")
+    assert texts == ["OK", "OK", "OK"]
+
+
+async def test_only_consecutive_repeats_are_dropped(hass: HomeAssistant, macs_entry) -> None:
+    hass.config_entries.async_update_entry(
+        macs_entry, options={**macs_entry.options, CONF_MESSAGE_LIMIT: True, CONF_MESSAGE_MERGE_WINDOW: 0}
+    )
+    await hass.config_entries.async_reload(macs_entry.entry_id)
+    await hass.async_block_till_done()
+    texts = _collect(hass)
+
+    await _send(hass, SERVICE_SEND_USER_MESSAGE, "Lights on")
+    await _send(hass, SERVICE_SEND_ASSISTANT_MESSAGE, "OK")
+    await _send(hass, SERVICE_SEND_ASSISTANT_MESSAGE, "OK")
+    await _send(hass, SERVICE_SEND_USER_MESSAGE, "Lights off")
+    await _send(hass, SERVICE_SEND_ASSISTANT_MESSAGE, "OK")
+
+    assert texts == ["Lights on", "OK", "Lights off", "OK"]
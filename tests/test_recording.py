@@ -0,0 +1,114 @@
+"""macs.start_recording / macs.stop_recording."""
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+import voluptuous as vol
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.macs import recording
+from custom_components.macs.const import (
+    DOMAIN,
+    ATTR_DURATION,
+    ATTR_WINDSPEED,
+    EVENT_MESSAGE,
+    SERVICE_SET_WINDSPEED,
+    SERVICE_START_RECORDING,
+    SERVICE_STOP_RECORDING,
+)
+from custom_components.macs.metrics import async_get_metrics
+from custom_components.macs.recording import async_get_recorder
+
+
+@pytest.fixture(autouse=True)
+def recordings_dir(hass: HomeAssistant, tmp_path: Path) -> Path:
+    hass.config.config_dir = str(tmp_path)
+    return tmp_path / recording.RECORDING_DIR
+
+
+def _read(path: Path) -> tuple[dict, list[dict]]:
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    return lines[0], lines[1:]
+
+
+async def _start(hass: HomeAssistant, **data) -> Path:
+    await hass.services.async_call(DOMAIN, SERVICE_START_RECORDING, data, blocking=True)
+    recorder = async_get_recorder(hass)
+    assert recorder is not None
+    return recorder.path
+
+
+async def test_start_and_stop(hass: HomeAssistant, macs_entry, recordings_dir: Path) -> None:
+    path = await _start(hass)
+    assert path.parent == recordings_dir
+    with pytest.raises(vol.Invalid):
+        await _start(hass)
+
+    await hass.services.async_call(DOMAIN, SERVICE_SET_WINDSPEED, {ATTR_WINDSPEED: 12.5}, blocking=True)
+    await hass.services.async_call(DOMAIN, SERVICE_STOP_RECORDING, {}, blocking=True)
+    await hass.async_block_till_done()
+    assert async_get_recorder(hass) is None
+
+    header, records = _read(path)
+    assert header["macs_recording"] == recording.RECORDING_FORMAT
+    assert [(r["k"], r["s"], r["d"]) for r in records] == [("call", SERVICE_SET_WINDSPEED, {ATTR_WINDSPEED: 12.5})]
+
+    services = async_get_metrics(hass).services
+    assert (services[SERVICE_START_RECORDING].calls, services[SERVICE_START_RECORDING].errors) == (2, 1)
+    assert services[SERVICE_STOP_RECORDING].calls == 1
+
+
+async def test_stops_after_duration(hass: HomeAssistant, macs_entry) -> None:
+    path = await _start(hass, **{ATTR_DURATION: 60})
+    hass.bus.async_fire(EVENT_MESSAGE, {"role": "assistant", "text": "Hello"})
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=61))
+    await hass.async_block_till_done()
+
+    assert async_get_recorder(hass) is None
+    _, records = _read(path)
+    assert [r["k"] for r in records] == ["message"]
+
+
+async def test_stops_on_shutdown(hass: HomeAssistant, macs_entry) -> None:
+    path = await _start(hass)
+    hass.bus.async_fire(EVENT_MESSAGE, {"role": "assistant", "text": "Bye"})
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+    await hass.async_block_till_done()
+
+    assert async_get_recorder(hass) is None
+    _, records = _read(path)
+    assert [r["d"]["text"] for r in records] == ["Bye"]
+
+
+async def test_flushes_keep_order(hass: HomeAssistant, macs_entry, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(recording, "FLUSH_LINES", 10)
+    path = await _start(hass)
+    recorder = async_get_recorder(hass)
+    write = recorder._write
+
+    def slow_write(lines: list[str], mode: str) -> None:
+        # Uneven write times would reorder concurrent appends.
+        time.sleep(random.uniform(0, 0.01))
+        write(lines, mode)
+
+    monkeypatch.setattr(recorder, "_write", slow_write)
+    for index in range(200):
+        hass.bus.async_fire(EVENT_MESSAGE, {"role": "assistant", "text": str(index)})
+        # Let the listener and any flush start, without waiting for writes to finish.
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+    await hass.services.async_call(DOMAIN, SERVICE_STOP_RECORDING, {}, blocking=True)
+    await hass.async_block_till_done()
+
+    _, records = _read(path)
+    assert [r["d"]["text"] for r in records] == [str(index) for index in range(200)]
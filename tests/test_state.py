@@ -0,0 +1,59 @@
+"""The MACS snapshot and macs/subscribe feed with write coalescing on."""
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.macs.const import (
+    DOMAIN,
+    ATTR_MOOD,
+    ATTR_WINDSPEED,
+    CONF_WRITE_COALESCE_WINDOW,
+    SERVICE_SET_MOOD,
+    SERVICE_SET_WINDSPEED,
+)
+from custom_components.macs.state import async_build_snapshot
+from custom_components.macs.websocket_api import async_get_state_feed
+
+
+async def _coalesce(hass: HomeAssistant, entry) -> None:
+    # Long enough that only the code under test publishes the pending value.
+    hass.config_entries.async_update_entry(entry, options={**entry.options, CONF_WRITE_COALESCE_WINDOW: 3600})
+    await hass.config_entries.async_reload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+def _windspeed_state(hass: HomeAssistant) -> float:
+    entity_id = er.async_get(hass).async_get_entity_id("number", DOMAIN, "macs_windspeed")
+    return float(hass.states.get(entity_id).state)
+
+
+async def _call(hass: HomeAssistant, service: str, data: dict) -> None:
+    await hass.services.async_call(DOMAIN, service, data, blocking=True)
+    await hass.async_block_till_done()
+
+
+async def test_snapshot_publishes_pending_writes(hass: HomeAssistant, macs_entry) -> None:
+    await _coalesce(hass, macs_entry)
+    before = _windspeed_state(hass)
+    # Written within the window of the write at setup, so it is held back.
+    await _call(hass, SERVICE_SET_WINDSPEED, {ATTR_WINDSPEED: 20})
+    assert _windspeed_state(hass) == before
+
+    assert async_build_snapshot(hass)[ATTR_WINDSPEED] == 20
+    assert _windspeed_state(hass) == 20
+
+
+async def test_feed_matches_entity_states(hass: HomeAssistant, macs_entry) -> None:
+    await _coalesce(hass, macs_entry)
+    before = _windspeed_state(hass)
+    messages: list[dict] = []
+    unsubscribe = async_get_state_feed(hass).async_subscribe(messages.append)
+
+    await _call(hass, SERVICE_SET_WINDSPEED, {ATTR_WINDSPEED: 30})
+    await _call(hass, SERVICE_SET_MOOD, {ATTR_MOOD: "happy"})
+    unsubscribe()
+
+    assert messages[0]["snapshot"][ATTR_WINDSPEED] == before
+    assert messages[-1]["diff"] == {ATTR_MOOD: "happy", ATTR_WINDSPEED: 30}
+    assert _windspeed_state(hass) == 30